@@ -0,0 +1,73 @@
+"""
+Microbenchmark de analisar_necessidade_visual
+Compara o custo por chamada do scanner compilado com a implementação original
+(sete re.findall + buscas por substring a cada chamada).
+
+Uso:
+    python benchmarks/bench_analise_visual.py [--quantidade 2000] [--repeticoes 5]
+"""
+
+import argparse
+import re
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from implementation import analisar_necessidade_visual  # noqa: E402
+from corpus import gerar_transcricoes  # noqa: E402
+
+
+def analisar_necessidade_visual_original(texto, tool_context=None):
+    """Cópia da implementação anterior ao scanner compilado, usada como referência."""
+    padroes_visuais = [
+        r'\b(esse|esta|esses|estas|aqui|aí|isso|isto)\b', r'\b(mostr\w+|ve[jr]|olh\w+|observ\w+)\b',
+        r'\b(figura|imagem|foto|desenho|gráfico|diagrama|exercício|questão|problema)\b',
+        r'\b(tá|está)\s+(escrito|mostrando|aparecendo)', r'o que (é|significa|quer dizer) (isso|isto)',
+        r'não (entendi|compreendi) (esse|este|essa|esta)', r'(ajuda|me ajude|help) com (isso|este|esse)',
+    ]
+    texto_lower = texto.lower()
+    referencias_encontradas = []
+    pontuacao_visual = 0.0
+    for padrao in padroes_visuais:
+        matches = re.findall(padrao, texto_lower)
+        if matches:
+            referencias_encontradas.extend(matches)
+            pontuacao_visual += len(matches) * 0.15
+    if "exercício" in texto_lower or "questão" in texto_lower: pontuacao_visual += 0.3
+    if any(word in texto_lower for word in ["esse aqui", "esta aqui", "isso aqui"]): pontuacao_visual += 0.4
+    confianca = min(pontuacao_visual, 1.0)
+    return {
+        "necessita_imagem": confianca >= 0.5, "confianca": confianca,
+        "referencias_encontradas": list(set(referencias_encontradas)),
+    }
+
+
+def medir(funcao, corpus, repeticoes):
+    """Retorna o melhor custo médio por chamada, em microssegundos."""
+    def rodada():
+        for texto in corpus:
+            funcao(texto, None)
+    tempos = timeit.repeat(rodada, number=1, repeat=repeticoes)
+    return min(tempos) / len(corpus) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quantidade", type=int, default=2000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = gerar_transcricoes(args.quantidade)
+    palavras = sum(len(t.split()) for t in corpus) / len(corpus)
+    original = medir(analisar_necessidade_visual_original, corpus, args.repeticoes)
+    compilado = medir(analisar_necessidade_visual, corpus, args.repeticoes)
+
+    print(f"corpus: {len(corpus)} transcrições, {palavras:.0f} palavras em média")
+    print(f"original:  {original:8.2f} µs/chamada")
+    print(f"compilado: {compilado:8.2f} µs/chamada ({original / compilado:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+Gerador de carga de sessões simultâneas do professor_virtual
+Responde quantas crianças simultâneas uma instância atende. Cada criança é uma
+sessão no runner do ADK (InMemoryRunner) com o agente de agente.py, o modelo
+determinístico `ModeloProfessorFalso` e os backends falsos, e segue o fluxo
+documentado: envia o áudio da pergunta, manda a foto do exercício quando o
+professor pede (numa fração das conversas), pede o áudio da resposta (TTS) e
+encerra a sessão; entre um turno e outro a criança "pensa" por `--pausa`
+segundos. Terminada uma conversa, a mesma criança começa outra.
+
+O número de crianças segue uma rampa em degraus (`--rampa 0:10 30:50 60:100`:
+10 crianças a partir de 0 s, 50 a partir de 30 s, 100 a partir de 60 s). Para
+cada degrau são informados:
+- vazão de turnos concluídos por segundo;
+- latência do turno (da mensagem enviada ao último evento) p50/p95/p99;
+- espera na fila, com `--max-turnos-simultaneos` limitando os turnos em
+  execução, como os workers de um servidor;
+- atraso do event loop p99 (quanto um timer de 10 ms dispara atrasado), que
+  mostra a saturação do processo;
+- RSS do processo e seu crescimento por sessão aberta.
+
+A vazão sustentada é a do último degrau.
+
+Uso:
+    python benchmarks/bench_carga.py [--rampa 0:10 30:50 60:100] [--duracao 90] [--pausa 1.0]
+        [--latencia-por-token 0.01] [--ferramentas sincronas]
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+import ferramentas_async  # noqa: E402
+import implementation  # noqa: E402
+from agente import NOME_AGENTE, ArtefatosPorSessao, criar_agente_professor  # noqa: E402
+from backends import (  # noqa: E402
+    BackendSTTFalso, BackendTTSFalso, BackendVisaoFalso, configurar_backend_stt,
+    configurar_backend_tts, configurar_backend_visao,
+)
+from caches import (  # noqa: E402
+    configurar_cache_analise_imagem, configurar_cache_transcricao, configurar_cache_tts,
+)
+from corpus import gerar_imagem_pagina, gerar_wav  # noqa: E402
+from modelos_falsos import ModeloProfessorFalso  # noqa: E402
+
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+PERGUNTA = "Não entendi esse exercício aqui de matemática, olha essa conta"
+INTERVALO_MONITOR_LOOP = 0.01
+
+
+def ler_rampa(degraus: List[str]) -> List[Tuple[float, int]]:
+    """Converte ["0:10", "30:50"] em [(0.0, 10), (30.0, 50)], em ordem de início."""
+    rampa = []
+    for degrau in degraus:
+        inicio, sessoes = degrau.split(":")
+        rampa.append((float(inicio), int(sessoes)))
+    return sorted(rampa)
+
+
+def rss_bytes() -> int:
+    """RSS atual do processo (Linux); fora dele, o pico informado pelo sistema."""
+    try:
+        with open("/proc/self/statm") as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico if sys.platform == "darwin" else pico * 1024
+
+
+class GeradorCarga:
+    """Conduz as sessões simuladas e coleta as medições por turno.
+
+    Args:
+        runner: Runner do ADK com o agente do professor.
+        artefatos: Armazenamentos de artefatos das sessões do agente.
+        audio, imagem: Conteúdo dos artefatos enviados pelas crianças.
+        pausa: Segundos entre um turno e o próximo da mesma criança.
+        proporcao_imagem: Fração das conversas em que a criança manda a foto.
+        max_turnos_simultaneos: Turnos em execução ao mesmo tempo (0 = sem limite).
+    """
+
+    def __init__(
+        self,
+        runner: InMemoryRunner,
+        artefatos: ArtefatosPorSessao,
+        audio: bytes,
+        imagem: bytes,
+        pausa: float = 1.0,
+        proporcao_imagem: float = 0.5,
+        max_turnos_simultaneos: int = 0,
+        semente: int = 42
+    ):
+        self.runner = runner
+        self.artefatos = artefatos
+        self.audio = audio
+        self.imagem = imagem
+        self.pausa = pausa
+        self.proporcao_imagem = proporcao_imagem
+        self._limite = asyncio.Semaphore(max_turnos_simultaneos) if max_turnos_simultaneos else None
+        self._rng = random.Random(semente)
+        self._conversas = itertools.count()
+        self.alvo = 0
+        self.ativas = 0
+        # (instante de conclusão, latência do turno, espera na fila)
+        self.turnos: List[Tuple[float, float, float]] = []
+        self.atrasos_loop: List[Tuple[float, float]] = []
+        self.erros = 0
+        self.inicio = 0.0
+
+    def agora(self) -> float:
+        return time.perf_counter() - self.inicio
+
+    async def crianca(self, indice: int) -> None:
+        """Conversas seguidas de uma criança enquanto ela couber no degrau atual."""
+        await asyncio.sleep(self._rng.uniform(0, self.pausa))  # espalha as chegadas
+        while indice < self.alvo:
+            self.ativas += 1
+            try:
+                await self._conversa(indice)
+            finally:
+                self.ativas -= 1
+            await asyncio.sleep(self.pausa)
+
+    async def _conversa(self, indice: int) -> None:
+        numero = next(self._conversas)
+        com_imagem = int((numero + 1) * self.proporcao_imagem) > int(numero * self.proporcao_imagem)
+        sessao = await self.runner.session_service.create_session(
+            app_name=NOME_AGENTE, user_id=f"crianca_{indice}"
+        )
+        armazenamento = self.artefatos.da_sessao(sessao.id)
+        try:
+            armazenamento.create_artifact(
+                f"pergunta_{numero}.wav", self.audio, "audio/wav", pre_processar=True
+            )
+            await self._turno(sessao, f"transcreva o áudio 'pergunta_{numero}.wav'")
+            if com_imagem:
+                await asyncio.sleep(self.pausa)
+                armazenamento.create_artifact(f"exercicio_{numero}.jpg", self.imagem, "image/jpeg")
+                await self._turno(
+                    sessao, f"analise a imagem 'exercicio_{numero}.jpg' no contexto da pergunta anterior"
+                )
+            await asyncio.sleep(self.pausa)
+            await self._turno(sessao, "gere o áudio da sua resposta")
+        finally:
+            self.artefatos.fechar(sessao.id)
+            await self.runner.session_service.delete_session(
+                app_name=NOME_AGENTE, user_id=sessao.user_id, session_id=sessao.id
+            )
+
+    async def _turno(self, sessao, texto: str) -> None:
+        mensagem = types.Content(role="user", parts=[types.Part(text=texto)])
+        pedido = time.perf_counter()
+        if self._limite is not None:
+            await self._limite.acquire()
+        inicio = time.perf_counter()
+        try:
+            async for evento in self.runner.run_async(
+                user_id=sessao.user_id, session_id=sessao.id, new_message=mensagem
+            ):
+                if evento.error_code:
+                    self.erros += 1
+        finally:
+            if self._limite is not None:
+                self._limite.release()
+        fim = time.perf_counter()
+        self.turnos.append((fim - self.inicio, fim - pedido, inicio - pedido))
+
+    async def monitorar_loop(self) -> None:
+        """Registra quanto um timer de 10 ms dispara atrasado (saturação do loop)."""
+        while True:
+            antes = time.perf_counter()
+            await asyncio.sleep(INTERVALO_MONITOR_LOOP)
+            self.atrasos_loop.append((self.agora(), time.perf_counter() - antes - INTERVALO_MONITOR_LOOP))
+
+    async def executar(self, rampa: List[Tuple[float, int]], duracao: float) -> List[Dict[str, float]]:
+        """Roda a rampa por `duracao` segundos e devolve as medições de cada degrau."""
+        # Uma conversa de aquecimento carrega os módulos preguiçosos antes da
+        # referência de RSS e não entra nas medições
+        pausa, proporcao = self.pausa, self.proporcao_imagem
+        self.pausa, self.proporcao_imagem = 0.0, 1.0
+        await self._conversa(-1)
+        self.pausa, self.proporcao_imagem = pausa, proporcao
+        self._conversas = itertools.count()
+        self.turnos.clear()
+
+        self.inicio = time.perf_counter()
+        monitor = asyncio.ensure_future(self.monitorar_loop())
+        criancas: List[asyncio.Task] = []
+        rss_inicial = rss_bytes()
+        degraus = []
+        limites = [inicio for inicio, _ in rampa[1:]] + [duracao]
+        try:
+            for (inicio, sessoes), fim in zip(rampa, limites):
+                await asyncio.sleep(max(0.0, inicio - self.agora()))
+                self.alvo = sessoes
+                criancas.extend(asyncio.ensure_future(self.crianca(i)) for i in range(len(criancas), sessoes))
+                await asyncio.sleep(max(0.0, fim - self.agora()))
+                degraus.append(self._medir_degrau(inicio, fim, sessoes, rss_inicial))
+        finally:
+            monitor.cancel()
+            for tarefa in criancas:
+                tarefa.cancel()
+            await asyncio.gather(monitor, *criancas, return_exceptions=True)
+        return degraus
+
+    def _medir_degrau(self, inicio: float, fim: float, sessoes: int, rss_inicial: int) -> Dict[str, float]:
+        turnos = [t for t in self.turnos if inicio <= t[0] < fim]
+        latencias = sorted(t[1] for t in turnos)
+        esperas = sorted(t[2] for t in turnos)
+        atrasos = sorted(a for instante, a in self.atrasos_loop if inicio <= instante < fim)
+        rss = rss_bytes()
+        return {
+            "inicio_s": inicio,
+            "sessoes": sessoes,
+            "turnos_por_s": len(turnos) / (fim - inicio),
+            "p50_ms": _percentil(latencias, 50) * 1000,
+            "p95_ms": _percentil(latencias, 95) * 1000,
+            "p99_ms": _percentil(latencias, 99) * 1000,
+            "fila_p95_ms": _percentil(esperas, 95) * 1000,
+            "atraso_loop_p99_ms": _percentil(atrasos, 99) * 1000,
+            "rss_mb": rss / 2**20,
+            # Crianças pensando entre conversas não têm sessão aberta
+            "rss_por_sessao_kb": (rss - rss_inicial) / max(self.ativas, 1) / 1024,
+        }
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def configurar_ambiente(latencia_stt: float, latencia_visao: float, atraso_tts_por_caractere: float) -> None:
+    """Backends falsos com latência de rede simulada e caches desligados."""
+    configurar_backend_stt(BackendSTTFalso(texto=PERGUNTA, latencia=latencia_stt))
+    configurar_backend_visao(BackendVisaoFalso(latencia=latencia_visao))
+    configurar_backend_tts(BackendTTSFalso(atraso_por_caractere=atraso_tts_por_caractere))
+    configurar_cache_transcricao(None)
+    configurar_cache_analise_imagem(None)
+    configurar_cache_tts(None)
+
+
+def criar_gerador(
+    modelo: ModeloProfessorFalso,
+    assincronas: bool = True,
+    **opcoes
+) -> GeradorCarga:
+    """Monta runner, agente e gerador de carga com o corpus padrão."""
+    artefatos = ArtefatosPorSessao()
+    ferramentas = ferramentas_async.PROFESSOR_TOOLS_ASYNC if assincronas else implementation.PROFESSOR_TOOLS
+    runner = InMemoryRunner(
+        agent=criar_agente_professor(modelo, ferramentas, artefatos), app_name=NOME_AGENTE
+    )
+    return GeradorCarga(runner, artefatos, gerar_wav(6.0), gerar_imagem_pagina(), **opcoes)
+
+
+def imprimir(degraus: List[Dict[str, float]], erros: int) -> None:
+    print(f"{'início s':>8s} {'sessões':>8s} {'turnos/s':>9s} {'p50 ms':>8s} {'p95 ms':>8s} "
+          f"{'p99 ms':>8s} {'fila p95':>9s} {'loop p99':>9s} {'RSS MB':>7s} {'KB/sessão':>10s}")
+    for d in degraus:
+        print(f"{d['inicio_s']:8.0f} {d['sessoes']:8d} {d['turnos_por_s']:9.2f} {d['p50_ms']:8.0f} "
+              f"{d['p95_ms']:8.0f} {d['p99_ms']:8.0f} {d['fila_p95_ms']:9.0f} "
+              f"{d['atraso_loop_p99_ms']:9.1f} {d['rss_mb']:7.0f} {d['rss_por_sessao_kb']:10.0f}")
+    if degraus:
+        print(f"\nvazão sustentada (último degrau): {degraus[-1]['turnos_por_s']:.2f} turnos/s "
+              f"com {degraus[-1]['sessoes']} sessões; erros: {erros}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rampa", nargs="+", default=["0:10", "30:50", "60:100"],
+                        help="degraus início_s:sessões")
+    parser.add_argument("--duracao", type=float, default=90.0)
+    parser.add_argument("--pausa", type=float, default=1.0)
+    parser.add_argument("--proporcao-imagem", type=float, default=0.5)
+    parser.add_argument("--max-turnos-simultaneos", type=int, default=0)
+    parser.add_argument("--latencia-primeiro-token", type=float, default=0.3)
+    parser.add_argument("--latencia-por-token", type=float, default=0.01)
+    parser.add_argument("--latencia-stt", type=float, default=0.3)
+    parser.add_argument("--latencia-visao", type=float, default=0.5)
+    parser.add_argument("--atraso-tts-por-caractere", type=float, default=0.002)
+    parser.add_argument("--ferramentas", choices=["assincronas", "sincronas"], default="assincronas")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", category=UserWarning, module="google.adk")
+    configurar_ambiente(args.latencia_stt, args.latencia_visao, args.atraso_tts_por_caractere)
+    modelo = ModeloProfessorFalso(
+        latencia_primeiro_token=args.latencia_primeiro_token, latencia_por_token=args.latencia_por_token
+    )
+    gerador = criar_gerador(
+        modelo, args.ferramentas == "assincronas", pausa=args.pausa,
+        proporcao_imagem=args.proporcao_imagem, max_turnos_simultaneos=args.max_turnos_simultaneos
+    )
+    degraus = asyncio.run(gerador.executar(ler_rampa(args.rampa), args.duracao))
+    imprimir(degraus, gerador.erros)
+    if gerador.turnos:
+        print(f"turnos concluídos: {len(gerador.turnos)}; latência mediana geral: "
+              f"{statistics.median(t[1] for t in gerador.turnos) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark de sessões simultâneas: ferramentas síncronas x assíncronas
+Cada sessão transcreve um áudio, analisa uma foto e sintetiza a resposta, com
+backends falsos que simulam a latência de rede dos serviços reais. As sessões
+rodam como corrotinas num único event loop, como no runner do ADK: as
+ferramentas síncronas bloqueiam o loop durante cada chamada, as assíncronas não.
+
+Com --gateway-local, os backends são os HTTP de backends_http.py falando com o
+servidor local (servidor_local.py), com pool de conexões keep-alive.
+
+Uso:
+    python benchmarks/bench_concorrencia.py [--sessoes 1 10 50] [--latencia-stt 0.3] [--gateway-local]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+import ferramentas_async  # noqa: E402
+import implementation  # noqa: E402
+from backends import (  # noqa: E402
+    BackendSTTFalso, BackendTTSFalso, BackendVisaoFalso, configurar_backend_stt,
+    configurar_backend_tts, configurar_backend_visao, configurar_backends,
+)
+from caches import (  # noqa: E402
+    configurar_cache_analise_imagem, configurar_cache_transcricao, configurar_cache_tts,
+)
+from corpus import ContextoFerramentaFalso, gerar_imagem_pagina, gerar_wav  # noqa: E402
+from servidor_local import ServidorLocal  # noqa: E402
+
+RESPOSTA = "Vamos resolver juntos: primeiro isolamos o x e depois dividimos os dois lados."
+
+
+async def _sessao(ferramentas, contexto, assincrona):
+    async def chamar(nome, *args):
+        resultado = ferramentas[nome](*args, contexto)
+        return await resultado if assincrona else resultado
+
+    transcricao = await chamar("transcrever_audio", "pergunta.wav")
+    await chamar("analisar_imagem_educacional", "exercicio.jpg", transcricao["texto"])
+    resultado = await chamar("gerar_audio_tts", RESPOSTA)
+    assert resultado["sucesso"], resultado
+
+
+async def _rodar(sessoes, ferramentas, assincrona, audio, imagem):
+    contextos = [
+        ContextoFerramentaFalso({"pergunta.wav": audio, "exercicio.jpg": imagem}) for _ in range(sessoes)
+    ]
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_sessao(ferramentas, c, assincrona) for c in contextos))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessoes", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latencia-stt", type=float, default=0.3)
+    parser.add_argument("--latencia-visao", type=float, default=0.5)
+    parser.add_argument("--atraso-tts-por-caractere", type=float, default=0.002)
+    parser.add_argument("--gateway-local", action="store_true")
+    parser.add_argument("--max-conexoes", type=int, default=16)
+    args = parser.parse_args()
+
+    # Sem caches: cada sessão paga as chamadas aos backends
+    configurar_cache_transcricao(None)
+    configurar_cache_tts(None)
+    configurar_cache_analise_imagem(None)
+    servidor = None
+    if args.gateway_local:
+        servidor = ServidorLocal(latencia={
+            "/stt": args.latencia_stt,
+            "/visao": args.latencia_visao,
+            "/tts": args.atraso_tts_por_caractere * len(RESPOSTA),
+        }).iniciar()
+        opcoes = {"tipo": "http", "url_base": servidor.url_base, "max_conexoes": args.max_conexoes}
+        configurar_backends({"stt": opcoes, "visao": opcoes, "tts": opcoes})
+    else:
+        configurar_backend_stt(BackendSTTFalso(latencia=args.latencia_stt))
+        configurar_backend_visao(BackendVisaoFalso(latencia=args.latencia_visao))
+        configurar_backend_tts(BackendTTSFalso(atraso_por_caractere=args.atraso_tts_por_caractere))
+
+    audio = gerar_wav(8.0)
+    imagem = gerar_imagem_pagina()
+    variantes = {
+        "síncronas": (implementation.PROFESSOR_TOOLS, False),
+        "assíncronas": (ferramentas_async.PROFESSOR_TOOLS_ASYNC, True),
+    }
+    print(f"{'sessões':>8s} {'ferramentas':>12s} {'tempo (s)':>10s} {'sessões/s':>10s}")
+    for sessoes in args.sessoes:
+        for nome, (ferramentas, assincrona) in variantes.items():
+            tempo = asyncio.run(_rodar(sessoes, ferramentas, assincrona, audio, imagem))
+            print(f"{sessoes:8d} {nome:>12s} {tempo:10.2f} {sessoes / tempo:10.1f}")
+    if servidor is not None:
+        print(f"gateway local: {servidor.requisicoes} requisições em {servidor.conexoes} conexões")
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
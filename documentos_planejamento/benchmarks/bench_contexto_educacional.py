@@ -0,0 +1,66 @@
+"""
+Benchmark de extrair_contexto_educacional
+Compara a busca original (substring por palavra-chave, parando na primeira
+matéria), a mesma busca pontuando todas as matérias e a alternação compilada
+(_SCANNER_MATERIAS) usada por extrair_contexto_educacional.
+
+Uso:
+    python benchmarks/bench_contexto_educacional.py [--quantidade 5000] [--repeticoes 5]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from implementation import (  # noqa: E402
+    MATERIAS_PALAVRAS_CHAVE,
+    extrair_contexto_educacional,
+)
+from corpus import gerar_transcricoes  # noqa: E402
+
+
+def extrair_contexto_original(texto):
+    """Implementação anterior: primeira matéria com alguma palavra-chave."""
+    texto_lower = texto.lower()
+    for materia, palavras_chave in MATERIAS_PALAVRAS_CHAVE.items():
+        if any(palavra in texto_lower for palavra in palavras_chave):
+            return materia
+    return "geral"
+
+
+def extrair_contexto_contando(texto):
+    """Busca por substring pontuando todas as matérias (o que a alternação entrega)."""
+    texto_lower = texto.lower()
+    return {
+        materia: sum(texto_lower.count(p) for p in palavras)
+        for materia, palavras in MATERIAS_PALAVRAS_CHAVE.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quantidade", type=int, default=5000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = gerar_transcricoes(args.quantidade)
+
+    def por_texto(funcao):
+        return lambda: [funcao(t) for t in corpus]
+
+    casos = {
+        "original (1ª matéria)": por_texto(extrair_contexto_original),
+        "substring (todas)": por_texto(extrair_contexto_contando),
+        "alternação compilada": por_texto(extrair_contexto_educacional),
+    }
+    print(f"corpus: {len(corpus)} transcrições")
+    for nome, caso in casos.items():
+        tempo = min(timeit.repeat(caso, number=1, repeat=args.repeticoes))
+        print(f"{nome:22s} {tempo / len(corpus) * 1e6:8.2f} µs/transcrição")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark do agendador de lotes de STT: vazão x latência p99
+Requisições chegam em carga aberta (intervalos exponenciais, `--taxa` por
+segundo) a um STT falso que cobra uma latência fixa por requisição mais um
+pouco por áudio, e que aceita no máximo `--max-simultaneas` requisições ao
+mesmo tempo (como a cota de um serviço real). Compara requisições individuais
+com o agendador (lote_stt.py) em várias combinações de tamanho de lote e
+espera máxima.
+
+Uso:
+    python benchmarks/bench_lote_stt.py [--taxa 40 80] [--duracao 5] [--lotes 4:10 8:20 16:50]
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from backends import BackendSTTFalso  # noqa: E402
+from lote_stt import AgendadorLoteSTT  # noqa: E402
+
+
+class _STTComCota(BackendSTTFalso):
+    """STT falso que limita as requisições simultâneas."""
+
+    def __init__(self, max_simultaneas, **opcoes):
+        super().__init__(**opcoes)
+        self.max_simultaneas = max_simultaneas
+        self._cota = None
+
+    def _semaforo(self):
+        if self._cota is None:
+            self._cota = asyncio.Semaphore(self.max_simultaneas)
+        return self._cota
+
+    async def transcrever_async(self, audio, formato, idioma="pt-BR"):
+        async with self._semaforo():
+            return await super().transcrever_async(audio, formato, idioma)
+
+    async def transcrever_lote_async(self, audios, idioma="pt-BR"):
+        async with self._semaforo():
+            return await super().transcrever_lote_async(audios, idioma)
+
+
+async def _carga(transcrever, taxa, duracao, semente=7):
+    rng = random.Random(semente)
+    latencias = []
+
+    async def requisicao():
+        inicio = time.perf_counter()
+        await transcrever(b"audio", "wav", "pt-BR")
+        latencias.append(time.perf_counter() - inicio)
+
+    tarefas = []
+    inicio = time.perf_counter()
+    proxima = inicio
+    while proxima - inicio < duracao:
+        await asyncio.sleep(max(0.0, proxima - time.perf_counter()))
+        tarefas.append(asyncio.ensure_future(requisicao()))
+        proxima += rng.expovariate(taxa)
+    await asyncio.gather(*tarefas)
+    return len(tarefas) / (time.perf_counter() - inicio), latencias
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--taxa", type=float, nargs="+", default=[40.0, 80.0])
+    parser.add_argument("--duracao", type=float, default=5.0)
+    parser.add_argument("--latencia", type=float, default=0.3)
+    parser.add_argument("--latencia-por-item", type=float, default=0.01)
+    parser.add_argument("--max-simultaneas", type=int, default=8)
+    parser.add_argument("--lotes", nargs="+", default=["4:10", "8:20", "16:50"],
+                        help="combinações max_lote:espera_maxima_ms")
+    args = parser.parse_args()
+
+    print(f"{'taxa':>6s} {'modo':>16s} {'vazão/s':>8s} {'p50 (ms)':>9s} {'p99 (ms)':>9s} {'lote médio':>11s}")
+    for taxa in args.taxa:
+        variantes = [("individual", None)] + [
+            (f"lote {v}", tuple(float(x) for x in v.split(":"))) for v in args.lotes
+        ]
+        for nome, lote in variantes:
+            backend = _STTComCota(
+                args.max_simultaneas, latencia=args.latencia, latencia_por_item=args.latencia_por_item
+            )
+            if lote is None:
+                transcrever, agendador = backend.transcrever_async, None
+            else:
+                agendador = AgendadorLoteSTT(int(lote[0]), lote[1], backend=backend)
+                transcrever = agendador.transcrever
+            vazao, latencias = asyncio.run(_carga(transcrever, taxa, args.duracao))
+            medio = agendador.estatisticas()["tamanho_medio_lote"] if agendador else 1.0
+            print(f"{taxa:6.0f} {nome:>16s} {vazao:8.1f} "
+                  f"{statistics.median(latencias) * 1000:9.0f} {_percentil(latencias, 99) * 1000:9.0f} "
+                  f"{medio:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark do custo das métricas por ferramenta
+Mede o tempo por chamada de uma função vazia, sem e com o wrapper de
+`instrumentar_ferramentas` (metricas.py), síncrona e assíncrona, chamada com
+argumentos por nome como o ADK faz, e o custo de
+gerar a exposição do Prometheus. O tempo é o de CPU do processo, e cada
+variante roda `--repeticoes` vezes, intercaladas, valendo a mais rápida: numa
+máquina compartilhada, uma única rodada longa mede também o ruído dos vizinhos.
+
+Uso:
+    python benchmarks/bench_metricas.py [--chamadas 100000] [--repeticoes 20]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from metricas import RegistroMetricas, instrumentar_ferramentas  # noqa: E402
+
+RESPOSTA = {"sucesso": True, "tamanho_bytes": 1024}
+
+
+def vazia(nome_artefato, tool_context=None):
+    return RESPOSTA
+
+
+async def vazia_async(nome_artefato, tool_context=None):
+    return RESPOSTA
+
+
+def _por_chamada_ns(funcao, chamadas):
+    inicio = time.process_time_ns()
+    for _ in range(chamadas):
+        funcao(nome_artefato="a.wav", tool_context=None)
+    return (time.process_time_ns() - inicio) / chamadas
+
+
+def _por_chamada_async_ns(funcao, chamadas):
+    async def laco():
+        inicio = time.process_time_ns()
+        for _ in range(chamadas):
+            await funcao(nome_artefato="a.wav", tool_context=None)
+        return (time.process_time_ns() - inicio) / chamadas
+    return asyncio.run(laco())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chamadas", type=int, default=100_000)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    registro = RegistroMetricas()
+    ferramentas = instrumentar_ferramentas({"vazia": vazia, "vazia_async": vazia_async}, registro)
+
+    print(f"{'variante':>10s} {'sem (ns)':>9s} {'com (ns)':>9s} {'custo (ns)':>11s}")
+    for nome, medir, original in (
+        ("síncrona", _por_chamada_ns, vazia),
+        ("async", _por_chamada_async_ns, vazia_async),
+    ):
+        sem = com = float("inf")
+        for _ in range(args.repeticoes):
+            sem = min(sem, medir(original, args.chamadas))
+            com = min(com, medir(ferramentas[original.__name__], args.chamadas))
+        print(f"{nome:>10s} {sem:9.0f} {com:9.0f} {com - sem:11.0f}")
+
+    inicio = time.perf_counter()
+    texto = registro.texto_prometheus()
+    print(f"\nexposição Prometheus: {len(texto.splitlines())} linhas em "
+          f"{(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Suíte de desempenho offline das ferramentas do professor
+Roda cada ferramenta de PROFESSOR_TOOLS, e a cadeia completa de uma pergunta
+(áudio -> verificação visual -> imagem -> TTS), contra um ToolContext falso com
+artefatos sintéticos de tamanho realista (benchmarks/corpus.py). Os backends são
+os falsos, sem latência, e os caches ficam desligados: o que se mede é o custo
+do próprio código (cabeçalhos, preparo de áudio e imagem, heurísticas).
+
+Por cenário são medidos:
+- vazão (chamadas/s) e latência p50/p95/p99 numa passada cronometrada;
+- pico de memória alocada numa chamada, numa passada separada com
+  tracemalloc (que deixaria a passada cronometrada mais lenta). Alocações
+  feitas pelo Pillow fora do alocador do Python não entram nessa conta.
+
+Os resultados são comparados com a linha de base gravada
+(benchmarks/linha_base_pipeline.json): a execução falha (código de saída 1)
+quando alguma métrica piora além da tolerância. A linha de base depende da
+máquina; grave uma nova ao trocar de ambiente:
+
+    python benchmarks/bench_pipeline.py --gravar-linha-base
+
+Uso:
+    python benchmarks/bench_pipeline.py [--iteracoes 30] [--tolerancia 0.3] [--cenarios ...]
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+import implementation  # noqa: E402
+from backends import (  # noqa: E402
+    BackendSTTFalso, BackendTTSFalso, BackendVisaoFalso, configurar_backend_stt,
+    configurar_backend_tts, configurar_backend_visao,
+)
+from caches import (  # noqa: E402
+    configurar_cache_analise_imagem, configurar_cache_transcricao, configurar_cache_tts,
+)
+from corpus import ContextoFerramentaFalso, gerar_imagem_pagina, gerar_transcricoes, gerar_wav  # noqa: E402
+
+LINHA_BASE = Path(__file__).resolve().parent / "linha_base_pipeline.json"
+TOLERANCIA_PADRAO = 0.3
+# Folga absoluta somada à tolerância: abaixo disso a diferença é ruído de medição
+FOLGA_ABSOLUTA = {"ms": 0.05, "kb": 64.0}
+METRICAS = ("vazao_por_s", "p50_ms", "p95_ms", "p99_ms", "pico_memoria_kb")
+
+PERGUNTA = "Professor, não entendi esse exercício aqui de matemática, olha essa conta"
+RESPOSTA = "Vamos resolver juntos: primeiro isolamos o x e depois dividimos os dois lados."
+
+
+def _corpora() -> Dict[str, Any]:
+    return {
+        # Gravação de celular: 48 kHz estéreo com silêncio nas pontas
+        "audio_celular": gerar_wav(8.0, taxa_amostragem=48000, canais=2, silencio_segundos=1.0),
+        "audio_16k": gerar_wav(6.0),
+        "foto_12mp": gerar_imagem_pagina(4000, 3000, borda_mesa=150, qualidade=90),
+        "foto_1280": gerar_imagem_pagina(),
+        "transcricoes": gerar_transcricoes(64),
+    }
+
+
+def _cenarios(corpora: Dict[str, Any]) -> Dict[str, Callable[[int], Any]]:
+    """Cada cenário recebe o número da iteração e faz uma chamada completa."""
+    ferramentas = implementation.PROFESSOR_TOOLS
+    transcricoes = corpora["transcricoes"]
+
+    def com_contexto(**artefatos):
+        return ContextoFerramentaFalso({nome: corpora[chave] for nome, chave in artefatos.items()})
+
+    def esperar_sucesso(resultado):
+        assert resultado.get("sucesso", True), resultado
+        return resultado
+
+    def cadeia_completa(_):
+        contexto = com_contexto(**{"pergunta.wav": "audio_celular", "exercicio.jpg": "foto_12mp"})
+        transcricao = esperar_sucesso(ferramentas["transcrever_audio"]("pergunta.wav", contexto))
+        visual = ferramentas["analisar_necessidade_visual"](transcricao["texto"], contexto)
+        if visual["necessita_imagem"]:
+            esperar_sucesso(ferramentas["analisar_imagem_educacional"](
+                "exercicio.jpg", transcricao["texto"], contexto
+            ))
+        return esperar_sucesso(ferramentas["gerar_audio_tts"](RESPOSTA, contexto))
+
+    return {
+        "transcrever_audio/16k_mono_6s": lambda i: esperar_sucesso(ferramentas["transcrever_audio"](
+            "pergunta.wav", com_contexto(**{"pergunta.wav": "audio_16k"}))),
+        "transcrever_audio/48k_estereo_10s": lambda i: esperar_sucesso(ferramentas["transcrever_audio"](
+            "pergunta.wav", com_contexto(**{"pergunta.wav": "audio_celular"}))),
+        "analisar_necessidade_visual": lambda i: ferramentas["analisar_necessidade_visual"](
+            transcricoes[i % len(transcricoes)], None),
+        "analisar_imagem_educacional/1280x960": lambda i: esperar_sucesso(
+            ferramentas["analisar_imagem_educacional"](
+                "exercicio.jpg", PERGUNTA, com_contexto(**{"exercicio.jpg": "foto_1280"}))),
+        "analisar_imagem_educacional/12mp": lambda i: esperar_sucesso(
+            ferramentas["analisar_imagem_educacional"](
+                "exercicio.jpg", PERGUNTA, com_contexto(**{"exercicio.jpg": "foto_12mp"}))),
+        "gerar_audio_tts": lambda i: esperar_sucesso(ferramentas["gerar_audio_tts"](
+            f"{RESPOSTA} Pergunta {i}.", com_contexto())),
+        "compreender_pergunta_audio": lambda i: esperar_sucesso(ferramentas["compreender_pergunta_audio"](
+            "pergunta.wav", com_contexto(**{"pergunta.wav": "audio_celular"}))),
+        "cadeia_completa": cadeia_completa,
+    }
+
+
+def configurar_ambiente() -> None:
+    """Backends falsos sem latência e caches desligados: cada chamada faz o trabalho todo."""
+    configurar_backend_stt(BackendSTTFalso(texto=PERGUNTA))
+    configurar_backend_visao(BackendVisaoFalso())
+    configurar_backend_tts(BackendTTSFalso())
+    configurar_cache_transcricao(None)
+    configurar_cache_analise_imagem(None)
+    configurar_cache_tts(None)
+
+
+def _percentil(ordenados: List[float], p: float) -> float:
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def medir_cenario(chamada: Callable[[int], Any], iteracoes: int, aquecimento: int = 2) -> Dict[str, float]:
+    """Vazão, percentis de latência e pico de memória de um cenário."""
+    for i in range(aquecimento):
+        chamada(i)
+
+    tempos = []
+    inicio_total = time.perf_counter()
+    for i in range(iteracoes):
+        inicio = time.perf_counter()
+        chamada(i)
+        tempos.append(time.perf_counter() - inicio)
+    total = time.perf_counter() - inicio_total
+    tempos.sort()
+
+    tracemalloc.start()
+    try:
+        pico = 0
+        for i in range(min(iteracoes, 3)):
+            tracemalloc.reset_peak()
+            antes = tracemalloc.get_traced_memory()[0]
+            chamada(i)
+            pico = max(pico, tracemalloc.get_traced_memory()[1] - antes)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "vazao_por_s": round(iteracoes / total, 2),
+        "p50_ms": round(_percentil(tempos, 50) * 1000, 3),
+        "p95_ms": round(_percentil(tempos, 95) * 1000, 3),
+        "p99_ms": round(_percentil(tempos, 99) * 1000, 3),
+        "pico_memoria_kb": round(pico / 1024, 1),
+    }
+
+
+def comparar(
+    resultados: Dict[str, Dict[str, float]],
+    linha_base: Dict[str, Dict[str, float]],
+    tolerancia: float = TOLERANCIA_PADRAO
+) -> List[str]:
+    """Regressões de `resultados` frente à linha de base (lista vazia = ok).
+
+    Vazão regride ao cair mais que `tolerancia`; latência e memória, ao subir
+    mais que `tolerancia` além da folga absoluta. Cenários sem linha de base
+    são ignorados.
+    """
+    regressoes = []
+    for cenario, metricas in resultados.items():
+        base = linha_base.get(cenario)
+        if base is None:
+            continue
+        for metrica in METRICAS:
+            if metrica not in base or metrica not in metricas:
+                continue
+            atual, referencia = metricas[metrica], base[metrica]
+            if metrica == "vazao_por_s":
+                piorou = atual < referencia * (1 - tolerancia)
+            else:
+                folga = FOLGA_ABSOLUTA[metrica.rsplit("_", 1)[1]]
+                piorou = atual > referencia * (1 + tolerancia) + folga
+            if piorou:
+                regressoes.append(f"{cenario}: {metrica} {referencia} -> {atual}")
+    return regressoes
+
+
+def _ambiente() -> Dict[str, str]:
+    return {"python": platform.python_version(), "maquina": platform.machine(), "sistema": platform.system()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iteracoes", type=int, default=30)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+    parser.add_argument("--linha-base", type=Path, default=LINHA_BASE)
+    parser.add_argument("--gravar-linha-base", action="store_true")
+    parser.add_argument("--cenarios", nargs="+", help="subconjunto dos cenários (padrão: todos)")
+    args = parser.parse_args()
+
+    configurar_ambiente()
+    cenarios = _cenarios(_corpora())
+    nomes = args.cenarios or list(cenarios)
+    desconhecidos = set(nomes) - set(cenarios)
+    if desconhecidos:
+        parser.error(f"cenários desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    print(f"{'cenário':>38s} {'vazão/s':>9s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'pico KB':>9s}")
+    resultados = {}
+    for nome in nomes:
+        m = resultados[nome] = medir_cenario(cenarios[nome], args.iteracoes)
+        print(f"{nome:>38s} {m['vazao_por_s']:9.1f} {m['p50_ms']:9.2f} {m['p95_ms']:9.2f} "
+              f"{m['p99_ms']:9.2f} {m['pico_memoria_kb']:9.0f}")
+
+    if args.gravar_linha_base:
+        gravado = {"ambiente": _ambiente(), "iteracoes": args.iteracoes, "cenarios": resultados}
+        if args.linha_base.exists() and args.cenarios:  # atualiza só os cenários medidos
+            anterior = json.loads(args.linha_base.read_text(encoding="utf-8"))
+            gravado["cenarios"] = {**anterior.get("cenarios", {}), **resultados}
+        args.linha_base.write_text(json.dumps(gravado, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"\nlinha de base gravada em {args.linha_base}")
+        return
+
+    if not args.linha_base.exists():
+        print(f"\nsem linha de base em {args.linha_base}; use --gravar-linha-base")
+        return
+    linha_base = json.loads(args.linha_base.read_text(encoding="utf-8"))
+    if linha_base.get("ambiente") != _ambiente():
+        print(f"\naviso: linha de base gravada em outro ambiente ({linha_base.get('ambiente')})")
+    regressoes = comparar(resultados, linha_base.get("cenarios", {}), args.tolerancia)
+    if regressoes:
+        print(f"\n{len(regressoes)} regressões além de {args.tolerancia:.0%}:")
+        for regressao in regressoes:
+            print(f"  {regressao}")
+        sys.exit(1)
+    print(f"\nsem regressões além de {args.tolerancia:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark do preparo de áudio antes do STT
+Para gravações sintéticas nos formatos em que os celulares entregam o áudio
+(44,1/48 kHz, estéreo, com silêncio antes e depois da pergunta), mede o tempo
+do preparo (preparo_audio.py) e quanto deixa de ser enviado ao STT.
+
+Uso:
+    python benchmarks/bench_preparo_audio.py [--repeticoes 20]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from cabecalhos_audio import inspecionar_audio  # noqa: E402
+from corpus import gerar_wav  # noqa: E402
+from preparo_audio import preparar_audio  # noqa: E402
+
+# nome: (segundos de fala, taxa, canais, segundos de silêncio em cada ponta)
+GRAVACOES = {
+    "48k estéreo 6s+3s": (6.0, 48000, 2, 1.5),
+    "44,1k mono 10s+2s": (10.0, 44100, 1, 1.0),
+    "48k estéreo 30s+1s": (30.0, 48000, 2, 0.5),
+    "16k mono 5s": (5.0, 16000, 1, 0.0),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'gravação':>20s} {'original':>10s} {'enviado':>10s} {'economia':>9s} "
+          f"{'s removidos':>12s} {'preparo (ms)':>13s}")
+    for nome, (fala, taxa, canais, silencio) in GRAVACOES.items():
+        dados = gerar_wav(fala, taxa_amostragem=taxa, canais=canais, silencio_segundos=silencio)
+        info = inspecionar_audio(dados)
+        tempos = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            preparado = preparar_audio(dados, info)
+            tempos.append(time.perf_counter() - inicio)
+        enviado = len(preparado.dados)
+        print(f"{nome:>20s} {len(dados):10d} {enviado:10d} {1 - enviado / len(dados):9.0%} "
+              f"{preparado.segundos_removidos:12.2f} {statistics.median(tempos) * 1000:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark do preparo de imagem antes da análise de visão
+Para "fotos" sintéticas no tamanho das câmeras de celular (12 MP, JPEG de alta
+qualidade, com ou sem mesa em volta da página e tag de orientação), mede o
+tempo do preparo (preparo_imagem.py) e quanto deixa de ser enviado ao backend.
+
+Uso:
+    python benchmarks/bench_preparo_imagem.py [--repeticoes 5] [--lado-maximo 1568]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from cabecalhos_imagem import inspecionar_imagem  # noqa: E402
+from corpus import gerar_imagem_pagina  # noqa: E402
+from preparo_imagem import TAMANHO_MAXIMO_IMAGEM, preparar_imagem  # noqa: E402
+
+FOTOS = {
+    "12MP página inteira": dict(largura=4032, altura=3024, qualidade=95),
+    "12MP girada (EXIF 6)": dict(largura=4032, altura=3024, qualidade=95, orientacao_exif=6),
+    "12MP página na mesa": dict(largura=2800, altura=2000, borda_mesa=600, qualidade=95),
+    "3MP página inteira": dict(largura=2048, altura=1536, qualidade=90),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--lado-maximo", type=int, default=1568)
+    args = parser.parse_args()
+
+    print(f"{'foto':>22s} {'original':>10s} {'enviado':>10s} {'economia':>9s} "
+          f"{'> 5MB':>6s} {'dimensões':>11s} {'preparo (ms)':>13s}")
+    for nome, opcoes in FOTOS.items():
+        dados = gerar_imagem_pagina(**opcoes)
+        info = inspecionar_imagem(dados)
+        tempos = []
+        for _ in range(args.repeticoes):
+            inicio = time.perf_counter()
+            preparada = preparar_imagem(dados, info, args.lado_maximo)
+            tempos.append(time.perf_counter() - inicio)
+        enviado = len(preparada.dados)
+        grande = "sim" if len(dados) > TAMANHO_MAXIMO_IMAGEM else "não"
+        dimensoes = f"{preparada.largura}x{preparada.altura}"
+        print(f"{nome:>22s} {len(dados):10d} {enviado:10d} {1 - enviado / len(dados):9.0%} "
+              f"{grande:>6s} {dimensoes:>11s} {statistics.median(tempos) * 1000:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark de rodadas do modelo por pergunta: ferramentas separadas x composta
+Um modelo falso offline segue o roteiro do `professor_instruction_provider` e
+gasta uma latência fixa por rodada, como o LLM real (tempo até a primeira
+resposta + geração). Cada chamada de ferramenta obriga uma rodada a mais:
+
+- separadas: transcrever_audio -> analisar_necessidade_visual -> resposta
+- composta: compreender_pergunta_audio -> resposta
+- composta + pré-processamento: idem, com a transcrição iniciada ao salvar o
+  áudio (pre_processamento.py), em paralelo com a primeira rodada
+
+Uso:
+    python benchmarks/bench_rodadas.py [--latencia-modelo 0.8] [--latencia-stt 0.6] [--perguntas 5]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+import implementation  # noqa: E402
+from backends import BackendSTTFalso, configurar_backend_stt  # noqa: E402
+from caches import configurar_cache_transcricao  # noqa: E402
+from corpus import ContextoFerramentaFalso, gerar_wav  # noqa: E402
+from pre_processamento import agendar_pre_processamento  # noqa: E402
+
+PERGUNTA = "Professor, como eu resolvo essa conta de dividir aqui do exercício?"
+
+# Roteiro de cada variante: ferramenta chamada a cada rodada (None = resposta final)
+ROTEIROS = {
+    "separadas": ["transcrever_audio", "analisar_necessidade_visual", None],
+    "composta": ["compreender_pergunta_audio", None],
+}
+
+
+class ModeloFalso:
+    """Modelo offline determinístico: cada rodada dorme `latencia` e segue o roteiro."""
+
+    def __init__(self, roteiro, latencia):
+        self.roteiro = roteiro
+        self.latencia = latencia
+        self.rodadas = 0
+
+    def proxima_acao(self, ultimo_resultado):
+        time.sleep(self.latencia)
+        acao = self.roteiro[self.rodadas]
+        self.rodadas += 1
+        if acao in ("transcrever_audio", "compreender_pergunta_audio"):
+            return acao, ("pergunta.wav",)
+        if acao == "analisar_necessidade_visual":
+            return acao, (ultimo_resultado["texto"],)
+        return None, ()
+
+
+def _pergunta(roteiro, latencia_modelo, audio, pre_processar):
+    contexto = ContextoFerramentaFalso()
+    inicio = time.perf_counter()
+    contexto.session.create_artifact("pergunta.wav", audio, "audio/wav")
+    if pre_processar:
+        artefato = contexto.session.get_artifact("pergunta.wav")
+        agendar_pre_processamento(contexto.session.id, "pergunta.wav", artefato)
+
+    modelo, resultado = ModeloFalso(roteiro, latencia_modelo), None
+    while True:
+        ferramenta, args = modelo.proxima_acao(resultado)
+        if ferramenta is None:
+            break
+        resultado = implementation.PROFESSOR_TOOLS[ferramenta](*args, contexto)
+        assert resultado.get("sucesso", True), resultado
+    return time.perf_counter() - inicio, modelo.rodadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latencia-modelo", type=float, default=0.8)
+    parser.add_argument("--latencia-stt", type=float, default=0.6)
+    parser.add_argument("--perguntas", type=int, default=5)
+    args = parser.parse_args()
+
+    configurar_cache_transcricao(None)  # cada pergunta paga o STT
+    configurar_backend_stt(BackendSTTFalso(texto=PERGUNTA, latencia=args.latencia_stt))
+    audio = gerar_wav(6.0)
+
+    variantes = [
+        ("separadas", ROTEIROS["separadas"], False),
+        ("composta", ROTEIROS["composta"], False),
+        ("composta + pré-proc.", ROTEIROS["composta"], True),
+    ]
+    print(f"{'variante':>22s} {'rodadas':>8s} {'mediana (s)':>12s} {'economia (s)':>13s}")
+    referencia = None
+    for nome, roteiro, pre_processar in variantes:
+        tempos, rodadas = [], 0
+        for _ in range(args.perguntas):
+            tempo, rodadas = _pergunta(roteiro, args.latencia_modelo, audio, pre_processar)
+            tempos.append(tempo)
+        mediana = statistics.median(tempos)
+        referencia = mediana if referencia is None else referencia
+        print(f"{nome:>22s} {rodadas:8d} {mediana:12.2f} {referencia - mediana:13.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Tokens de entrada do modelo: respostas completas x compactas das ferramentas
+Reproduz as trajetórias de avaliação de tests/ no runner do ADK com o
+`ModeloRoteirizado` duas vezes, com o agente no modo completo e no modo
+compacto (`respostas_compactas=True`, ver respostas_compactas.py), e compara:
+
+- tokens das respostas das ferramentas, como entram no histórico;
+- tokens de entrada somados em todas as rodadas do modelo (`prompt_token_count`
+  do usage_metadata), que incluem a instrução reenviada a cada rodada.
+
+Os tokens são estimados (4 caracteres por token, ver modelos_falsos.py); a
+redução relativa é o que importa. A execução falha se alguma conversa sair
+da trajetória gravada em qualquer um dos modos.
+
+Uso:
+    python benchmarks/bench_tokens_respostas.py [caminhos ...]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from agente import NOME_AGENTE, ArtefatosPorSessao, criar_agente_professor  # noqa: E402
+from backends import BackendSTTFalso, configurar_backend_stt  # noqa: E402
+from bench_trajetorias import TRAJETORIAS, _pergunta_gravada, conteudo_do_marcador  # noqa: E402
+from caches import (  # noqa: E402
+    configurar_cache_analise_imagem, configurar_cache_transcricao, configurar_cache_tts,
+)
+from modelos_falsos import ConversaRoteirizada, ModeloRoteirizado, carregar_trajetorias, estimar_tokens  # noqa: E402
+
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+MODOS = ("completo", "compacto")
+
+
+async def contar_tokens(
+    runner: InMemoryRunner, artefatos: ArtefatosPorSessao, conversa: ConversaRoteirizada
+) -> Dict[str, Any]:
+    """Roda uma conversa numa sessão nova e soma os tokens de entrada do modelo."""
+    configurar_backend_stt(BackendSTTFalso(texto=_pergunta_gravada(conversa)))
+    sessao = await runner.session_service.create_session(
+        app_name=NOME_AGENTE, user_id="avaliacao", state=dict(conversa.estado_inicial)
+    )
+    armazenamento = artefatos.da_sessao(sessao.id)
+    for nome, marcador in conversa.artefatos.items():
+        armazenamento.create_artifact(
+            nome, conteudo_do_marcador(nome, marcador), pre_processar=nome.endswith(".wav")
+        )
+
+    chamadas: List[str] = []
+    tokens_respostas = 0
+    tokens_entrada = 0
+    try:
+        for turno in conversa.turnos:
+            mensagem = types.Content(role="user", parts=[types.Part(text=turno.mensagem)])
+            async for evento in runner.run_async(
+                user_id="avaliacao", session_id=sessao.id, new_message=mensagem
+            ):
+                if evento.usage_metadata is not None:
+                    tokens_entrada += evento.usage_metadata.prompt_token_count or 0
+                for parte in evento.content.parts or []:
+                    if parte.function_call:
+                        chamadas.append(parte.function_call.name)
+                    if parte.function_response:
+                        tokens_respostas += estimar_tokens(
+                            json.dumps(parte.function_response.response, ensure_ascii=False, default=str)
+                        )
+    finally:
+        artefatos.fechar(sessao.id)
+    esperadas = [nome for turno in conversa.turnos for nome, _ in turno.chamadas]
+    return {
+        "tokens_respostas": tokens_respostas,
+        "tokens_entrada": tokens_entrada,
+        "conforme": chamadas == esperadas,
+    }
+
+
+async def comparar_modos(conversas: List[ConversaRoteirizada]) -> List[Dict[str, Any]]:
+    """Contagens de cada conversa nos dois modos."""
+    runners = {}
+    for modo in MODOS:
+        artefatos = ArtefatosPorSessao()
+        agente = criar_agente_professor(
+            ModeloRoteirizado(conversas=conversas), artefatos=artefatos,
+            respostas_compactas=modo == "compacto"
+        )
+        runners[modo] = (InMemoryRunner(agent=agente, app_name=NOME_AGENTE), artefatos)
+
+    resultados = []
+    for conversa in conversas:
+        resultado: Dict[str, Any] = {"conversa": conversa.nome}
+        for modo, (runner, artefatos) in runners.items():
+            resultado[modo] = await contar_tokens(runner, artefatos, conversa)
+        resultados.append(resultado)
+    return resultados
+
+
+def _reducao(antes: int, depois: int) -> float:
+    return 100.0 * (antes - depois) / antes if antes else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("caminhos", nargs="*", type=Path, default=[TRAJETORIAS])
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", category=UserWarning, module="google.adk")
+    configurar_cache_transcricao(None)
+    configurar_cache_analise_imagem(None)
+    configurar_cache_tts(None)
+    conversas = [c for caminho in args.caminhos for c in carregar_trajetorias(caminho)]
+    resultados = asyncio.run(comparar_modos(conversas))
+
+    print(f"{'conversa':>22s} {'respostas':>10s} {'compactas':>10s} {'redução':>8s} "
+          f"{'entrada':>9s} {'compacta':>9s} {'redução':>8s} {'trajetória':>11s}")
+    totais = {modo: {"tokens_respostas": 0, "tokens_entrada": 0} for modo in MODOS}
+    for r in resultados:
+        completo, compacto = r["completo"], r["compacto"]
+        for modo in MODOS:
+            for chave in totais[modo]:
+                totais[modo][chave] += r[modo][chave]
+        conforme = completo["conforme"] and compacto["conforme"]
+        print(f"{r['conversa']:>22s} {completo['tokens_respostas']:10d} {compacto['tokens_respostas']:10d} "
+              f"{_reducao(completo['tokens_respostas'], compacto['tokens_respostas']):7.1f}% "
+              f"{completo['tokens_entrada']:9d} {compacto['tokens_entrada']:9d} "
+              f"{_reducao(completo['tokens_entrada'], compacto['tokens_entrada']):7.1f}% "
+              f"{'ok' if conforme else 'DIVERGENTE':>11s}")
+    completo, compacto = totais["completo"], totais["compacto"]
+    print(f"{'total':>22s} {completo['tokens_respostas']:10d} {compacto['tokens_respostas']:10d} "
+          f"{_reducao(completo['tokens_respostas'], compacto['tokens_respostas']):7.1f}% "
+          f"{completo['tokens_entrada']:9d} {compacto['tokens_entrada']:9d} "
+          f"{_reducao(completo['tokens_entrada'], compacto['tokens_entrada']):7.1f}%")
+    if not all(r[modo]["conforme"] for r in resultados for modo in MODOS):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Reprodução cronometrada das trajetórias de avaliação com o modelo roteirizado
+Roda as conversas dos arquivos `.test.json` / `.evalset.json` de tests/ no
+runner do ADK, com o agente de agente.py e o `ModeloRoteirizado` no lugar do
+gemini-2.5-flash: o modelo devolve exatamente as chamadas de ferramentas e as
+respostas gravadas, com latência de tokens simulada e configurável. Os
+backends são os falsos, sem latência.
+
+Para cada conversa são informados o tempo total, o tempo simulado do modelo
+e o restante, que é o custo do ADK e das ferramentas, além de conferir que as
+ferramentas chamadas seguiram a trajetória gravada (a execução falha se não).
+
+Uso:
+    python benchmarks/bench_trajetorias.py [--repeticoes 5] [--latencia-por-token 0.0]
+        [--latencia-primeiro-token 0.0] [--ferramentas assincronas] [caminhos ...]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+import ferramentas_async  # noqa: E402
+import implementation  # noqa: E402
+from agente import NOME_AGENTE, ArtefatosPorSessao, criar_agente_professor  # noqa: E402
+from backends import BackendSTTFalso, configurar_backend_stt  # noqa: E402
+from caches import (  # noqa: E402
+    configurar_cache_analise_imagem, configurar_cache_transcricao, configurar_cache_tts,
+)
+from corpus import gerar_imagem_pagina, gerar_wav  # noqa: E402
+from modelos_falsos import ConversaRoteirizada, ModeloRoteirizado, carregar_trajetorias  # noqa: E402
+
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+TRAJETORIAS = Path(__file__).resolve().parents[1] / "tests"
+
+
+def conteudo_do_marcador(nome: str, marcador: str) -> bytes:
+    """Artefato sintético para um marcador dos arquivos de avaliação."""
+    if "CORRUPT" in marcador:
+        return b"conteudo corrompido" * 16
+    if nome.endswith(".wav"):
+        return gerar_wav(4.0)
+    if "PEQUENA" in marcador:
+        return gerar_imagem_pagina(64, 48)
+    return gerar_imagem_pagina()
+
+
+def _pergunta_gravada(conversa: ConversaRoteirizada) -> str:
+    """Texto que o STT falso devolve: a pergunta analisada na trajetória gravada."""
+    for turno in conversa.turnos:
+        for nome, argumentos in turno.chamadas:
+            if nome == "analisar_necessidade_visual":
+                return argumentos["texto"]
+    return "Professor, tenho uma dúvida"
+
+
+async def reproduzir(
+    runner: InMemoryRunner,
+    artefatos: ArtefatosPorSessao,
+    modelo: ModeloRoteirizado,
+    conversa: ConversaRoteirizada
+) -> Dict[str, Any]:
+    """Roda uma conversa numa sessão nova e mede o tempo total e o do modelo."""
+    configurar_backend_stt(BackendSTTFalso(texto=_pergunta_gravada(conversa)))
+    sessao = await runner.session_service.create_session(
+        app_name=NOME_AGENTE, user_id="avaliacao", state=dict(conversa.estado_inicial)
+    )
+    armazenamento = artefatos.da_sessao(sessao.id)
+    for nome, marcador in conversa.artefatos.items():
+        armazenamento.create_artifact(
+            nome, conteudo_do_marcador(nome, marcador), pre_processar=nome.endswith(".wav")
+        )
+
+    chamadas: List[str] = []
+    modelo_antes = modelo.tempo_simulado
+    inicio = time.perf_counter()
+    try:
+        for turno in conversa.turnos:
+            mensagem = types.Content(role="user", parts=[types.Part(text=turno.mensagem)])
+            async for evento in runner.run_async(
+                user_id="avaliacao", session_id=sessao.id, new_message=mensagem
+            ):
+                chamadas.extend(p.function_call.name for p in evento.content.parts or [] if p.function_call)
+    finally:
+        total = time.perf_counter() - inicio
+        artefatos.fechar(sessao.id)
+    esperadas = [nome for turno in conversa.turnos for nome, _ in turno.chamadas]
+    return {
+        "total_s": total,
+        "modelo_s": modelo.tempo_simulado - modelo_antes,
+        "conforme": chamadas == esperadas,
+        "chamadas": len(chamadas),
+    }
+
+
+async def _executar(args, conversas: List[ConversaRoteirizada]) -> List[Dict[str, Any]]:
+    modelo = ModeloRoteirizado(
+        conversas=conversas,
+        latencia_primeiro_token=args.latencia_primeiro_token,
+        latencia_por_token=args.latencia_por_token
+    )
+    artefatos = ArtefatosPorSessao()
+    ferramentas = (
+        ferramentas_async.PROFESSOR_TOOLS_ASYNC if args.ferramentas == "assincronas"
+        else implementation.PROFESSOR_TOOLS
+    )
+    runner = InMemoryRunner(agent=criar_agente_professor(modelo, ferramentas, artefatos), app_name=NOME_AGENTE)
+
+    resultados = []
+    for conversa in conversas:
+        await reproduzir(runner, artefatos, modelo, conversa)  # aquecimento
+        medicoes = [await reproduzir(runner, artefatos, modelo, conversa) for _ in range(args.repeticoes)]
+        total = statistics.median(m["total_s"] for m in medicoes)
+        modelo_s = statistics.median(m["modelo_s"] for m in medicoes)
+        resultados.append({
+            "conversa": conversa.nome,
+            "turnos": len(conversa.turnos),
+            "chamadas": medicoes[0]["chamadas"],
+            "conforme": all(m["conforme"] for m in medicoes),
+            "total_ms": total * 1000,
+            "modelo_ms": modelo_s * 1000,
+            "sobrecarga_ms": (total - modelo_s) * 1000,
+        })
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("caminhos", nargs="*", type=Path, default=[TRAJETORIAS])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--latencia-primeiro-token", type=float, default=0.0)
+    parser.add_argument("--latencia-por-token", type=float, default=0.0)
+    parser.add_argument("--ferramentas", choices=["sincronas", "assincronas"], default="sincronas")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore", category=UserWarning, module="google.adk")
+    configurar_cache_transcricao(None)
+    configurar_cache_analise_imagem(None)
+    configurar_cache_tts(None)
+    conversas = [c for caminho in args.caminhos for c in carregar_trajetorias(caminho)]
+    resultados = asyncio.run(_executar(args, conversas))
+
+    print(f"{'conversa':>22s} {'turnos':>7s} {'chamadas':>9s} {'total ms':>9s} {'modelo ms':>10s} "
+          f"{'ADK+ferr. ms':>13s} {'por turno':>10s} {'trajetória':>11s}")
+    for r in resultados:
+        print(f"{r['conversa']:>22s} {r['turnos']:7d} {r['chamadas']:9d} {r['total_ms']:9.1f} "
+              f"{r['modelo_ms']:10.1f} {r['sobrecarga_ms']:13.1f} {r['sobrecarga_ms'] / r['turnos']:10.1f} "
+              f"{'ok' if r['conforme'] else 'DIVERGENTE':>11s}")
+    if not all(r["conforme"] for r in resultados):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
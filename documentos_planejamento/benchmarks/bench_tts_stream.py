@@ -0,0 +1,71 @@
+"""
+Benchmark do tempo até o primeiro áudio: TTS inteiro x TTS em streaming
+Compara `gerar_audio_tts` (um único artefato com a resposta toda) com
+`gerar_audio_tts_stream` (frases sintetizadas em paralelo, limitadas por
+`max_paralelo`), usando um backend falso cuja latência cresce com o número de
+caracteres, como nos serviços reais.
+
+Uso:
+    python benchmarks/bench_tts_stream.py [--atraso-por-caractere 0.003] [--paralelos 1 2 4]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from backends import BackendTTSFalso, configurar_backend_tts  # noqa: E402
+from caches import configurar_cache_tts  # noqa: E402
+from corpus import ContextoFerramentaFalso  # noqa: E402
+from ferramentas_async import gerar_audio_tts, gerar_audio_tts_stream  # noqa: E402
+
+RESPOSTA = (
+    "Muito bem, vamos resolver essa equação juntos! "
+    "Primeiro, olhe para os dois lados do sinal de igual: o que está de um lado "
+    "tem que valer o mesmo que está do outro. "
+    "Agora passamos o número 5 para o outro lado, trocando a soma por subtração. "
+    "Ficamos com 2x igual a 12. "
+    "Por último, dividimos os dois lados por 2, e descobrimos que x vale 6. "
+    "Para conferir, troque o x por 6 na equação original e veja se os dois lados ficam iguais."
+)
+
+
+async def _inteiro():
+    inicio = time.perf_counter()
+    await gerar_audio_tts(RESPOSTA, ContextoFerramentaFalso())
+    total = time.perf_counter() - inicio
+    return total, total
+
+
+async def _stream(max_paralelo):
+    inicio = time.perf_counter()
+    primeiro = None
+    async for parte in gerar_audio_tts_stream(RESPOSTA, ContextoFerramentaFalso(), max_paralelo=max_paralelo):
+        if primeiro is None:
+            primeiro = time.perf_counter() - inicio
+    return primeiro, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--atraso-por-caractere", type=float, default=0.003)
+    parser.add_argument("--paralelos", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    configurar_cache_tts(None)  # cada execução sintetiza tudo de novo
+    configurar_backend_tts(BackendTTSFalso(atraso_por_caractere=args.atraso_por_caractere))
+
+    print(f"resposta: {len(RESPOSTA)} caracteres")
+    print(f"{'modo':22s} {'1º áudio (s)':>13s} {'total (s)':>10s}")
+    primeiro, total = asyncio.run(_inteiro())
+    print(f"{'inteiro':22s} {primeiro:13.3f} {total:10.3f}")
+    for max_paralelo in args.paralelos:
+        primeiro, total = asyncio.run(_stream(max_paralelo))
+        print(f"{f'stream (paralelo={max_paralelo})':22s} {primeiro:13.3f} {total:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
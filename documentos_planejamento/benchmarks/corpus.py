@@ -0,0 +1,255 @@
+"""
+Corpora sintéticos para os benchmarks do Professor Virtual
+Gera transcrições com o tamanho e o vocabulário típicos das perguntas gravadas
+pelas crianças, arquivos de áudio (WAV, MP3, M4A) com cabeçalhos válidos e
+fotos sintéticas de páginas de exercício, de forma determinística (semente fixa).
+Também traz o ToolContext falso com que benchmarks e testes chamam as
+ferramentas diretamente, fora do runner do ADK.
+"""
+
+import io
+import itertools
+import math
+import random
+import struct
+import wave
+from typing import Dict, List, Optional
+
+
+class ArtefatoFalso:
+    """Artefato mínimo com a interface usada pelas ferramentas."""
+
+    def __init__(self, name, content, mime_type=None, version=0):
+        self.name = name
+        self.content = content
+        self.mime_type = mime_type
+        self.version = version
+
+
+_IDS_SESSAO = itertools.count(1)
+_VERSOES = itertools.count(1)
+
+
+class SessaoFalsa:
+    """Sessão em memória com `id` único e get_artifact/create_artifact."""
+
+    def __init__(self):
+        self.id = f"sessao_falsa_{next(_IDS_SESSAO)}"
+        self.artefatos = {}
+
+    def get_artifact(self, name):
+        return self.artefatos.get(name)
+
+    def create_artifact(self, name, content, mime_type=None):
+        self.artefatos[name] = ArtefatoFalso(name, content, mime_type, next(_VERSOES))
+
+
+class ContextoFerramentaFalso:
+    """Substituto de ToolContext para chamar as ferramentas diretamente.
+
+    Args:
+        artefatos: Artefatos iniciais da sessão (nome -> bytes).
+    """
+
+    def __init__(self, artefatos: Optional[Dict[str, bytes]] = None):
+        self.session = SessaoFalsa()
+        self.state = {}
+        for nome, dados in (artefatos or {}).items():
+            self.session.create_artifact(nome, dados)
+
+    def adicionar_artefato(self, name, content, mime_type=None):
+        self.session.create_artifact(name, content, mime_type)
+        return name
+
+
+_ABERTURAS = [
+    "professor", "oi", "então", "tipo assim", "é que", "ô professor", "olha só",
+]
+_PERGUNTAS_VISUAIS = [
+    "não entendi esse exercício aqui de matemática",
+    "olha esse problema aqui, não sei fazer",
+    "o que significa isso que tá mostrando no gráfico",
+    "me ajude com isso aqui da questão três",
+    "o que é isso no desenho da página",
+    "ta escrito uma coisa aí que eu não sei ler",
+    "essa figura do livro mostra o que",
+    "nao compreendi essa parte do diagrama",
+]
+_PERGUNTAS_TEXTUAIS = [
+    "o que é fotossíntese",
+    "como resolver uma equação do primeiro grau",
+    "por que o céu é azul",
+    "quantos continentes existem no mundo",
+    "qual é o plural de cidadão",
+    "como a gente faz uma conta de multiplicação com dois números",
+    "o que aconteceu no passado com os dinossauros",
+    "qual é o maior oceano do planeta",
+]
+_ENCHIMENTOS = [
+    "a professora falou que era pra hoje",
+    "eu tentei fazer sozinho mas não deu certo",
+    "minha mãe também não sabe",
+    "é pra entregar amanhã cedo",
+    "eu fiquei com dúvida na parte do meio",
+    "a gente viu isso na aula passada",
+]
+
+
+def gerar_transcricoes(quantidade: int, semente: int = 42) -> List[str]:
+    """Gera transcrições de 15 a 80 palavras, metade com referências visuais."""
+    rng = random.Random(semente)
+    transcricoes = []
+    for i in range(quantidade):
+        partes = [rng.choice(_ABERTURAS)]
+        perguntas = _PERGUNTAS_VISUAIS if i % 2 == 0 else _PERGUNTAS_TEXTUAIS
+        partes.append(rng.choice(perguntas))
+        for _ in range(rng.randint(1, 6)):
+            partes.append(rng.choice(_ENCHIMENTOS))
+        if rng.random() < 0.3:
+            partes.append(rng.choice(_PERGUNTAS_TEXTUAIS + _PERGUNTAS_VISUAIS))
+        texto = ", ".join(partes) + "?"
+        transcricoes.append(texto[0].upper() + texto[1:])
+    return transcricoes
+
+
+# --- Áudio ---
+
+def gerar_wav(
+    duracao_segundos: float,
+    taxa_amostragem: int = 16000,
+    canais: int = 1,
+    frequencia_hz: float = 220.0,
+    amplitude: float = 0.3,
+    silencio_segundos: float = 0.0
+) -> bytes:
+    """Gera um WAV PCM 16 bits com um tom senoidal (amplitude 0 = silêncio).
+    
+    `silencio_segundos` acrescenta silêncio antes e depois do tom, como nas
+    gravações reais, sem contar em `duracao_segundos`.
+    """
+    n = int(duracao_segundos * taxa_amostragem)
+    passo = 2 * math.pi * frequencia_hz / taxa_amostragem
+    pico = int(amplitude * 32767)
+    amostras = [int(pico * math.sin(passo * i)) for i in range(n)] if pico else [0] * n
+    silencio = [0] * int(silencio_segundos * taxa_amostragem)
+    amostras = silencio + amostras + silencio
+    if canais > 1:
+        amostras = [a for a in amostras for _ in range(canais)]
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as arquivo:
+        arquivo.setnchannels(canais)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(taxa_amostragem)
+        arquivo.writeframes(struct.pack(f"<{len(amostras)}h", *amostras))
+    return buffer.getvalue()
+
+
+_INDICES_KBPS_MPEG1_L3 = {32: 1, 64: 5, 96: 7, 128: 9, 192: 11, 256: 13, 320: 14}
+_INDICES_TAXA_MPEG1 = {44100: 0, 48000: 1, 32000: 2}
+
+
+def gerar_mp3(
+    duracao_segundos: float,
+    kbps: int = 128,
+    taxa_amostragem: int = 44100,
+    canais: int = 2,
+    com_xing: bool = False
+) -> bytes:
+    """Gera um MP3 (MPEG-1 Layer III) com quadros válidos e payload zerado.
+    
+    Com `com_xing`, o primeiro quadro leva um cabeçalho Xing com o total de quadros.
+    """
+    quadros = max(1, round(duracao_segundos * taxa_amostragem / 1152))
+    modo = 0b11 if canais == 1 else 0b00
+    cabecalho = struct.pack(
+        ">I",
+        0xFFE00000 | (0b11 << 19) | (0b01 << 17) | (1 << 16)
+        | (_INDICES_KBPS_MPEG1_L3[kbps] << 12) | (_INDICES_TAXA_MPEG1[taxa_amostragem] << 10)
+        | (modo << 6)
+    )
+    tamanho = 144 * kbps * 1000 // taxa_amostragem
+    quadro = cabecalho + bytes(tamanho - 4)
+    partes = [b"ID3\x04\x00\x00\x00\x00\x00\x0a" + bytes(10)]  # tag ID3v2 vazia
+    if com_xing:
+        deslocamento = 32 if canais == 2 else 17
+        xing = b"Xing" + struct.pack(">II", 1, quadros)
+        partes.append(cabecalho + bytes(deslocamento) + xing + bytes(tamanho - 4 - deslocamento - 12))
+    partes.extend([quadro] * quadros)
+    return b"".join(partes)
+
+
+def _atomo(tipo: bytes, *conteudo: bytes) -> bytes:
+    corpo = b"".join(conteudo)
+    return struct.pack(">I", 8 + len(corpo)) + tipo + corpo
+
+
+def gerar_m4a(
+    duracao_segundos: float,
+    taxa_amostragem: int = 44100,
+    canais: int = 2,
+    kbps: int = 96
+) -> bytes:
+    """Gera um M4A (AAC) com a árvore de átomos moov completa e mdat zerado."""
+    amostras = int(duracao_segundos * taxa_amostragem)
+    mvhd = _atomo(b"mvhd", struct.pack(">B3xIIII", 0, 0, 0, 1000, int(duracao_segundos * 1000)), bytes(80))
+    mdhd = _atomo(b"mdhd", struct.pack(">B3xIIII", 0, 0, 0, taxa_amostragem, amostras), bytes(4))
+    hdlr = _atomo(b"hdlr", bytes(8), b"soun", bytes(13))
+    entrada = _atomo(
+        b"mp4a", bytes(6), struct.pack(">H", 1), bytes(8),
+        struct.pack(">HHHHI", canais, 16, 0, 0, taxa_amostragem << 16)
+    )
+    stsd = _atomo(b"stsd", struct.pack(">II", 0, 1), entrada)
+    trak = _atomo(b"trak", _atomo(b"mdia", mdhd, hdlr, _atomo(b"minf", _atomo(b"stbl", stsd))))
+    ftyp = _atomo(b"ftyp", b"M4A ", struct.pack(">I", 0), b"M4A mp42isom")
+    mdat = _atomo(b"mdat", bytes(int(duracao_segundos * kbps * 1000 / 8)))
+    return ftyp + _atomo(b"moov", mvhd, trak) + mdat
+
+
+def gerar_imagem_pagina(
+    largura: int = 1280,
+    altura: int = 960,
+    formato: str = "JPEG",
+    desfoque: float = 0.0,
+    fundo: int = 235,
+    tinta: int = 30,
+    semente: int = 42,
+    borda_mesa: int = 0,
+    orientacao_exif: int = 1,
+    qualidade: int = 75
+) -> bytes:
+    """Gera a "foto" de uma página com linhas de texto (requer Pillow).
+
+    Args:
+        desfoque: Raio do desfoque gaussiano aplicado (0 = nítida).
+        fundo: Tom de cinza do papel; valores baixos imitam foto escura.
+        tinta: Tom de cinza das letras.
+        borda_mesa: Pixels de "mesa" escura em volta da página, por lado.
+        orientacao_exif: Tag EXIF de orientação gravada no JPEG (1 = normal).
+        qualidade: Qualidade JPEG.
+    """
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = random.Random(semente)
+    imagem = Image.new("L", (largura, altura), fundo)
+    desenho = ImageDraw.Draw(imagem)
+    altura_linha = max(altura // 24, 8)
+    for topo in range(altura_linha, altura - altura_linha, altura_linha * 2):
+        x = largura // 20
+        while x < largura * 0.9:
+            palavra = rng.randint(largura // 40, largura // 10)
+            desenho.rectangle([x, topo, x + palavra, topo + altura_linha // 2], fill=tinta)
+            x += palavra + largura // 60
+    if desfoque:
+        imagem = imagem.filter(ImageFilter.GaussianBlur(desfoque))
+    if borda_mesa:
+        mesa = Image.new("L", (largura + 2 * borda_mesa, altura + 2 * borda_mesa), 70)
+        mesa.paste(imagem, (borda_mesa, borda_mesa))
+        imagem = mesa
+    saida = io.BytesIO()
+    opcoes = {"quality": qualidade} if formato == "JPEG" else {}
+    if orientacao_exif != 1:
+        exif = Image.Exif()
+        exif[0x0112] = orientacao_exif
+        opcoes["exif"] = exif.tobytes()
+    imagem.convert("RGB").save(saida, format=formato, **opcoes)
+    return saida.getvalue()
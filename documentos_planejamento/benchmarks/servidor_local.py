@@ -0,0 +1,146 @@
+"""
+Servidor HTTP local que imita o gateway de STT, visão e TTS
+Implementa o contrato de documentos_oficiais/backends_http.py com respostas
+determinísticas, HTTP/1.1 keep-alive e latência configurável, para testes e
+testes de carga sem nenhum serviço na nuvem. Conta conexões e requisições e
+permite programar falhas (HTTP 503) para exercitar o disjuntor.
+
+Uso:
+    with ServidorLocal(latencia=0.2) as servidor:
+        configurar_backends({"stt": {"tipo": "http", "url_base": servidor.url_base}})
+
+    python benchmarks/servidor_local.py [--porta 8080] [--latencia 0.2]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Union
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "documentos_oficiais"))
+
+from backends import TEXTO_TRANSCRICAO_SIMULADA, BackendVisaoFalso  # noqa: E402
+
+
+class ServidorLocal:
+    """Gateway falso em uma thread de fundo (porta 0 = escolhida pelo sistema).
+
+    Args:
+        latencia: Segundos de espera antes de cada resposta, ou dict por rota
+                  (ex: {"/stt": 0.3, "/visao": 0.5}).
+        texto: Transcrição devolvida por /stt.
+        porta: Porta TCP local.
+    """
+
+    def __init__(self, latencia: Union[float, Dict[str, float]] = 0.0, texto: str = TEXTO_TRANSCRICAO_SIMULADA, porta: int = 0):
+        self.latencia = latencia
+        self.texto = texto
+        self.falhas_programadas = 0
+        self.conexoes = 0
+        self.requisicoes = 0
+        self.em_andamento = 0
+        self.maximo_simultaneo = 0
+        self._lock = threading.Lock()
+        self._http = ThreadingHTTPServer(("127.0.0.1", porta), _criar_manipulador(self))
+        self._http.daemon_threads = True
+        self._thread = None
+        self._visao = BackendVisaoFalso()
+
+    @property
+    def url_base(self) -> str:
+        host, porta = self._http.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    def iniciar(self) -> "ServidorLocal":
+        self._thread = threading.Thread(target=self._http.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> None:
+        self._http.shutdown()
+        self._http.server_close()
+
+    def __enter__(self) -> "ServidorLocal":
+        return self.iniciar()
+
+    def __exit__(self, *excecao) -> None:
+        self.parar()
+
+    def _responder(self, caminho: str, consulta: dict, corpo: bytes):
+        """Retorna (status, content-type, bytes) para a rota pedida."""
+        with self._lock:
+            if self.falhas_programadas > 0:
+                self.falhas_programadas -= 1
+                return 503, "text/plain", b"indisponivel"
+        if caminho == "/stt":
+            return 200, "application/json", json.dumps({"texto": self.texto}).encode("utf-8")
+        if caminho == "/visao":
+            analise = self._visao.analisar(corpo, consulta.get("contexto", [""])[0])
+            return 200, "application/json", json.dumps(analise, ensure_ascii=False).encode("utf-8")
+        if caminho == "/tts":
+            texto = json.loads(corpo)["texto"]
+            return 200, "audio/mpeg", b"audio_data_simulado_tts_" + texto.encode("utf-8")
+        return 404, "text/plain", b"rota desconhecida"
+
+
+def _criar_manipulador(servidor: ServidorLocal):
+    class Manipulador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # mantém a conexão aberta entre requisições
+        disable_nagle_algorithm = True  # cabeçalhos e corpo saem em writes separados
+
+        def setup(self):
+            super().setup()
+            with servidor._lock:
+                servidor.conexoes += 1
+
+        def do_POST(self):
+            corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with servidor._lock:
+                servidor.requisicoes += 1
+                servidor.em_andamento += 1
+                servidor.maximo_simultaneo = max(servidor.maximo_simultaneo, servidor.em_andamento)
+            try:
+                url = urlsplit(self.path)
+                latencia = servidor.latencia
+                if isinstance(latencia, dict):
+                    latencia = latencia.get(url.path, 0.0)
+                if latencia:
+                    time.sleep(latencia)
+                status, tipo, dados = servidor._responder(url.path, parse_qs(url.query), corpo)
+            finally:
+                with servidor._lock:
+                    servidor.em_andamento -= 1
+            self.send_response(status)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def log_message(self, formato, *args):
+            pass  # sem log por requisição
+
+    return Manipulador
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--latencia", type=float, default=0.0)
+    args = parser.parse_args()
+    servidor = ServidorLocal(latencia=args.latencia, porta=args.porta)
+    print(f"gateway local em {servidor.url_base} (Ctrl+C para sair)")
+    servidor.iniciar()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Agente Professor Virtual para o runner do ADK
+Monta o LlmAgent descrito em architecture.json: nome, modelo, instrução
+dinâmica (instruction_providers.py), ferramentas e generate_content_config.
+
+As ferramentas acessam os artefatos por `tool_context.session.get_artifact` e
+`create_artifact` (ver artefatos.py), que a Session do ADK não tem. Cada
+ferramenta registrada no agente recebe, no lugar do ToolContext, um contexto
+que entrega os artefatos de um `ArmazenamentoArtefatos` próprio da sessão
+(armazenamento_artefatos.py) e delega todo o resto ao ToolContext original.
+Com `respostas_compactas=True`, as respostas das ferramentas chegam ao modelo
+no formato compacto de respostas_compactas.py, com os mesmos nomes de campo
+que a instrução usa.
+
+O aplicativo grava a pergunta no armazenamento da sessão antes de enviar a
+mensagem que a referencia:
+
+    artefatos = ArtefatosPorSessao()
+    agente = criar_agente_professor(artefatos=artefatos)
+    runner = InMemoryRunner(agent=agente, app_name="professor_virtual")
+    ...
+    artefatos.da_sessao(sessao.id).create_artifact("pergunta_123.wav", audio, pre_processar=True)
+
+O áudio gravado assim já começa a ser transcrito e analisado em segundo
+plano, antes de o modelo chamar a ferramenta (ver pre_processamento.py); os
+artefatos salvos pelas ferramentas passam por `_SessaoComArtefatos` e nunca
+são pré-processados.
+"""
+
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Optional, Union
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm
+from google.genai import types
+
+from armazenamento_artefatos import MAX_BYTES_MEMORIA, ArmazenamentoArtefatos, OrcamentoMemoria
+from implementation import PROFESSOR_TOOLS
+from instruction_providers import professor_instruction_provider
+from respostas_compactas import compactar_resposta
+
+NOME_AGENTE = "professor_virtual"
+MODELO_PADRAO = "gemini-2.5-flash"
+
+
+class ArtefatosPorSessao:
+    """Um ArmazenamentoArtefatos por sessão do ADK, criado no primeiro acesso.
+
+    Todos os armazenamentos dividem um único `OrcamentoMemoria`: o limite de
+    memória vale para a soma das sessões, não para cada uma.
+
+    Args:
+        fabrica: Cria o armazenamento de uma sessão nova; recebe `id_sessao`
+                 (o ArmazenamentoArtefatos o usa para o pré-processamento) e
+                 `orcamento`, o orçamento de memória compartilhado.
+        max_bytes_memoria: Total de bytes em memória somando todas as sessões.
+    """
+
+    def __init__(
+        self,
+        fabrica: Callable[..., Any] = ArmazenamentoArtefatos,
+        max_bytes_memoria: int = MAX_BYTES_MEMORIA
+    ):
+        self._fabrica = fabrica
+        self.orcamento = OrcamentoMemoria(max_bytes_memoria)
+        self._armazenamentos: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def da_sessao(self, id_sessao: str) -> Any:
+        """Armazenamento de artefatos da sessão `id_sessao`."""
+        with self._lock:
+            if id_sessao not in self._armazenamentos:
+                self._armazenamentos[id_sessao] = self._fabrica(id_sessao=id_sessao, orcamento=self.orcamento)
+            return self._armazenamentos[id_sessao]
+
+    def fechar(self, id_sessao: str) -> None:
+        """Descarta os artefatos de uma sessão encerrada."""
+        with self._lock:
+            armazenamento = self._armazenamentos.pop(id_sessao, None)
+        if armazenamento is not None and hasattr(armazenamento, "fechar"):
+            armazenamento.fechar()
+
+    def contexto(self, tool_context: Any) -> "_ContextoComArtefatos":
+        """Contexto para as ferramentas, com os artefatos da sessão do `tool_context`."""
+        sessao = tool_context.session
+        return _ContextoComArtefatos(tool_context, _SessaoComArtefatos(sessao, self.da_sessao(sessao.id)))
+
+
+class _SessaoComArtefatos:
+    """Sessão do ADK com a API de artefatos usada pelas ferramentas."""
+
+    def __init__(self, sessao_adk: Any, armazenamento: Any):
+        self.id = sessao_adk.id
+        self.sessao_adk = sessao_adk
+        self.armazenamento = armazenamento
+
+    def get_artifact(self, name: str) -> Any:
+        return self.armazenamento.get_artifact(name)
+
+    def create_artifact(self, name: str, content: Any, mime_type: Optional[str] = None) -> None:
+        self.armazenamento.create_artifact(name, content, mime_type)
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(self.sessao_adk, nome)
+
+
+class _ContextoComArtefatos:
+    """ToolContext do ADK com a sessão trocada por `_SessaoComArtefatos`."""
+
+    def __init__(self, tool_context: Any, sessao: _SessaoComArtefatos):
+        self._tool_context = tool_context
+        self.session = sessao
+
+    @property
+    def state(self) -> Any:
+        return self._tool_context.state
+
+    def __getattr__(self, nome: str) -> Any:
+        return getattr(self._tool_context, nome)
+
+
+def _adaptar_ferramenta(
+    funcao: Callable[..., Any], artefatos: ArtefatosPorSessao, compactar: bool
+) -> Callable[..., Any]:
+    """Envolve a ferramenta para receber o contexto com artefatos e, se pedido,
+    devolver a resposta compacta (mantém a assinatura)."""
+    def resposta(resultado: Any) -> Any:
+        return compactar_resposta(resultado) if compactar and isinstance(resultado, dict) else resultado
+
+    if inspect.iscoroutinefunction(funcao):
+        @functools.wraps(funcao)
+        async def adaptada_async(*args: Any, **kwargs: Any) -> Any:
+            kwargs["tool_context"] = artefatos.contexto(kwargs["tool_context"])
+            return resposta(await funcao(*args, **kwargs))
+        return adaptada_async
+
+    @functools.wraps(funcao)
+    def adaptada(*args: Any, **kwargs: Any) -> Any:
+        kwargs["tool_context"] = artefatos.contexto(kwargs["tool_context"])
+        return resposta(funcao(*args, **kwargs))
+    return adaptada
+
+
+def criar_agente_professor(
+    modelo: Union[str, BaseLlm] = MODELO_PADRAO,
+    ferramentas: Optional[Dict[str, Callable[..., Any]]] = None,
+    artefatos: Optional[ArtefatosPorSessao] = None,
+    respostas_compactas: bool = False
+) -> LlmAgent:
+    """Cria o LlmAgent do Professor Virtual.
+
+    Args:
+        modelo: Nome do modelo ou instância de BaseLlm (ex: um modelo falso
+                para medições offline).
+        ferramentas: Registro de ferramentas; None usa PROFESSOR_TOOLS. Com
+                     muitas sessões simultâneas, prefira PROFESSOR_TOOLS_ASYNC
+                     (ferramentas_async.py), que não bloqueia o event loop.
+        artefatos: Armazenamentos por sessão; None cria um novo.
+        respostas_compactas: Entrega ao modelo as respostas compactas das
+                             ferramentas (menos tokens de entrada por rodada).
+
+    Returns:
+        O agente, pronto para um Runner do ADK.
+    """
+    ferramentas = PROFESSOR_TOOLS if ferramentas is None else ferramentas
+    artefatos = artefatos or ArtefatosPorSessao()
+    return LlmAgent(
+        name=NOME_AGENTE,
+        model=modelo,
+        instruction=professor_instruction_provider,
+        tools=[
+            _adaptar_ferramenta(funcao, artefatos, respostas_compactas) for funcao in ferramentas.values()
+        ],
+        generate_content_config=types.GenerateContentConfig(
+            temperature=0.7,
+            max_output_tokens=1000,
+            response_mime_type="text/plain"
+        )
+    )
@@ -0,0 +1,293 @@
+"""
+Armazenamento de artefatos com transbordo para disco do Professor Virtual ADK
+Gravações de áudio, fotos e respostas TTS ficam na sessão durante toda a
+conversa; mantidas em memória, com centenas de crianças simultâneas, dominam o
+consumo de RAM do processo. Este armazenamento mantém em memória apenas os
+artefatos pequenos e, acima de um limite por artefato (ou quando o total em
+memória passa do orçamento), grava o conteúdo em disco e o serve por `mmap`:
+as páginas são do arquivo, carregadas sob demanda e descartáveis pelo sistema.
+O orçamento (`OrcamentoMemoria`) pode ser dividido por vários armazenamentos:
+os de todas as sessões de um `ArtefatosPorSessao` (agente.py) somam num único
+total, e os artefatos mais antigos vão para disco seja qual for a sessão.
+
+Expõe a mesma API de artefatos usada pelas ferramentas (`get_artifact`,
+`create_artifact`; artefatos com `name`, `content`, `mime_type`), além de `size`
+e `read_range` para o acesso preguiçoso de artefatos.py e de `version`, que
+muda a cada gravação (usada pela memoização por sessão, memoizacao_sessao.py). Uma sessão pode
+delegar seus artefatos a ele:
+
+    armazenamento = ArmazenamentoArtefatos()
+    sessao.get_artifact = armazenamento.get_artifact
+    sessao.create_artifact = armazenamento.create_artifact
+
+Com `id_sessao`, a pergunta gravada pelo aluno e salva com
+`pre_processar=True` tem o pré-processamento (transcrição e análises)
+agendado na hora, ver pre_processamento.py.
+
+O `content` de um artefato em disco é um memoryview somente leitura do mapa,
+aceito por todas as ferramentas no lugar de bytes. Cada mapa aberto prende um
+descritor de arquivo (o mmap duplica o do arquivo, exceto com `trackfd=False`
+no Python 3.13+); no máximo MAX_MAPAS_ABERTOS ficam abertos no processo e os
+menos usados recentemente são fechados, sendo reabertos no próximo acesso.
+"""
+
+import itertools
+import mmap
+import os
+import tempfile
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+from pre_processamento import agendar_pre_processamento, descartar_pre_processamento
+
+Dados = Union[bytes, bytearray, memoryview]
+
+MAX_MAPAS_ABERTOS = 256
+MAX_BYTES_MEMORIA = 32 * 1024 * 1024
+
+# Sem o descritor duplicado, o mapa não conta para o limite de arquivos abertos
+_OPCOES_MMAP = {"trackfd": False} if sys.version_info >= (3, 13) else {}
+
+# Versões crescentes no processo e entre reinícios (partem do relógio): um
+# artefato regravado nunca repete a versão do anterior, nem depois de o
+# processo reiniciar com o estado das sessões persistido
+_versoes = itertools.count(time.time_ns())
+
+# Artefatos com mapa aberto, do menos para o mais usado recentemente
+_mapas_abertos: "OrderedDict[ArtefatoEmDisco, None]" = OrderedDict()
+_lock_mapas = threading.Lock()
+
+
+def mapas_abertos() -> int:
+    """Quantidade de artefatos em disco com o mapa aberto no processo."""
+    return len(_mapas_abertos)
+
+
+class ArtefatoEmMemoria:
+    """Artefato pequeno mantido em memória."""
+
+    def __init__(self, name: str, content: bytes, mime_type: Optional[str] = None, version: int = 0):
+        self.name = name
+        self.content = content
+        self.mime_type = mime_type
+        self.version = version
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    def read_range(self, inicio: int, fim: int) -> bytes:
+        return self.content[inicio:fim]
+
+
+class ArtefatoEmDisco:
+    """Artefato gravado em arquivo e servido por mmap (aberto no primeiro acesso)."""
+
+    def __init__(
+        self, name: str, caminho: str, size: int, mime_type: Optional[str] = None, version: int = 0
+    ):
+        self.name = name
+        self.caminho = caminho
+        self.size = size
+        self.mime_type = mime_type
+        self.version = version
+        self._mapa: Optional[mmap.mmap] = None
+
+    @property
+    def content(self) -> memoryview:
+        with _lock_mapas:
+            if self._mapa is None:
+                with open(self.caminho, "rb") as arquivo:
+                    self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ, **_OPCOES_MMAP)
+                _mapas_abertos[self] = None
+                while len(_mapas_abertos) > MAX_MAPAS_ABERTOS:
+                    antigo, _ = _mapas_abertos.popitem(last=False)
+                    antigo._fechar_mapa()
+            else:
+                _mapas_abertos.move_to_end(self)
+            return memoryview(self._mapa)
+
+    def read_range(self, inicio: int, fim: int) -> bytes:
+        with open(self.caminho, "rb") as arquivo:
+            arquivo.seek(inicio)
+            return arquivo.read(max(0, min(fim, self.size) - inicio))
+
+    def descartar(self) -> None:
+        """Apaga o arquivo; o mapa fecha agora ou quando o último memoryview for liberado."""
+        try:
+            os.remove(self.caminho)
+        except FileNotFoundError:
+            pass
+        with _lock_mapas:
+            _mapas_abertos.pop(self, None)
+            self._fechar_mapa()
+
+    def _fechar_mapa(self) -> None:
+        if self._mapa is not None:
+            try:
+                self._mapa.close()
+            except BufferError:
+                pass  # ainda há memoryviews em uso; o mapa fecha quando forem liberados
+            self._mapa = None
+
+
+class OrcamentoMemoria:
+    """Orçamento de bytes em memória dividido pelos armazenamentos que o usam.
+
+    Registra os artefatos em memória de todos eles, do mais antigo para o mais
+    novo; quando o total passa de `max_bytes`, os mais antigos são escolhidos
+    para ir para disco, seja qual for o armazenamento dono.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES_MEMORIA):
+        self.max_bytes = max_bytes
+        self.bytes_em_memoria = 0
+        self._artefatos: "OrderedDict[ArtefatoEmMemoria, ArmazenamentoArtefatos]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(
+        self, artefato: ArtefatoEmMemoria, dono: "ArmazenamentoArtefatos"
+    ) -> List[Any]:
+        """Conta o artefato e devolve os pares (dono, artefato) a mandar para disco."""
+        excedentes = []
+        with self._lock:
+            self._artefatos[artefato] = dono
+            self.bytes_em_memoria += artefato.size
+            while self.bytes_em_memoria > self.max_bytes and self._artefatos:
+                antigo, dono_antigo = self._artefatos.popitem(last=False)
+                self.bytes_em_memoria -= antigo.size
+                excedentes.append((dono_antigo, antigo))
+        return excedentes
+
+    def liberar(self, artefato: ArtefatoEmMemoria) -> None:
+        """Desconta um artefato que saiu da memória (substituído ou apagado)."""
+        with self._lock:
+            if self._artefatos.pop(artefato, None) is not None:
+                self.bytes_em_memoria -= artefato.size
+
+
+class ArmazenamentoArtefatos:
+    """Artefatos em memória até um limite; o excedente vai para disco.
+
+    Args:
+        limite_por_artefato: Artefatos maiores que isso (bytes) vão direto para disco.
+        max_bytes_memoria: Orçamento total em memória quando não há `orcamento`
+                           compartilhado; ao ultrapassá-lo, os artefatos
+                           pequenos mais antigos também vão para disco.
+        diretorio: Onde gravar (None = diretório temporário removido em `fechar`).
+        id_sessao: Sessão dona dos artefatos; com ela, os uploads salvos com
+                   `pre_processar=True` têm o pré-processamento agendado
+                   (None = sem pré-processamento).
+        orcamento: Orçamento dividido com outros armazenamentos (ex: o de
+                   `ArtefatosPorSessao`); None cria um só deste armazenamento.
+    """
+
+    def __init__(
+        self,
+        limite_por_artefato: int = 256 * 1024,
+        max_bytes_memoria: int = MAX_BYTES_MEMORIA,
+        diretorio: Optional[str] = None,
+        id_sessao: Optional[str] = None,
+        orcamento: Optional[OrcamentoMemoria] = None
+    ):
+        self.limite_por_artefato = limite_por_artefato
+        self.id_sessao = id_sessao
+        self.orcamento = orcamento or OrcamentoMemoria(max_bytes_memoria)
+        self._temporario = None
+        if diretorio is None:
+            self._temporario = tempfile.TemporaryDirectory(prefix="professor_artefatos_")
+            diretorio = self._temporario.name
+        self.diretorio = diretorio
+        self._artefatos: "OrderedDict[str, Any]" = OrderedDict()
+        self._sequencia = itertools.count()
+        self._lock = threading.Lock()
+        self.bytes_em_memoria = 0
+        self.bytes_em_disco = 0
+
+    def get_artifact(self, name: str) -> Optional[Any]:
+        return self._artefatos.get(name)
+
+    def create_artifact(
+        self,
+        name: str,
+        content: Dados,
+        mime_type: Optional[str] = None,
+        pre_processar: bool = False
+    ) -> None:
+        """Salva o artefato; `pre_processar=True` marca a pergunta gravada pelo aluno.
+
+        Só o aplicativo, ao receber o upload, pede o pré-processamento; os
+        artefatos salvos pelas ferramentas (ex: respostas TTS) não o têm.
+        """
+        excedentes = []
+        with self._lock:
+            self._remover(name)
+            versao = next(_versoes)
+            if len(content) > self.limite_por_artefato:
+                artefato = self._gravar(name, content, mime_type, versao)
+            else:
+                artefato = ArtefatoEmMemoria(name, bytes(content), mime_type, versao)
+                self.bytes_em_memoria += artefato.size
+                excedentes = self.orcamento.registrar(artefato, self)
+            self._artefatos[name] = artefato
+        # Fora do lock: os excedentes podem ser de outro armazenamento
+        for dono, antigo in excedentes:
+            dono._transbordar(antigo)
+        if pre_processar and self.id_sessao is not None:
+            agendar_pre_processamento(self.id_sessao, name, artefato)
+
+    def delete_artifact(self, name: str) -> None:
+        with self._lock:
+            self._remover(name)
+
+    def list_artifacts(self) -> List[str]:
+        return list(self._artefatos)
+
+    def estatisticas(self) -> Dict[str, int]:
+        em_disco = sum(isinstance(a, ArtefatoEmDisco) for a in self._artefatos.values())
+        return {
+            "artefatos": len(self._artefatos),
+            "artefatos_em_disco": em_disco,
+            "bytes_em_memoria": self.bytes_em_memoria,
+            "bytes_em_disco": self.bytes_em_disco,
+        }
+
+    def fechar(self) -> None:
+        """Descarta todos os artefatos, os pré-processamentos e o diretório temporário."""
+        with self._lock:
+            for name in list(self._artefatos):
+                self._remover(name)
+        if self.id_sessao is not None:
+            descartar_pre_processamento(self.id_sessao)
+        if self._temporario is not None:
+            self._temporario.cleanup()
+            self._temporario = None
+
+    def _gravar(self, name: str, content: Dados, mime_type: Optional[str], version: int) -> ArtefatoEmDisco:
+        caminho = os.path.join(self.diretorio, f"{next(self._sequencia):08d}.bin")
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(content)
+        self.bytes_em_disco += len(content)
+        return ArtefatoEmDisco(name, caminho, len(content), mime_type, version)
+
+    def _remover(self, name: str) -> None:
+        artefato = self._artefatos.pop(name, None)
+        if isinstance(artefato, ArtefatoEmDisco):
+            self.bytes_em_disco -= artefato.size
+            artefato.descartar()
+        elif artefato is not None:
+            self.bytes_em_memoria -= artefato.size
+            self.orcamento.liberar(artefato)
+
+    def _transbordar(self, artefato: ArtefatoEmMemoria) -> None:
+        """Passa para disco um artefato escolhido pelo orçamento, se ainda for o atual."""
+        with self._lock:
+            if self._artefatos.get(artefato.name) is not artefato:
+                return  # substituído, apagado ou armazenamento fechado nesse meio-tempo
+            self._artefatos[artefato.name] = self._gravar(
+                artefato.name, artefato.content, artefato.mime_type, artefato.version
+            )
+            self.bytes_em_memoria -= artefato.size
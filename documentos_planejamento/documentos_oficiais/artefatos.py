@@ -0,0 +1,63 @@
+"""
+Acesso preguiçoso aos artefatos da sessão para o Professor Virtual ADK
+As ferramentas validam tamanho, formato e bytes mágicos antes de usar o
+conteúdo; com este acesso essas verificações usam só os metadados e um trecho
+inicial do artefato, e o conteúdo completo só é lido quando a ferramenta
+realmente precisa dele. Um upload grande demais é rejeitado sem ser copiado.
+
+Artefatos que expõem `size` e `read_range(inicio, fim)` (ex: os guardados em
+disco) são lidos por partes; os demais caem no `content` em memória, que já
+está carregado.
+"""
+
+from typing import Any, Optional
+
+TAMANHO_CABECALHO_PADRAO = 64 * 1024
+
+
+class ArtefatoLeitura:
+    """Visão preguiçosa de um artefato: metadados primeiro, conteúdo sob demanda."""
+
+    def __init__(self, artefato: Any):
+        self._artefato = artefato
+        self._conteudo: Optional[bytes] = None
+
+    @property
+    def nome(self) -> str:
+        return self._artefato.name
+
+    @property
+    def mime_type(self) -> Optional[str]:
+        return getattr(self._artefato, "mime_type", None)
+
+    @property
+    def tamanho(self) -> int:
+        tamanho = getattr(self._artefato, "size", None)
+        return tamanho if tamanho is not None else len(self.conteudo())
+
+    @property
+    def extensao(self) -> str:
+        return self.nome.split('.')[-1] if '.' in self.nome else "desconhecido"
+
+    def cabecalho(self, tamanho: int = TAMANHO_CABECALHO_PADRAO) -> memoryview:
+        """Primeiros `tamanho` bytes do artefato, sem ler o restante."""
+        if self._conteudo is None and hasattr(self._artefato, "read_range"):
+            return memoryview(self._artefato.read_range(0, tamanho))
+        return memoryview(self.conteudo())[:tamanho]
+
+    def conteudo(self) -> bytes:
+        """Conteúdo completo (lido uma única vez)."""
+        if self._conteudo is None:
+            self._conteudo = self._artefato.content
+        return self._conteudo
+
+    @property
+    def carregado(self) -> bool:
+        """Indica se o conteúdo completo já foi lido."""
+        return self._conteudo is not None
+
+
+def abrir_artefato(tool_context: Any, nome: str) -> Optional[ArtefatoLeitura]:
+    """Busca o artefato na sessão; retorna None se não existir."""
+    artefato = tool_context.session.get_artifact(nome)
+    return ArtefatoLeitura(artefato) if artefato else None
@@ -0,0 +1,359 @@
+"""
+Backends de serviços externos para o Professor Virtual ADK
+As ferramentas de implementation.py não falam diretamente com os serviços de
+speech-to-text, text-to-speech e visão: usam os backends configurados aqui.
+Assim a integração real pode ser trocada por um backend local (determinístico)
+em testes e benchmarks.
+
+Cada interface tem também uma versão assíncrona do método principal, usada por
+ferramentas_async.py. A versão padrão roda o método bloqueante no pool de
+threads compartilhado (concorrencia.py); integrações com cliente assíncrono
+nativo devem sobrescrevê-la.
+
+`configurar_backends` monta os três backends a partir de uma configuração
+(dict ou variável de ambiente PROFESSOR_BACKENDS em JSON), escolhendo entre os
+tipos registrados: "falso" (este módulo) e "http" (backends_http.py).
+"""
+
+import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from concorrencia import em_thread
+
+
+TEXTO_TRANSCRICAO_SIMULADA = "Este é um texto simulado da transcrição do áudio do artefato."
+
+
+class BackendSTT(ABC):
+    """Interface de um serviço de speech-to-text."""
+
+    @abstractmethod
+    def transcrever(self, audio: bytes, formato: str, idioma: str = "pt-BR") -> str:
+        """Transcreve o áudio completo e retorna o texto final."""
+
+    async def transcrever_async(self, audio: bytes, formato: str, idioma: str = "pt-BR") -> str:
+        """Versão assíncrona de `transcrever`."""
+        return await em_thread(self.transcrever, audio, formato, idioma)
+
+    def transcrever_lote(self, audios: List[Tuple[bytes, str]], idioma: str = "pt-BR") -> List[str]:
+        """Transcreve vários (áudio, formato) numa só requisição, na mesma ordem.
+        
+        Usado pelo agendador de lotes (lote_stt.py). Backends sem API de lote
+        herdam esta versão, que transcreve um a um.
+        """
+        return [self.transcrever(audio, formato, idioma) for audio, formato in audios]
+
+    async def transcrever_lote_async(
+        self,
+        audios: List[Tuple[bytes, str]],
+        idioma: str = "pt-BR"
+    ) -> List[str]:
+        """Versão assíncrona de `transcrever_lote`; a padrão transcreve em paralelo."""
+        return list(await asyncio.gather(
+            *(self.transcrever_async(audio, formato, idioma) for audio, formato in audios)
+        ))
+
+    def configuracao(self) -> str:
+        """Identifica o backend e as opções que alteram o resultado (entra na chave de cache)."""
+        return type(self).__name__
+
+    def fechar(self) -> None:
+        """Libera conexões e threads do backend; a padrão não tem o que liberar."""
+
+    def transcrever_stream(
+        self,
+        blocos: Iterable[bytes],
+        formato: str,
+        idioma: str = "pt-BR"
+    ) -> Iterator[str]:
+        """Consome o áudio em blocos e produz transcrições parciais cumulativas.
+        
+        Cada valor produzido substitui o anterior; o último é a transcrição final.
+        Backends sem suporte a streaming herdam esta versão, que acumula os blocos
+        e produz uma única transcrição ao final.
+        """
+        yield self.transcrever(b"".join(blocos), formato, idioma)
+
+
+class BackendSTTFalso(BackendSTT):
+    """Backend local para testes: "reconhece" um texto fixo palavra a palavra.
+    
+    No modo streaming, libera uma palavra a cada `bytes_por_palavra` bytes
+    consumidos, imitando o ritmo de um serviço real de reconhecimento contínuo.
+    
+    Args:
+        texto: Texto devolvido como transcrição de qualquer áudio.
+        bytes_por_palavra: Quantidade de áudio que "revela" uma nova palavra.
+        atraso_por_bloco: Segundos de espera simulados a cada bloco consumido.
+        latencia: Segundos de espera simulados por transcrição completa.
+        latencia_por_item: Segundos a mais por áudio num lote (`transcrever_lote`),
+                           que paga `latencia` uma única vez.
+    """
+
+    def __init__(
+        self,
+        texto: str = TEXTO_TRANSCRICAO_SIMULADA,
+        bytes_por_palavra: int = 8000,
+        atraso_por_bloco: float = 0.0,
+        latencia: float = 0.0,
+        latencia_por_item: float = 0.0
+    ):
+        self.texto = texto
+        self.bytes_por_palavra = bytes_por_palavra
+        self.atraso_por_bloco = atraso_por_bloco
+        self.latencia = latencia
+        self.latencia_por_item = latencia_por_item
+        self.chamadas = 0
+        self.lotes: List[int] = []  # tamanho de cada lote recebido
+
+    def transcrever(self, audio: bytes, formato: str, idioma: str = "pt-BR") -> str:
+        self.chamadas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        return self.texto
+
+    async def transcrever_async(self, audio: bytes, formato: str, idioma: str = "pt-BR") -> str:
+        self.chamadas += 1
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        return self.texto
+
+    def transcrever_lote(self, audios: List[Tuple[bytes, str]], idioma: str = "pt-BR") -> List[str]:
+        self.chamadas += 1
+        self.lotes.append(len(audios))
+        atraso = self.latencia + self.latencia_por_item * len(audios)
+        if atraso:
+            time.sleep(atraso)
+        return [self.texto] * len(audios)
+
+    async def transcrever_lote_async(
+        self,
+        audios: List[Tuple[bytes, str]],
+        idioma: str = "pt-BR"
+    ) -> List[str]:
+        self.chamadas += 1
+        self.lotes.append(len(audios))
+        atraso = self.latencia + self.latencia_por_item * len(audios)
+        if atraso:
+            await asyncio.sleep(atraso)
+        return [self.texto] * len(audios)
+
+    def configuracao(self) -> str:
+        return f"{type(self).__name__}:{self.texto}"
+
+    def transcrever_stream(
+        self,
+        blocos: Iterable[bytes],
+        formato: str,
+        idioma: str = "pt-BR"
+    ) -> Iterator[str]:
+        self.chamadas += 1
+        palavras = self.texto.split()
+        consumidos = 0
+        reveladas = 0
+        for bloco in blocos:
+            if self.atraso_por_bloco:
+                time.sleep(self.atraso_por_bloco)
+            consumidos += len(bloco)
+            n = min(len(palavras), consumidos // self.bytes_por_palavra)
+            if n > reveladas:
+                reveladas = n
+                yield " ".join(palavras[:n])
+        if reveladas < len(palavras):
+            yield self.texto
+
+
+class BackendTTS(ABC):
+    """Interface de um serviço de text-to-speech."""
+
+    mime_type = "audio/mpeg"
+
+    @abstractmethod
+    def sintetizar(self, texto: str, voz: str, velocidade: float = 1.0) -> bytes:
+        """Sintetiza o texto e retorna os bytes do áudio (no formato `mime_type`)."""
+
+    async def sintetizar_async(self, texto: str, voz: str, velocidade: float = 1.0) -> bytes:
+        """Versão assíncrona de `sintetizar`."""
+        return await em_thread(self.sintetizar, texto, voz, velocidade)
+
+    def configuracao(self) -> str:
+        """Identifica o backend e as opções que alteram o resultado (entra na chave de cache)."""
+        return type(self).__name__
+
+    def fechar(self) -> None:
+        """Libera conexões e threads do backend; a padrão não tem o que liberar."""
+
+
+class BackendTTSFalso(BackendTTS):
+    """Backend local para testes: devolve bytes simulados derivados do texto.
+    
+    Args:
+        atraso_por_caractere: Segundos de espera simulados por caractere sintetizado.
+    """
+
+    def __init__(self, atraso_por_caractere: float = 0.0):
+        self.atraso_por_caractere = atraso_por_caractere
+        self.chamadas = 0
+
+    def sintetizar(self, texto: str, voz: str, velocidade: float = 1.0) -> bytes:
+        self.chamadas += 1
+        if self.atraso_por_caractere:
+            time.sleep(self.atraso_por_caractere * len(texto))
+        return b"audio_data_simulado_tts_" + texto.encode('utf-8')
+
+    async def sintetizar_async(self, texto: str, voz: str, velocidade: float = 1.0) -> bytes:
+        self.chamadas += 1
+        if self.atraso_por_caractere:
+            await asyncio.sleep(self.atraso_por_caractere * len(texto))
+        return b"audio_data_simulado_tts_" + texto.encode('utf-8')
+
+
+class BackendVisao(ABC):
+    """Interface de um serviço de análise de imagens educacionais."""
+
+    # Maior lado que o serviço aproveita; fotos maiores são reduzidas antes do envio
+    lado_maximo_px: int = 1568
+
+    @abstractmethod
+    def analisar(self, imagem: bytes, contexto_pergunta: str) -> Dict[str, Any]:
+        """Analisa a imagem e retorna tipo_conteudo, elementos_detectados e contexto_educacional."""
+
+    async def analisar_async(self, imagem: bytes, contexto_pergunta: str) -> Dict[str, Any]:
+        """Versão assíncrona de `analisar`."""
+        return await em_thread(self.analisar, imagem, contexto_pergunta)
+
+    def configuracao(self) -> str:
+        """Identifica o backend e as opções que alteram o resultado (entra na chave de cache)."""
+        return type(self).__name__
+
+    def fechar(self) -> None:
+        """Libera conexões e threads do backend; a padrão não tem o que liberar."""
+
+
+class BackendVisaoFalso(BackendVisao):
+    """Backend local para testes: devolve sempre a mesma análise simulada.
+    
+    Args:
+        latencia: Segundos de espera simulados por análise.
+    """
+
+    def __init__(self, latencia: float = 0.0):
+        self.latencia = latencia
+        self.chamadas = 0
+
+    def analisar(self, imagem: bytes, contexto_pergunta: str) -> Dict[str, Any]:
+        self.chamadas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        return self._analise_simulada()
+
+    async def analisar_async(self, imagem: bytes, contexto_pergunta: str) -> Dict[str, Any]:
+        self.chamadas += 1
+        if self.latencia:
+            await asyncio.sleep(self.latencia)
+        return self._analise_simulada()
+
+    @staticmethod
+    def _analise_simulada() -> Dict[str, Any]:
+        return {
+            "tipo_conteudo": "exercicio_matematica",
+            "elementos_detectados": ["equação quadrática", "gráfico de parábola"],
+            "contexto_educacional": "Exercício de matemática sobre funções quadráticas",
+        }
+
+
+_backend_stt: BackendSTT = BackendSTTFalso()
+_backend_tts: BackendTTS = BackendTTSFalso()
+_backend_visao: BackendVisao = BackendVisaoFalso()
+
+
+def obter_backend_stt() -> BackendSTT:
+    """Retorna o backend de speech-to-text em uso pelas ferramentas."""
+    return _backend_stt
+
+
+def configurar_backend_stt(backend: BackendSTT) -> None:
+    """Substitui o backend de speech-to-text (ex: integração real ou fake de teste)."""
+    global _backend_stt
+    _backend_stt = backend
+
+
+def obter_backend_tts() -> BackendTTS:
+    """Retorna o backend de text-to-speech em uso pelas ferramentas."""
+    return _backend_tts
+
+
+def configurar_backend_tts(backend: BackendTTS) -> None:
+    """Substitui o backend de text-to-speech (ex: integração real ou fake de teste)."""
+    global _backend_tts
+    _backend_tts = backend
+
+
+def obter_backend_visao() -> BackendVisao:
+    """Retorna o backend de análise de imagens em uso pelas ferramentas."""
+    return _backend_visao
+
+
+def configurar_backend_visao(backend: BackendVisao) -> None:
+    """Substitui o backend de análise de imagens (ex: integração real ou fake de teste)."""
+    global _backend_visao
+    _backend_visao = backend
+
+
+# Fábricas por serviço e tipo, usadas por configurar_backends
+_FABRICAS: Dict[str, Dict[str, Callable[..., Any]]] = {
+    "stt": {"falso": BackendSTTFalso},
+    "tts": {"falso": BackendTTSFalso},
+    "visao": {"falso": BackendVisaoFalso},
+}
+_CONFIGURADORES = {
+    "stt": (obter_backend_stt, configurar_backend_stt),
+    "tts": (obter_backend_tts, configurar_backend_tts),
+    "visao": (obter_backend_visao, configurar_backend_visao),
+}
+
+
+def registrar_fabrica(servico: str, tipo: str, fabrica: Callable[..., Any]) -> None:
+    """Registra um novo tipo de backend para "stt", "tts" ou "visao"."""
+    if servico not in _FABRICAS:
+        raise ValueError(f"Serviço desconhecido: {servico}")
+    _FABRICAS[servico][tipo] = fabrica
+
+
+def configurar_backends(configuracao: Dict[str, Dict[str, Any]]) -> None:
+    """Cria e instala os backends descritos na configuração, na inicialização.
+    
+    Ex: {"stt": {"tipo": "http", "url_base": "http://gateway:8080", "max_conexoes": 16,
+                 "prazo_segundos": 10}, "tts": {"tipo": "falso"}}
+    As demais chaves de cada serviço são repassadas à fábrica do tipo.
+    Serviços ausentes mantêm o backend atual; os substituídos são fechados
+    (pools de conexões e threads dos backends HTTP).
+    """
+    import backends_http  # noqa: F401  (registra o tipo "http")
+
+    novos = {}
+    for servico, opcoes in configuracao.items():
+        opcoes = dict(opcoes)
+        tipo = opcoes.pop("tipo", "falso")
+        if servico not in _FABRICAS or tipo not in _FABRICAS[servico]:
+            raise ValueError(f"Backend desconhecido: {servico}/{tipo}")
+        novos[servico] = _FABRICAS[servico][tipo](**opcoes)
+    for servico, backend in novos.items():
+        obter, configurar = _CONFIGURADORES[servico]
+        anterior = obter()
+        configurar(backend)
+        if anterior is not backend:
+            anterior.fechar()
+
+
+def configurar_backends_do_ambiente(variavel: str = "PROFESSOR_BACKENDS") -> bool:
+    """Aplica `configurar_backends` com o JSON da variável de ambiente, se definida."""
+    valor: Optional[str] = os.environ.get(variavel)
+    if not valor:
+        return False
+    configurar_backends(json.loads(valor))
+    return True
@@ -0,0 +1,359 @@
+"""
+Backends HTTP para o Professor Virtual ADK
+Falam com um gateway de serviços de fala e visão por HTTP/1.1, reaproveitando
+conexões keep-alive. Cada backend tem seu próprio pool de conexões (que também
+limita as chamadas simultâneas), prazo máximo por chamada e disjuntor (circuit
+breaker) que para de chamar um serviço que está falhando e o testa de novo
+após um intervalo.
+
+Contrato do gateway (implementado localmente por benchmarks/servidor_local.py):
+    POST /stt?formato=wav&idioma=pt-BR    corpo: áudio      -> {"texto": ...}
+    POST /visao?contexto=...              corpo: imagem     -> {"tipo_conteudo": ..., ...}
+    POST /tts   {"texto", "voz", "velocidade"} (JSON)       -> bytes do áudio
+
+Só usa a biblioteca padrão. As versões assíncronas rodam a chamada bloqueante
+num pool de threads do próprio cliente, do tamanho do pool de conexões, para que
+a espera pela rede não ocupe o pool de CPU de concorrencia.py.
+"""
+
+import asyncio
+import functools
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from backends import BackendSTT, BackendTTS, BackendVisao, registrar_fabrica
+
+
+class ErroBackend(Exception):
+    """Falha ao chamar um serviço externo."""
+
+
+class PrazoEsgotadoError(ErroBackend):
+    """A chamada não terminou dentro do prazo configurado."""
+
+
+class CircuitoAbertoError(ErroBackend):
+    """O disjuntor está aberto: o serviço falhou seguidamente e não é chamado."""
+
+
+@dataclass
+class RespostaHTTP:
+    status: int
+    cabecalhos: Dict[str, str]
+    corpo: bytes
+
+
+# Erros de uma conexão keep-alive que o servidor fechou enquanto estava ociosa
+_CONEXAO_VELHA = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class PoolConexoesHTTP:
+    """Pool de conexões HTTP/1.1 keep-alive para um único host.
+
+    `max_conexoes` também limita as requisições simultâneas: quem chega com o
+    pool cheio espera uma vaga, no máximo até o prazo da chamada.
+
+    Args:
+        url_base: Ex: "http://127.0.0.1:8080" ou "https://gateway/v1".
+        max_conexoes: Conexões (e requisições em andamento) por backend.
+    """
+
+    def __init__(self, url_base: str, max_conexoes: int = 8):
+        partes = urlsplit(url_base)
+        self.url_base = url_base
+        self._classe = (
+            http.client.HTTPSConnection if partes.scheme == "https" else http.client.HTTPConnection
+        )
+        self._host = partes.hostname
+        self._porta = partes.port
+        self._prefixo = partes.path.rstrip("/")
+        self._livres: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._vagas = threading.BoundedSemaphore(max_conexoes)
+        self._fechado = False
+        self.conexoes_criadas = 0
+        self.requisicoes = 0
+        self.reutilizacoes = 0
+
+    def requisitar(
+        self,
+        metodo: str,
+        caminho: str,
+        corpo: Optional[bytes] = None,
+        cabecalhos: Optional[Dict[str, str]] = None,
+        prazo_segundos: Optional[float] = None
+    ) -> RespostaHTTP:
+        """Envia a requisição numa conexão do pool e lê a resposta inteira.
+
+        Raises:
+            PrazoEsgotadoError: sem vaga no pool ou sem resposta dentro do prazo.
+            OSError / http.client.HTTPException: falha de rede.
+        """
+        fim = time.monotonic() + prazo_segundos if prazo_segundos is not None else None
+        if not self._vagas.acquire(timeout=_restante(fim)):
+            raise PrazoEsgotadoError(f"sem conexão livre para {self.url_base} dentro do prazo")
+        try:
+            conexao, reutilizada = self._retirar()
+            try:
+                resposta, fechar = self._enviar(conexao, metodo, caminho, corpo, cabecalhos, fim)
+            except _CONEXAO_VELHA:
+                if not reutilizada:
+                    raise
+                # O servidor fechou a conexão ociosa: tenta uma vez numa nova
+                conexao, _ = self._nova()
+                resposta, fechar = self._enviar(conexao, metodo, caminho, corpo, cabecalhos, fim)
+            with self._lock:
+                if not (fechar or self._fechado):
+                    self._livres.append(conexao)
+                    conexao = None
+            if conexao is not None:
+                conexao.close()
+            return resposta
+        except TimeoutError as e:
+            raise PrazoEsgotadoError(f"{self.url_base} não respondeu dentro do prazo") from e
+        finally:
+            self._vagas.release()
+
+    def _retirar(self) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._livres:
+                self.reutilizacoes += 1
+                return self._livres.pop(), True  # LIFO: a conexão usada mais recentemente
+        return self._nova()
+
+    def _nova(self) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            self.conexoes_criadas += 1
+        return self._classe(self._host, self._porta), False
+
+    def _enviar(self, conexao, metodo, caminho, corpo, cabecalhos, fim):
+        """Faz a requisição; em qualquer erro a conexão é fechada (não volta ao pool)."""
+        try:
+            timeout = _restante(fim)
+            conexao.timeout = timeout
+            if conexao.sock is not None:
+                conexao.sock.settimeout(timeout)
+            conexao.request(metodo, self._prefixo + caminho, body=corpo, headers=cabecalhos or {})
+            resposta = conexao.getresponse()
+            dados = resposta.read()
+        except BaseException:
+            conexao.close()
+            raise
+        with self._lock:
+            self.requisicoes += 1
+        return RespostaHTTP(resposta.status, dict(resposta.getheaders()), dados), resposta.will_close
+
+    def fechar(self) -> None:
+        """Fecha as conexões ociosas; as em uso são fechadas quando terminam."""
+        with self._lock:
+            self._fechado = True
+            livres, self._livres = self._livres, []
+        for conexao in livres:
+            conexao.close()
+
+
+def _restante(fim: Optional[float]) -> Optional[float]:
+    if fim is None:
+        return None
+    restante = fim - time.monotonic()
+    if restante <= 0:
+        raise PrazoEsgotadoError("prazo esgotado")
+    return restante
+
+
+class Disjuntor:
+    """Disjuntor (circuit breaker) de um backend.
+
+    Depois de `limite_falhas` falhas seguidas, abre e rejeita chamadas por
+    `tempo_recuperacao` segundos; então deixa passar uma chamada de teste
+    (meio-aberto), que fecha o circuito se der certo ou o reabre se falhar.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(
+        self,
+        limite_falhas: int = 5,
+        tempo_recuperacao: float = 30.0,
+        relogio: Callable[[], float] = time.monotonic
+    ):
+        self.limite_falhas = limite_falhas
+        self.tempo_recuperacao = tempo_recuperacao
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self.estado = self.FECHADO
+        self.falhas_seguidas = 0
+        self.aberto_em = 0.0
+        self.rejeitadas = 0
+
+    def liberar(self) -> None:
+        """Autoriza uma chamada ou levanta CircuitoAbertoError."""
+        with self._lock:
+            if self.estado == self.FECHADO:
+                return
+            if self.estado == self.ABERTO and self._relogio() - self.aberto_em >= self.tempo_recuperacao:
+                self.estado = self.MEIO_ABERTO  # esta chamada é o teste
+                return
+            self.rejeitadas += 1
+            raise CircuitoAbertoError("serviço indisponível (disjuntor aberto)")
+
+    def registrar_sucesso(self) -> None:
+        with self._lock:
+            self.estado = self.FECHADO
+            self.falhas_seguidas = 0
+
+    def registrar_falha(self) -> None:
+        with self._lock:
+            self.falhas_seguidas += 1
+            if self.estado == self.MEIO_ABERTO or self.falhas_seguidas >= self.limite_falhas:
+                self.estado = self.ABERTO
+                self.aberto_em = self._relogio()
+
+
+class ClienteHTTP:
+    """Pool de conexões + prazo + disjuntor: o que cada backend HTTP usa.
+
+    Falhas de rede, prazo esgotado, respostas 5xx e qualquer outra exceção
+    durante a requisição contam para o disjuntor; respostas 4xx (erro na
+    requisição) levantam ErroBackend sem contar.
+    """
+
+    def __init__(
+        self,
+        url_base: str,
+        max_conexoes: int = 8,
+        prazo_segundos: Optional[float] = 30.0,
+        limite_falhas: int = 5,
+        tempo_recuperacao: float = 30.0
+    ):
+        self.url_base = url_base
+        self.prazo_segundos = prazo_segundos
+        self.pool = PoolConexoesHTTP(url_base, max_conexoes)
+        self.disjuntor = Disjuntor(limite_falhas, tempo_recuperacao)
+        self._executor = ThreadPoolExecutor(max_workers=max_conexoes, thread_name_prefix="http")
+
+    def chamar(
+        self,
+        metodo: str,
+        caminho: str,
+        corpo: Optional[bytes] = None,
+        cabecalhos: Optional[Dict[str, str]] = None
+    ) -> RespostaHTTP:
+        self.disjuntor.liberar()
+        try:
+            resposta = self.pool.requisitar(metodo, caminho, corpo, cabecalhos, self.prazo_segundos)
+        except BaseException as e:
+            # Inclusive exceções inesperadas: se esta era a chamada de teste, o
+            # disjuntor não pode ficar meio-aberto (rejeitando tudo) para sempre
+            self.disjuntor.registrar_falha()
+            if isinstance(e, (OSError, http.client.HTTPException)):
+                raise ErroBackend(f"falha de conexão com {self.url_base}: {e}") from e
+            raise
+        if resposta.status >= 500:
+            self.disjuntor.registrar_falha()
+            raise ErroBackend(f"{self.url_base}{caminho} respondeu HTTP {resposta.status}")
+        self.disjuntor.registrar_sucesso()
+        if resposta.status >= 400:
+            raise ErroBackend(f"{self.url_base}{caminho} respondeu HTTP {resposta.status}")
+        return resposta
+
+    async def chamar_async(self, *args: Any) -> RespostaHTTP:
+        """Versão assíncrona de `chamar` (mesmos argumentos)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self.chamar, *args))
+
+    def fechar(self) -> None:
+        self.pool.fechar()
+        self._executor.shutdown(wait=False)
+
+
+class BackendSTTHTTP(BackendSTT):
+    """Speech-to-text via gateway HTTP (POST /stt)."""
+
+    def __init__(self, url_base: str, **opcoes_cliente: Any):
+        self.cliente = ClienteHTTP(url_base, **opcoes_cliente)
+
+    def transcrever(self, audio: bytes, formato: str, idioma: str = "pt-BR") -> str:
+        return json.loads(self.cliente.chamar(*self._requisicao(audio, formato, idioma)).corpo)["texto"]
+
+    async def transcrever_async(self, audio: bytes, formato: str, idioma: str = "pt-BR") -> str:
+        resposta = await self.cliente.chamar_async(*self._requisicao(audio, formato, idioma))
+        return json.loads(resposta.corpo)["texto"]
+
+    @staticmethod
+    def _requisicao(audio: bytes, formato: str, idioma: str) -> tuple:
+        return (
+            "POST", "/stt?" + urlencode({"formato": formato, "idioma": idioma}),
+            bytes(audio), {"Content-Type": "application/octet-stream"}
+        )
+
+    def configuracao(self) -> str:
+        return f"{type(self).__name__}:{self.cliente.url_base}"
+
+    def fechar(self) -> None:
+        self.cliente.fechar()
+
+
+class BackendVisaoHTTP(BackendVisao):
+    """Análise de imagens via gateway HTTP (POST /visao)."""
+
+    def __init__(self, url_base: str, **opcoes_cliente: Any):
+        self.cliente = ClienteHTTP(url_base, **opcoes_cliente)
+
+    def analisar(self, imagem: bytes, contexto_pergunta: str) -> Dict[str, Any]:
+        return json.loads(self.cliente.chamar(*self._requisicao(imagem, contexto_pergunta)).corpo)
+
+    async def analisar_async(self, imagem: bytes, contexto_pergunta: str) -> Dict[str, Any]:
+        resposta = await self.cliente.chamar_async(*self._requisicao(imagem, contexto_pergunta))
+        return json.loads(resposta.corpo)
+
+    @staticmethod
+    def _requisicao(imagem: bytes, contexto_pergunta: str) -> tuple:
+        return (
+            "POST", "/visao?" + urlencode({"contexto": contexto_pergunta}),
+            bytes(imagem), {"Content-Type": "application/octet-stream"}
+        )
+
+    def configuracao(self) -> str:
+        return f"{type(self).__name__}:{self.cliente.url_base}"
+
+    def fechar(self) -> None:
+        self.cliente.fechar()
+
+
+class BackendTTSHTTP(BackendTTS):
+    """Text-to-speech via gateway HTTP (POST /tts)."""
+
+    def __init__(self, url_base: str, mime_type: str = "audio/mpeg", **opcoes_cliente: Any):
+        self.cliente = ClienteHTTP(url_base, **opcoes_cliente)
+        self.mime_type = mime_type
+
+    def sintetizar(self, texto: str, voz: str, velocidade: float = 1.0) -> bytes:
+        return self.cliente.chamar(*self._requisicao(texto, voz, velocidade)).corpo
+
+    async def sintetizar_async(self, texto: str, voz: str, velocidade: float = 1.0) -> bytes:
+        return (await self.cliente.chamar_async(*self._requisicao(texto, voz, velocidade))).corpo
+
+    @staticmethod
+    def _requisicao(texto: str, voz: str, velocidade: float) -> tuple:
+        corpo = json.dumps({"texto": texto, "voz": voz, "velocidade": velocidade}).encode("utf-8")
+        return "POST", "/tts", corpo, {"Content-Type": "application/json"}
+
+    def configuracao(self) -> str:
+        return f"{type(self).__name__}:{self.cliente.url_base}"
+
+    def fechar(self) -> None:
+        self.cliente.fechar()
+
+
+registrar_fabrica("stt", "http", BackendSTTHTTP)
+registrar_fabrica("visao", "http", BackendVisaoHTTP)
+registrar_fabrica("tts", "http", BackendTTSHTTP)
@@ -0,0 +1,339 @@
+"""
+Leitura de cabeçalhos de áudio para o Professor Virtual ADK
+Identifica formato, codec, duração real, taxa de amostragem e canais de
+arquivos WAV, MP3 e M4A lendo apenas os cabeçalhos, sem decodificar o áudio.
+A leitura é feita sobre um memoryview, sem copiar o conteúdo (exceto uma
+janela limitada usada para localizar o primeiro quadro MP3).
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Iterator, Optional, Tuple, Union
+
+
+class AudioInvalidoError(ValueError):
+    """O conteúdo não é um áudio suportado ou o cabeçalho está corrompido."""
+
+
+@dataclass
+class InfoAudio:
+    """Metadados extraídos do cabeçalho de um arquivo de áudio"""
+    formato: str  # wav, mp3 ou m4a (detectado pelo conteúdo, não pela extensão)
+    codec: str
+    duracao_segundos: float
+    taxa_amostragem: int
+    canais: int
+    bits_por_amostra: Optional[int] = None
+    taxa_bits: Optional[int] = None  # bits por segundo, quando conhecida
+
+
+Dados = Union[bytes, bytearray, memoryview]
+
+
+def detectar_formato_audio(dados: Dados) -> Optional[str]:
+    """Identifica o formato pelos bytes mágicos; retorna None se desconhecido."""
+    cabecalho = bytes(memoryview(dados)[:12])
+    if cabecalho[:4] == b"RIFF" and cabecalho[8:12] == b"WAVE":
+        return "wav"
+    if cabecalho[4:8] == b"ftyp":
+        return "m4a"
+    if cabecalho[:3] == b"ID3" or (
+        len(cabecalho) >= 2 and cabecalho[0] == 0xFF and cabecalho[1] & 0xE0 == 0xE0
+    ):
+        return "mp3"
+    return None
+
+
+def inspecionar_audio(dados: Dados) -> InfoAudio:
+    """Lê o cabeçalho do áudio e retorna seus metadados.
+
+    Raises:
+        AudioInvalidoError: formato desconhecido ou cabeçalho inconsistente.
+    """
+    formato = detectar_formato_audio(dados)
+    visao = memoryview(dados)
+    if formato == "wav":
+        return _inspecionar_wav(visao)
+    if formato == "mp3":
+        return _inspecionar_mp3(visao)
+    if formato == "m4a":
+        return _inspecionar_m4a(visao)
+    raise AudioInvalidoError("formato de áudio não reconhecido")
+
+
+# --- WAV (RIFF) ---
+
+_CODECS_WAV = {1: "pcm", 3: "pcm_float", 6: "alaw", 7: "mulaw", 0x11: "ima_adpcm", 0x55: "mp3"}
+
+
+def dados_pcm_wav(dados: Dados) -> memoryview:
+    """Fatia (sem cópia) com as amostras do chunk 'data' de um WAV.
+
+    Raises:
+        AudioInvalidoError: não é WAV ou faltam os chunks 'fmt '/'data'.
+    """
+    visao = memoryview(dados)
+    if detectar_formato_audio(visao) != "wav":
+        raise AudioInvalidoError("não é um arquivo WAV")
+    _, inicio, tamanho = _chunks_wav(visao)
+    return visao[inicio:inicio + tamanho]
+
+
+def _chunks_wav(visao: memoryview) -> Tuple[tuple, int, int]:
+    """Retorna (campos do chunk 'fmt ', início e tamanho do chunk 'data')."""
+    fmt = None
+    inicio_dados = tamanho_dados = None
+    pos = 12
+    while pos + 8 <= len(visao):
+        chunk_id = bytes(visao[pos:pos + 4])
+        (tamanho,) = struct.unpack_from("<I", visao, pos + 4)
+        inicio = pos + 8
+        if chunk_id == b"fmt ":
+            if tamanho < 16 or inicio + 16 > len(visao):
+                raise AudioInvalidoError("chunk 'fmt ' truncado")
+            fmt = struct.unpack_from("<HHIIHH", visao, inicio)
+            if fmt[0] == 0xFFFE and tamanho >= 40:  # WAVE_FORMAT_EXTENSIBLE
+                if inicio + 26 > len(visao):
+                    raise AudioInvalidoError("chunk 'fmt ' extensível truncado")
+                (subformato,) = struct.unpack_from("<H", visao, inicio + 24)
+                fmt = (subformato,) + fmt[1:]
+        elif chunk_id == b"data":
+            disponivel = len(visao) - inicio
+            # Gravadores interrompidos deixam 0 ou 0xFFFFFFFF no tamanho
+            tamanho_dados = disponivel if tamanho in (0, 0xFFFFFFFF) else min(tamanho, disponivel)
+            inicio_dados = inicio
+            break
+        pos = inicio + tamanho + (tamanho & 1)
+
+    if fmt is None:
+        raise AudioInvalidoError("WAV sem chunk 'fmt '")
+    if tamanho_dados is None:
+        raise AudioInvalidoError("WAV sem chunk 'data'")
+    return fmt, inicio_dados, tamanho_dados
+
+
+def _inspecionar_wav(visao: memoryview) -> InfoAudio:
+    fmt, _, tamanho_dados = _chunks_wav(visao)
+    codigo, canais, taxa, bytes_por_segundo, _, bits = fmt
+    if not canais or not taxa or not bytes_por_segundo:
+        raise AudioInvalidoError("cabeçalho WAV com canais, taxa ou byte rate zerados")
+    return InfoAudio(
+        formato="wav",
+        codec=_CODECS_WAV.get(codigo, f"wav_0x{codigo:04x}"),
+        duracao_segundos=tamanho_dados / bytes_por_segundo,
+        taxa_amostragem=taxa,
+        canais=canais,
+        bits_por_amostra=bits or None,
+        taxa_bits=bytes_por_segundo * 8
+    )
+
+
+# --- MP3 (frames MPEG áudio) ---
+
+# kbps por índice, para (versão MPEG-1?, camada)
+_TAXAS_BITS_MP3 = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_TAXAS_BITS_MP3[(False, 3)] = _TAXAS_BITS_MP3[(False, 2)]
+# Hz por índice, para os bits de versão (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5)
+_TAXAS_AMOSTRAGEM_MP3 = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _quadro_mp3(visao: memoryview, pos: int) -> Optional[Tuple[int, int, int, int, int, int]]:
+    """Decodifica o cabeçalho de quadro em `pos`.
+
+    Retorna (tamanho_quadro, amostras_por_quadro, taxa_amostragem, canais,
+    kbps, camada) ou None se não houver um cabeçalho válido ali.
+    """
+    if pos + 4 > len(visao):
+        return None
+    (h,) = struct.unpack_from(">I", visao, pos)
+    if h & 0xFFE00000 != 0xFFE00000:
+        return None
+    versao = (h >> 19) & 3
+    camada = 4 - ((h >> 17) & 3)
+    indice_bits = (h >> 12) & 15
+    indice_taxa = (h >> 10) & 3
+    if versao == 1 or camada == 4 or indice_bits in (0, 15) or indice_taxa == 3:
+        return None
+    mpeg1 = versao == 3
+    kbps = _TAXAS_BITS_MP3[(mpeg1, camada)][indice_bits]
+    taxa = _TAXAS_AMOSTRAGEM_MP3[versao][indice_taxa]
+    preenchimento = (h >> 9) & 1
+    canais = 1 if (h >> 6) & 3 == 3 else 2
+    if camada == 1:
+        amostras = 384
+        tamanho = (12 * kbps * 1000 // taxa + preenchimento) * 4
+    else:
+        amostras = 1152 if (camada == 2 or mpeg1) else 576
+        tamanho = amostras // 8 * kbps * 1000 // taxa + preenchimento
+    return tamanho, amostras, taxa, canais, kbps, camada
+
+
+def _inspecionar_mp3(visao: memoryview) -> InfoAudio:
+    pos = 0
+    if bytes(visao[:3]) == b"ID3":
+        if len(visao) < 10:
+            raise AudioInvalidoError("tag ID3 truncada")
+        b = visao[6:10]
+        pos = 10 + ((b[0] << 21) | (b[1] << 14) | (b[2] << 7) | b[3])
+        if visao[5] & 0x10:  # rodapé presente
+            pos += 10
+
+    # Procura o primeiro quadro confirmado pelo quadro seguinte (evita falsos
+    # syncs). A busca fica limitada a 64KB; só essa janela é copiada, para
+    # usar bytes.find em vez de testar byte a byte.
+    janela = bytes(visao[pos:pos + 64 * 1024])
+    inicio_janela = pos
+    primeiro = None
+    i = janela.find(b"\xff")
+    while i != -1:
+        pos = inicio_janela + i
+        quadro = _quadro_mp3(visao, pos)
+        if quadro and (pos + quadro[0] >= len(visao) or _quadro_mp3(visao, pos + quadro[0])):
+            primeiro = quadro
+            break
+        i = janela.find(b"\xff", i + 1)
+    if primeiro is None:
+        raise AudioInvalidoError("nenhum quadro MP3 válido encontrado")
+
+    tamanho, amostras, taxa, canais, kbps, camada = primeiro
+    codec = {1: "mp1", 2: "mp2", 3: "mp3"}[camada]
+
+    # Cabeçalho Xing/Info (VBR e LAME CBR) ou VBRI traz o total de quadros
+    total_quadros = _quadros_xing_vbri(visao, pos, canais, amostras)
+    if total_quadros is None:
+        # Sem cabeçalho VBR: percorre os cabeçalhos de quadro (sem decodificar)
+        total_quadros = 0
+        soma_kbps = 0
+        while True:
+            quadro = _quadro_mp3(visao, pos)
+            if quadro is None:
+                break
+            total_quadros += 1
+            soma_kbps += quadro[4]
+            pos += quadro[0]
+        kbps = soma_kbps // total_quadros
+
+    duracao = total_quadros * amostras / taxa
+    return InfoAudio(
+        formato="mp3",
+        codec=codec,
+        duracao_segundos=duracao,
+        taxa_amostragem=taxa,
+        canais=canais,
+        taxa_bits=kbps * 1000
+    )
+
+
+def _quadros_xing_vbri(visao: memoryview, pos: int, canais: int, amostras: int) -> Optional[int]:
+    # Deslocamento do Xing depende do tamanho do side info (MPEG-1/2, mono/estéreo)
+    mpeg1 = amostras == 1152
+    deslocamento = 4 + ((32 if canais == 2 else 17) if mpeg1 else (17 if canais == 2 else 9))
+    inicio = pos + deslocamento
+    if bytes(visao[inicio:inicio + 4]) in (b"Xing", b"Info") and inicio + 12 <= len(visao):
+        (flags,) = struct.unpack_from(">I", visao, inicio + 4)
+        if flags & 1:
+            (quadros,) = struct.unpack_from(">I", visao, inicio + 8)
+            return quadros
+    inicio = pos + 36
+    if bytes(visao[inicio:inicio + 4]) == b"VBRI" and inicio + 18 <= len(visao):
+        (quadros,) = struct.unpack_from(">I", visao, inicio + 14)
+        return quadros
+    return None
+
+
+# --- M4A (átomos ISO BMFF) ---
+
+_CONTAINERS_M4A = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+# moov/trak/mdia/minf/stbl são 5 níveis; mais que isso só num arquivo malformado
+_PROFUNDIDADE_MAXIMA_M4A = 8
+_CODECS_M4A = {b"mp4a": "aac", b"alac": "alac", b"Opus": "opus", b"ac-3": "ac3", b"fLaC": "flac"}
+
+
+def _atomos(visao: memoryview, inicio: int, fim: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Itera (tipo, início_do_conteúdo, fim) dos átomos em [inicio, fim)."""
+    pos = inicio
+    while pos + 8 <= fim:
+        (tamanho,) = struct.unpack_from(">I", visao, pos)
+        tipo = bytes(visao[pos + 4:pos + 8])
+        cabecalho = 8
+        if tamanho == 1:
+            if pos + 16 > fim:
+                raise AudioInvalidoError("átomo M4A com tamanho estendido truncado")
+            (tamanho,) = struct.unpack_from(">Q", visao, pos + 8)
+            cabecalho = 16
+        elif tamanho == 0:
+            tamanho = fim - pos
+        if tamanho < cabecalho or pos + tamanho > fim:
+            raise AudioInvalidoError(f"átomo M4A '{tipo.decode('latin-1')}' com tamanho inválido")
+        yield tipo, pos + cabecalho, pos + tamanho
+        pos += tamanho
+
+
+def _inspecionar_m4a(visao: memoryview) -> InfoAudio:
+    duracao = None
+    codec = taxa = canais = bits = None
+    taxa_mdhd = escala_faixa = None
+
+    def percorrer(inicio: int, fim: int, profundidade: int = 0) -> None:
+        nonlocal duracao, codec, taxa, canais, bits, taxa_mdhd, escala_faixa
+        if profundidade > _PROFUNDIDADE_MAXIMA_M4A:
+            raise AudioInvalidoError("átomos M4A aninhados demais")
+        for tipo, ini, fim_atomo in _atomos(visao, inicio, fim):
+            if tipo in _CONTAINERS_M4A:
+                percorrer(ini, fim_atomo, profundidade + 1)
+            elif tipo == b"mvhd":
+                escala, total = _ler_cabecalho_tempo(visao, ini, fim_atomo)
+                duracao = total / escala
+            elif tipo == b"mdhd":
+                # Em faixas de áudio o timescale do mdhd costuma ser a taxa de amostragem
+                escala_faixa = _ler_cabecalho_tempo(visao, ini, fim_atomo)[0]
+            elif tipo == b"stsd" and codec is None and ini + 8 + 36 <= fim_atomo:
+                entrada = ini + 8  # versão/flags + número de entradas
+                formato = bytes(visao[entrada + 4:entrada + 8])
+                if formato in _CODECS_M4A:  # ignora faixas de vídeo/texto
+                    codec = _CODECS_M4A[formato]
+                    taxa_mdhd = escala_faixa
+                    canais, bits = struct.unpack_from(">HH", visao, entrada + 24)
+                    (taxa,) = struct.unpack_from(">I", visao, entrada + 32)
+                    taxa >>= 16  # ponto fixo 16.16
+
+    percorrer(0, len(visao))
+    if duracao is None:
+        raise AudioInvalidoError("M4A sem átomo 'mvhd'")
+    if codec is None:
+        raise AudioInvalidoError("M4A sem faixa de áudio")
+    taxa = taxa or taxa_mdhd
+    if not taxa or not canais:
+        raise AudioInvalidoError("M4A com taxa de amostragem ou canais inválidos")
+    return InfoAudio(
+        formato="m4a",
+        codec=codec,
+        duracao_segundos=duracao,
+        taxa_amostragem=taxa,
+        canais=canais,
+        bits_por_amostra=bits or None
+    )
+
+
+def _ler_cabecalho_tempo(visao: memoryview, inicio: int, fim: int) -> Tuple[int, int]:
+    """Lê (timescale, duration) de um átomo mvhd/mdhd, versões 0 e 1."""
+    if inicio >= fim:
+        raise AudioInvalidoError("átomo de tempo M4A truncado")
+    versao = visao[inicio]
+    if versao == 1:
+        if inicio + 32 > fim:
+            raise AudioInvalidoError("átomo de tempo M4A truncado")
+        escala, total = struct.unpack_from(">IQ", visao, inicio + 20)
+    else:
+        if inicio + 20 > fim:
+            raise AudioInvalidoError("átomo de tempo M4A truncado")
+        escala, total = struct.unpack_from(">II", visao, inicio + 12)
+    if not escala:
+        raise AudioInvalidoError("timescale zerado no M4A")
+    return escala, total
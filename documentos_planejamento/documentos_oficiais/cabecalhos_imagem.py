@@ -0,0 +1,121 @@
+"""
+Leitura de cabeçalhos de imagem para o Professor Virtual ADK
+Identifica formato e dimensões de arquivos PNG, JPEG e WebP lendo apenas os
+cabeçalhos (sem decodificar os pixels), sobre um memoryview do conteúdo.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Optional, Union
+
+
+class ImagemInvalidaError(ValueError):
+    """O conteúdo não é uma imagem suportada ou o cabeçalho está corrompido."""
+
+
+@dataclass
+class InfoImagem:
+    """Metadados extraídos do cabeçalho de uma imagem"""
+    formato: str  # png, jpeg ou webp (detectado pelo conteúdo)
+    largura: int
+    altura: int
+
+    @property
+    def megapixels(self) -> float:
+        return self.largura * self.altura / 1e6
+
+
+Dados = Union[bytes, bytearray, memoryview]
+
+
+def detectar_formato_imagem(dados: Dados) -> Optional[str]:
+    """Identifica o formato pelos bytes mágicos; retorna None se desconhecido."""
+    cabecalho = bytes(memoryview(dados)[:12])
+    if cabecalho[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if cabecalho[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if cabecalho[:4] == b"RIFF" and cabecalho[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def inspecionar_imagem(dados: Dados) -> InfoImagem:
+    """Lê o cabeçalho da imagem e retorna formato e dimensões.
+
+    Raises:
+        ImagemInvalidaError: formato desconhecido ou cabeçalho inconsistente.
+    """
+    formato = detectar_formato_imagem(dados)
+    visao = memoryview(dados)
+    if formato == "png":
+        info = _inspecionar_png(visao)
+    elif formato == "jpeg":
+        info = _inspecionar_jpeg(visao)
+    elif formato == "webp":
+        info = _inspecionar_webp(visao)
+    else:
+        raise ImagemInvalidaError("formato de imagem não reconhecido")
+    if info.largura <= 0 or info.altura <= 0:
+        raise ImagemInvalidaError("imagem com dimensões zeradas")
+    return info
+
+
+def _inspecionar_png(visao: memoryview) -> InfoImagem:
+    if len(visao) < 24 or bytes(visao[12:16]) != b"IHDR":
+        raise ImagemInvalidaError("PNG sem chunk IHDR")
+    largura, altura = struct.unpack_from(">II", visao, 16)
+    return InfoImagem("png", largura, altura)
+
+
+# Marcadores SOF (início de quadro) que trazem as dimensões; C4, C8 e CC são
+# outros segmentos (tabelas Huffman/aritméticas) apesar da faixa numérica.
+_MARCADORES_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _inspecionar_jpeg(visao: memoryview) -> InfoImagem:
+    pos = 2
+    n = len(visao)
+    while pos + 4 <= n:
+        if visao[pos] != 0xFF:
+            raise ImagemInvalidaError("marcador JPEG inválido")
+        marcador = visao[pos + 1]
+        if marcador == 0xFF:  # bytes de preenchimento entre segmentos
+            pos += 1
+            continue
+        if marcador in (0xD8, 0x01) or 0xD0 <= marcador <= 0xD7:  # sem payload
+            pos += 2
+            continue
+        (tamanho,) = struct.unpack_from(">H", visao, pos + 2)
+        if tamanho < 2 or pos + 2 + tamanho > n:
+            raise ImagemInvalidaError("segmento JPEG truncado")
+        if marcador in _MARCADORES_SOF:
+            if tamanho < 7:
+                raise ImagemInvalidaError("segmento SOF truncado")
+            altura, largura = struct.unpack_from(">HH", visao, pos + 5)
+            return InfoImagem("jpeg", largura, altura)
+        elif marcador == 0xDA:  # início dos dados comprimidos sem SOF antes
+            break
+        pos += 2 + tamanho
+    raise ImagemInvalidaError("JPEG sem segmento SOF")
+
+
+def _inspecionar_webp(visao: memoryview) -> InfoImagem:
+    if len(visao) < 30:
+        raise ImagemInvalidaError("WebP truncado")
+    chunk = bytes(visao[12:16])
+    if chunk == b"VP8 ":  # com perdas: cabeçalho do quadro-chave
+        if bytes(visao[23:26]) != b"\x9d\x01\x2a":
+            raise ImagemInvalidaError("quadro VP8 inválido")
+        largura, altura = struct.unpack_from("<HH", visao, 26)
+        return InfoImagem("webp", largura & 0x3FFF, altura & 0x3FFF)
+    if chunk == b"VP8L":  # sem perdas: 14 bits de (largura-1) e (altura-1)
+        if visao[20] != 0x2F:
+            raise ImagemInvalidaError("assinatura VP8L inválida")
+        (bits,) = struct.unpack_from("<I", visao, 21)
+        return InfoImagem("webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":  # estendido: tela de 24 bits (valor+1)
+        largura = int.from_bytes(visao[24:27], "little") + 1
+        altura = int.from_bytes(visao[27:30], "little") + 1
+        return InfoImagem("webp", largura, altura)
+    raise ImagemInvalidaError("chunk WebP desconhecido")
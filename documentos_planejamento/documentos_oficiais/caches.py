@@ -0,0 +1,402 @@
+"""
+Caches das ferramentas do Professor Virtual ADK
+Evitam chamar de novo os serviços externos (STT, TTS, visão) para conteúdo já
+processado: reenvios do aplicativo, novas tentativas, a mesma pergunta gravada
+de novo e frases fixas repetidas retornam o resultado guardado, identificado
+pelo hash do conteúdo. Fotos do mesmo exercício tiradas por alunos diferentes
+são reconhecidas pelo hash perceptual.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+
+def hash_conteudo(dados: bytes) -> str:
+    """Hash do conteúdo binário usado como endereço nos caches."""
+    return hashlib.blake2b(dados, digest_size=16).hexdigest()
+
+
+class CacheLRU:
+    """Cache em memória com limite de itens e expiração por tempo (TTL).
+
+    Seguro para uso concorrente. Mantém contadores de acertos, faltas,
+    expirações e remoções por limite de tamanho.
+
+    Args:
+        max_itens: Número máximo de entradas (None = sem limite); a menos usada
+                   recentemente sai primeiro.
+        ttl_segundos: Validade de cada entrada (None = sem expiração).
+        relogio: Fonte de tempo monotônica (substituível em testes).
+        max_bytes: Limite opcional da soma de `len(valor)` das entradas.
+    """
+
+    def __init__(
+        self,
+        max_itens: Optional[int] = 1024,
+        ttl_segundos: Optional[float] = 3600.0,
+        relogio: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None
+    ):
+        self.max_itens = max_itens
+        self.ttl_segundos = ttl_segundos
+        self.max_bytes = max_bytes
+        self._relogio = relogio
+        self._itens: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_total = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.expirados = 0
+        self.removidos = 0
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def __contains__(self, chave: Hashable) -> bool:
+        """Verifica se há entrada válida, sem alterar contadores nem a ordem LRU."""
+        item = self._itens.get(chave)
+        return item is not None and item[0] >= self._relogio()
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """Retorna o valor guardado ou None (falta ou entrada expirada)."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.faltas += 1
+                return None
+            expira_em, valor = item
+            if expira_em < self._relogio():
+                self._remover(chave)
+                self.expirados += 1
+                self.faltas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def guardar(self, chave: Hashable, valor: Any) -> None:
+        tamanho = len(valor) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and tamanho > self.max_bytes:
+            return  # maior que o cache inteiro: não vale a pena guardar
+        with self._lock:
+            ttl = self.ttl_segundos
+            expira_em = self._relogio() + ttl if ttl is not None else float("inf")
+            if chave in self._itens:
+                self._remover(chave)
+            self._itens[chave] = (expira_em, valor)
+            self.bytes_total += tamanho
+            while (self.max_itens is not None and len(self._itens) > self.max_itens) or (
+                self.max_bytes is not None and self.bytes_total > self.max_bytes
+            ):
+                self._remover(next(iter(self._itens)))
+                self.removidos += 1
+
+    def chaves(self) -> List[Hashable]:
+        """Cópia das chaves presentes, da menos para a mais usada recentemente."""
+        with self._lock:
+            return list(self._itens)
+
+    def _remover(self, chave: Hashable) -> None:
+        _, valor = self._itens.pop(chave)
+        if self.max_bytes is not None:
+            self.bytes_total -= len(valor)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+            self.bytes_total = 0
+
+
+class CacheTranscricao:
+    """Cache de transcrições endereçado pelo conteúdo do áudio.
+
+    A chave combina o hash dos bytes do artefato, o idioma e a configuração do
+    backend de STT (e do preparo do áudio). Cada entrada guarda o texto e o
+    resumo do preparo (segundos removidos, bytes economizados), para que um
+    acerto devolva a mesma resposta sem preparar o áudio de novo. A primeira
+    camada é um CacheLRU em memória; opcionalmente, uma segunda camada em
+    SQLite sobrevive a reinícios do processo.
+
+    Args:
+        max_itens: Limite de entradas em memória.
+        ttl_segundos: Validade das entradas (memória e disco).
+        caminho_sqlite: Arquivo SQLite da camada em disco (None = desativada).
+    """
+
+    def __init__(
+        self,
+        max_itens: int = 1024,
+        ttl_segundos: Optional[float] = 24 * 3600.0,
+        caminho_sqlite: Optional[str] = None
+    ):
+        self.ttl_segundos = ttl_segundos
+        self.memoria = CacheLRU(max_itens=max_itens, ttl_segundos=ttl_segundos)
+        self.acertos_disco = 0
+        self.segundos_audio_economizados = 0.0
+        self._lock = threading.Lock()
+        self._sqlite = None
+        if caminho_sqlite:
+            self._sqlite = sqlite3.connect(caminho_sqlite, check_same_thread=False)
+            self._sqlite.execute(
+                "CREATE TABLE IF NOT EXISTS transcricoes "
+                "(chave TEXT PRIMARY KEY, texto TEXT NOT NULL, criado_em REAL NOT NULL, preparo TEXT)"
+            )
+            try:  # arquivo criado antes do resumo do preparo
+                self._sqlite.execute("ALTER TABLE transcricoes ADD COLUMN preparo TEXT")
+            except sqlite3.OperationalError:
+                pass
+            self._sqlite.commit()
+
+    @staticmethod
+    def chave(audio: bytes, idioma: str, configuracao_backend: str) -> str:
+        return f"{hash_conteudo(audio)}:{idioma}:{configuracao_backend}"
+
+    def obter(
+        self,
+        chave: str,
+        duracao_segundos: float = 0.0
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Retorna (transcrição, resumo do preparo), consultando memória e depois disco.
+
+        `duracao_segundos` é somado ao total de áudio que deixou de ir ao STT.
+        """
+        entrada = self.memoria.obter(chave)
+        if entrada is None and self._sqlite is not None:
+            entrada = self._obter_disco(chave)
+            if entrada is not None:
+                self.acertos_disco += 1
+                self.memoria.guardar(chave, entrada)
+        if entrada is not None:
+            self.segundos_audio_economizados += duracao_segundos
+        return entrada
+
+    def guardar(self, chave: str, texto: str, preparo: Dict[str, Any]) -> None:
+        self.memoria.guardar(chave, (texto, preparo))
+        if self._sqlite is not None:
+            with self._lock:
+                self._sqlite.execute(
+                    "INSERT OR REPLACE INTO transcricoes VALUES (?, ?, ?, ?)",
+                    (chave, texto, time.time(), json.dumps(preparo))
+                )
+                self._sqlite.commit()
+
+    def _obter_disco(self, chave: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            linha = self._sqlite.execute(
+                "SELECT texto, criado_em, preparo FROM transcricoes "
+                "WHERE chave = ? AND preparo IS NOT NULL", (chave,)
+            ).fetchone()
+            if linha is None:
+                return None
+            texto, criado_em, preparo = linha
+            if self.ttl_segundos is not None and criado_em + self.ttl_segundos < time.time():
+                self._sqlite.execute("DELETE FROM transcricoes WHERE chave = ?", (chave,))
+                self._sqlite.commit()
+                return None
+            return texto, json.loads(preparo)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores para acompanhar quanto STT o cache está economizando."""
+        acertos = self.memoria.acertos + self.acertos_disco
+        # Um acerto no disco também conta como falta na memória
+        faltas = self.memoria.faltas - self.acertos_disco
+        total = acertos + faltas
+        return {
+            "acertos": acertos,
+            "acertos_memoria": self.memoria.acertos,
+            "acertos_disco": self.acertos_disco,
+            "faltas": faltas,
+            "taxa_acerto": acertos / total if total else 0.0,
+            "itens_memoria": len(self.memoria),
+            "expirados": self.memoria.expirados,
+            "removidos": self.memoria.removidos,
+            "segundos_audio_economizados": self.segundos_audio_economizados,
+        }
+
+    def fechar(self) -> None:
+        if self._sqlite is not None:
+            self._sqlite.close()
+            self._sqlite = None
+
+
+class CacheTTS:
+    """Cache de áudios sintetizados, limitado pelo total de bytes guardados.
+
+    A chave combina texto, voz, velocidade, a configuração do backend de TTS e
+    o formato (mime type) do áudio que ele produz.
+    Frases fixas (saudações, mensagens de erro) passam a ser sintetizadas uma
+    única vez por processo; `pre_gerar_audios_fixos` pode aquecê-lo na partida.
+
+    Args:
+        max_bytes: Limite da soma dos tamanhos dos áudios em memória.
+        ttl_segundos: Validade das entradas (None = sem expiração).
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl_segundos: Optional[float] = None):
+        self.memoria = CacheLRU(max_itens=None, ttl_segundos=ttl_segundos, max_bytes=max_bytes)
+        self.bytes_economizados = 0
+
+    @staticmethod
+    def chave(texto: str, voz: str, velocidade: float, configuracao_backend: str, mime_type: str) -> str:
+        identidade = f"{voz}|{velocidade:g}|{configuracao_backend}|{mime_type}|{texto.strip()}"
+        return hash_conteudo(identidade.encode("utf-8"))
+
+    def __contains__(self, chave: str) -> bool:
+        return chave in self.memoria
+
+    def obter(self, chave: str) -> Optional[bytes]:
+        audio = self.memoria.obter(chave)
+        if audio is not None:
+            self.bytes_economizados += len(audio)
+        return audio
+
+    def guardar(self, chave: str, audio: bytes) -> None:
+        self.memoria.guardar(chave, audio)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        total = self.memoria.acertos + self.memoria.faltas
+        return {
+            "acertos": self.memoria.acertos,
+            "faltas": self.memoria.faltas,
+            "taxa_acerto": self.memoria.acertos / total if total else 0.0,
+            "itens": len(self.memoria),
+            "bytes_em_cache": self.memoria.bytes_total,
+            "bytes_economizados": self.bytes_economizados,
+            "removidos": self.memoria.removidos,
+        }
+
+
+def distancia_hamming(a: int, b: int) -> int:
+    """Quantidade de bits diferentes entre dois hashes perceptuais."""
+    return bin(a ^ b).count("1")
+
+
+class CacheAnaliseImagem:
+    """Cache de análises de imagem que reconhece fotos quase idênticas.
+
+    A impressão de cada imagem é o hash perceptual de 64 bits (dHash, ver
+    `qualidade_imagem.estimar_medidas`): fotos da mesma página com outra
+    compressão, brilho ou enquadramento levemente diferente ficam a poucos bits
+    de distância. Sem Pillow/NumPy, a impressão é o hash do conteúdo (str) e só
+    arquivos idênticos são reaproveitados.
+
+    A chave leva só a impressão e a configuração do backend: o que fica
+    guardado é a parte da análise que depende apenas da imagem (tipo de
+    conteúdo, elementos detectados, contexto educacional da página). A parte
+    que depende da pergunta é montada a cada chamada, de modo que alunos
+    diferentes perguntando sobre a mesma folha de exercícios dividem a entrada.
+
+    A busca aproximada percorre as impressões guardadas (limitadas por
+    `max_itens`) com o mesmo backend e usa a de menor distância de Hamming, se
+    não passar de `distancia_maxima`.
+
+    Args:
+        max_itens: Limite de análises guardadas; a menos usada sai primeiro.
+        ttl_segundos: Validade das entradas (None = sem expiração).
+        distancia_maxima: Bits de diferença aceitos entre dois dHash.
+    """
+
+    def __init__(
+        self,
+        max_itens: int = 4096,
+        ttl_segundos: Optional[float] = 7 * 24 * 3600.0,
+        distancia_maxima: int = 10
+    ):
+        self.memoria = CacheLRU(max_itens=max_itens, ttl_segundos=ttl_segundos)
+        self.distancia_maxima = distancia_maxima
+        self.acertos_exatos = 0
+        self.acertos_aproximados = 0
+        self.faltas = 0
+
+    @staticmethod
+    def chave(impressao: Union[int, str], configuracao_backend: str) -> Tuple[str, Union[int, str]]:
+        return (configuracao_backend, impressao)
+
+    def obter(self, chave: Tuple[str, Union[int, str]]) -> Optional[Dict[str, Any]]:
+        """Retorna a análise de uma imagem igual ou quase igual, ou None."""
+        if chave in self.memoria:
+            analise = self.memoria.obter(chave)
+            if analise is not None:
+                self.acertos_exatos += 1
+                return analise
+        configuracao, impressao = chave
+        if isinstance(impressao, int):
+            vizinha = self._mais_proxima(configuracao, impressao)
+            if vizinha is not None:
+                analise = self.memoria.obter(vizinha)
+                if analise is not None:
+                    self.acertos_aproximados += 1
+                    return analise
+        self.faltas += 1
+        return None
+
+    def _mais_proxima(self, configuracao: str, impressao: int) -> Optional[Tuple[str, int]]:
+        melhor, melhor_distancia = None, self.distancia_maxima + 1
+        for candidata in self.memoria.chaves():
+            if candidata[0] != configuracao or not isinstance(candidata[1], int):
+                continue
+            distancia = distancia_hamming(impressao, candidata[1])
+            if distancia < melhor_distancia:
+                melhor, melhor_distancia = candidata, distancia
+        return melhor
+
+    def guardar(self, chave: Tuple[str, Union[int, str]], analise: Dict[str, Any]) -> None:
+        self.memoria.guardar(chave, analise)
+
+    def estatisticas(self) -> Dict[str, Any]:
+        """Contadores para acompanhar quantas chamadas de visão o cache evita."""
+        acertos = self.acertos_exatos + self.acertos_aproximados
+        total = acertos + self.faltas
+        return {
+            "acertos": acertos,
+            "acertos_exatos": self.acertos_exatos,
+            "acertos_aproximados": self.acertos_aproximados,
+            "faltas": self.faltas,
+            "taxa_acerto": acertos / total if total else 0.0,
+            "itens": len(self.memoria),
+            "expirados": self.memoria.expirados,
+            "removidos": self.memoria.removidos,
+        }
+
+
+_cache_transcricao: Optional[CacheTranscricao] = CacheTranscricao()
+_cache_tts: Optional[CacheTTS] = CacheTTS()
+_cache_analise_imagem: Optional[CacheAnaliseImagem] = CacheAnaliseImagem()
+
+
+def obter_cache_transcricao() -> Optional[CacheTranscricao]:
+    """Retorna o cache de transcrições em uso (None = cache desativado)."""
+    return _cache_transcricao
+
+
+def configurar_cache_transcricao(cache: Optional[CacheTranscricao]) -> None:
+    """Substitui o cache de transcrições; use None para desativá-lo."""
+    global _cache_transcricao
+    _cache_transcricao = cache
+
+
+def obter_cache_tts() -> Optional[CacheTTS]:
+    """Retorna o cache de áudios TTS em uso (None = cache desativado)."""
+    return _cache_tts
+
+
+def configurar_cache_tts(cache: Optional[CacheTTS]) -> None:
+    """Substitui o cache de áudios TTS; use None para desativá-lo."""
+    global _cache_tts
+    _cache_tts = cache
+
+
+def obter_cache_analise_imagem() -> Optional[CacheAnaliseImagem]:
+    """Retorna o cache de análises de imagem em uso (None = cache desativado)."""
+    return _cache_analise_imagem
+
+
+def configurar_cache_analise_imagem(cache: Optional[CacheAnaliseImagem]) -> None:
+    """Substitui o cache de análises de imagem; use None para desativá-lo."""
+    global _cache_analise_imagem
+    _cache_analise_imagem = cache
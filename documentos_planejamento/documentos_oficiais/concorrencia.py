@@ -0,0 +1,48 @@
+"""
+Pool de threads compartilhado pelas ferramentas assíncronas do Professor Virtual ADK
+Trabalho de CPU (leitura de cabeçalhos, miniaturas de imagem) e chamadas a
+backends que só têm API bloqueante rodam aqui, fora do event loop do runner.
+O pool é limitado para que muitas sessões simultâneas não disparem threads sem
+controle.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+MAX_TRABALHADORES_PADRAO = min(8, (os.cpu_count() or 1) + 2)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_max_trabalhadores = MAX_TRABALHADORES_PADRAO
+_lock = threading.Lock()
+
+
+def obter_executor() -> ThreadPoolExecutor:
+    """Retorna o pool compartilhado, criando-o no primeiro uso."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=_max_trabalhadores, thread_name_prefix="professor"
+            )
+        return _executor
+
+
+def configurar_executor(max_trabalhadores: int = MAX_TRABALHADORES_PADRAO) -> None:
+    """Redimensiona o pool; tarefas já submetidas terminam no pool anterior."""
+    global _executor, _max_trabalhadores
+    with _lock:
+        anterior, _executor = _executor, None
+        _max_trabalhadores = max_trabalhadores
+    if anterior is not None:
+        anterior.shutdown(wait=False)
+
+
+async def em_thread(funcao: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Executa `funcao` no pool compartilhado e aguarda o resultado."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(obter_executor(), functools.partial(funcao, *args, **kwargs))
@@ -0,0 +1,362 @@
+"""
+Versões assíncronas das ferramentas do Professor Virtual ADK
+O FunctionTool do ADK aguarda ferramentas definidas com `async def`, então estas
+versões não bloqueiam o event loop do runner enquanto o STT, a visão ou o TTS
+respondem: sessões simultâneas são atendidas em paralelo. A leitura e a
+validação dos artefatos (cabeçalhos, miniatura de imagem) rodam no pool de
+threads limitado de concorrencia.py.
+
+As funções têm os mesmos nomes, argumentos e retornos das versões síncronas de
+implementation.py, que continuam disponíveis; assim a declaração vista pelo
+modelo não muda ao registrar `PROFESSOR_TOOLS_ASYNC` no lugar de
+`PROFESSOR_TOOLS`.
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict
+
+from google.adk.tools import ToolContext
+
+from backends import obter_backend_stt, obter_backend_tts, obter_backend_visao
+from caches import hash_conteudo
+from concorrencia import em_thread
+from implementation import (
+    _audio_tts_em_cache,
+    _carregar_audio,
+    _consultar_cache_transcricao,
+    _guardar_analise_imagem,
+    _guardar_audio_tts,
+    _guardar_transcricao,
+    _metadados_audio,
+    _nome_artefato_tts,
+    _preparar_analise_imagem,
+    _preparar_audio,
+    _resposta_analise_imagem,
+    _resumo_preparo,
+    analisar_necessidade_visual,
+    dividir_em_frases,
+    extrair_contexto_educacional,
+)
+from lote_stt import obter_agendador_stt
+from memoizacao_sessao import memoizar_na_sessao
+from metricas import instrumentar_ferramentas
+from pre_processamento import obter_resultado_antecipado_async
+
+# Sínteses TTS em andamento, por event loop e chave de cache: as partes com a
+# mesma frase, na mesma resposta ou em respostas simultâneas de outras sessões,
+# esperam a mesma síntese em vez de chamar o backend de novo
+_sinteses_em_andamento: Dict[asyncio.AbstractEventLoop, Dict[str, "asyncio.Task[bytes]"]] = {}
+
+
+async def transcrever_audio(
+    nome_artefato_audio: str,
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """Transcreve um artefato de áudio para texto usando serviços de speech-to-text.
+
+    Versão assíncrona de `implementation.transcrever_audio`, com o mesmo retorno.
+
+    Args:
+        nome_artefato_audio: O nome do artefato de áudio a ser processado.
+                             Ex: "pergunta_aluno_123.wav"
+        tool_context: Contexto da ferramenta ADK, usado para acessar o artefato.
+
+    Returns:
+        Dict contendo o texto transcrito e os metadados do áudio.
+    """
+    antecipado = await obter_resultado_antecipado_async(tool_context, nome_artefato_audio)
+    if antecipado is not None:
+        return antecipado["transcricao"]
+    return await _transcrever_audio(nome_artefato_audio, tool_context)
+
+
+async def _transcrever_audio(nome_artefato_audio: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """Transcrição sem consultar o pré-processamento (usada também por ele)."""
+    try:
+        audio_bytes, info, erro = await em_thread(_carregar_audio, nome_artefato_audio, tool_context)
+        if erro:
+            return erro
+
+        # O hash do artefato para a chave do cache também fica fora do event loop
+        backend = obter_backend_stt()
+        chave, em_cache = await em_thread(_consultar_cache_transcricao, audio_bytes, info, backend)
+        if em_cache is not None:
+            texto_transcrito, preparo = em_cache
+            return {"sucesso": True, "texto": texto_transcrito, **_metadados_audio(audio_bytes, info, preparo)}
+
+        preparado, erro = await em_thread(_preparar_audio, audio_bytes, info)
+        if erro:
+            return erro
+
+        # Com o agendador de lotes, sessões simultâneas dividem uma requisição
+        agendador = obter_agendador_stt()
+        transcrever = agendador.transcrever if agendador else backend.transcrever_async
+        texto_transcrito = await transcrever(preparado.dados, preparado.formato, "pt-BR")
+        preparo = _resumo_preparo(preparado)
+        _guardar_transcricao(chave, texto_transcrito, preparo)
+
+        return {
+            "sucesso": True,
+            "texto": texto_transcrito,
+            **_metadados_audio(audio_bytes, info, preparo)
+        }
+
+    except Exception as e:
+        return {"erro": f"Erro ao transcrever áudio: {str(e)}", "sucesso": False}
+
+
+async def compreender_pergunta_audio(
+    nome_artefato_audio: str,
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """Transcreve a pergunta gravada e já analisa o texto, numa única chamada.
+
+    Versão assíncrona de `implementation.compreender_pergunta_audio`, com o
+    mesmo retorno.
+
+    Args:
+        nome_artefato_audio: O nome do artefato de áudio a ser processado.
+                             Ex: "pergunta_aluno_123.wav"
+        tool_context: Contexto da ferramenta ADK, usado para acessar o artefato.
+
+    Returns:
+        Dict com os campos de `transcrever_audio`, `necessidade_visual` e
+        `contexto_educacional`.
+    """
+    transcricao = await transcrever_audio(nome_artefato_audio, tool_context)
+    if not transcricao.get("sucesso"):
+        return transcricao
+    return {
+        **transcricao,
+        "necessidade_visual": analisar_necessidade_visual(transcricao["texto"], tool_context),
+        "contexto_educacional": extrair_contexto_educacional(transcricao["texto"])
+    }
+
+
+async def analisar_imagem_educacional(
+    nome_artefato_imagem: str,
+    contexto_pergunta: str,
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """Extrai informações educacionais relevantes de um artefato de imagem.
+
+    Versão assíncrona de `implementation.analisar_imagem_educacional`, com o
+    mesmo retorno.
+
+    Args:
+        nome_artefato_imagem: O nome do artefato de imagem a ser processado.
+                              Ex: "exercicio_matematica_001.png"
+        contexto_pergunta: Contexto da pergunta original da criança.
+        tool_context: Contexto da ferramenta ADK, usado para acessar o artefato.
+
+    Returns:
+        Dict com análise educacional da imagem.
+    """
+    try:
+        backend = obter_backend_visao()
+        resposta, preparo = await em_thread(
+            _preparar_analise_imagem, nome_artefato_imagem, contexto_pergunta, tool_context, backend
+        )
+        if resposta:
+            return resposta
+        imagem_bytes, info, chave, analise, tamanho_original = preparo
+
+        if analise is None:
+            analise = await backend.analisar_async(imagem_bytes, contexto_pergunta)
+            _guardar_analise_imagem(chave, analise)
+        return _resposta_analise_imagem(
+            analise, info, tamanho_original, len(imagem_bytes), contexto_pergunta
+        )
+
+    except Exception as e:
+        return {
+            "erro": f"Erro ao analisar imagem: {str(e)}",
+            "sucesso": False, "qualidade_adequada": False
+        }
+
+
+async def gerar_audio_tts(
+    texto: str,
+    tool_context: ToolContext,
+    velocidade: float = 1.0,
+    voz: str = "pt-BR-Standard-A"
+) -> Dict[str, Any]:
+    """Gera um artefato de áudio TTS a partir de um texto.
+
+    Versão assíncrona de `implementation.gerar_audio_tts`, com o mesmo retorno.
+
+    Args:
+        texto: Texto para converter em áudio.
+        tool_context: Contexto da ferramenta ADK.
+        velocidade: Velocidade da fala (0.5 a 2.0).
+        voz: Identificador da voz a usar.
+
+    Returns:
+        Dict indicando o sucesso e o nome do artefato de áudio criado.
+    """
+    try:
+        if not texto or len(texto.strip()) == 0:
+            return {"erro": "Texto vazio fornecido", "sucesso": False}
+
+        backend = obter_backend_tts()
+        chave, nome_artefato = _nome_artefato_tts(texto, voz, velocidade, backend)
+        if tool_context.session.get_artifact(nome_artefato) is None:
+            audio_bytes = _audio_tts_em_cache(chave)
+            if audio_bytes is None:
+                audio_bytes = await backend.sintetizar_async(texto, voz, velocidade)
+                _guardar_audio_tts(chave, audio_bytes)
+            tool_context.session.create_artifact(
+                name=nome_artefato,
+                content=audio_bytes,
+                mime_type=backend.mime_type
+            )
+
+        return {
+            "sucesso": True,
+            "nome_artefato_gerado": nome_artefato,
+            "tamanho_caracteres": len(texto)
+        }
+
+    except Exception as e:
+        return {"erro": f"Erro ao gerar áudio TTS: {str(e)}", "sucesso": False}
+
+
+async def gerar_audio_tts_stream(
+    texto: str,
+    tool_context: ToolContext,
+    velocidade: float = 1.0,
+    voz: str = "pt-BR-Standard-A",
+    max_paralelo: int = 3,
+    max_caracteres_parte: int = 200
+) -> AsyncIterator[Dict[str, Any]]:
+    """Gera o áudio da resposta em partes, frase a frase, para tocar mais cedo.
+
+    Versão em streaming de `gerar_audio_tts` para uso pelo runner/aplicação: o
+    texto é dividido em frases (`dividir_em_frases`), sintetizadas em paralelo
+    com no máximo `max_paralelo` chamadas simultâneas ao backend, e cada parte
+    vira um artefato próprio. Antes da primeira parte, um manifesto JSON
+    (`resposta_tts_<hash>.json`) é salvo com a lista ordenada dos artefatos, que
+    têm nomes derivados do conteúdo; o cliente pode começar a tocar a primeira
+    parte enquanto as demais ainda são sintetizadas. Frases repetidas
+    reaproveitam o cache de TTS e os artefatos da sessão.
+
+    Args:
+        texto: Texto para converter em áudio.
+        tool_context: Contexto da ferramenta ADK.
+        velocidade: Velocidade da fala (0.5 a 2.0).
+        voz: Identificador da voz a usar.
+        max_paralelo: Limite de sínteses simultâneas.
+        max_caracteres_parte: Tamanho máximo aproximado de cada parte.
+
+    Yields:
+        Um dict por parte, em ordem ({"sucesso": True, "parcial": True,
+        "indice", "total_partes", "nome_artefato_gerado", "nome_manifesto"}) e,
+        por último, {"parcial": False, "nome_manifesto", "partes": [nomes],
+        "tamanho_caracteres"}. Em caso de erro, um dict com sucesso=False.
+    """
+    tarefas = []
+    try:
+        frases = dividir_em_frases(texto or "", max_caracteres_parte)
+        if not frases:
+            yield {"erro": "Texto vazio fornecido", "sucesso": False}
+            return
+
+        backend = obter_backend_tts()
+        partes = [_nome_artefato_tts(frase, voz, velocidade, backend) for frase in frases]
+        nomes = [nome for _, nome in partes]
+        nome_manifesto = f"resposta_tts_{hash_conteudo(' '.join(nomes).encode('utf-8'))}.json"
+        manifesto = {
+            "mime_type": backend.mime_type,
+            "partes": [{"indice": i, "nome_artefato": nome, "texto": frase}
+                       for i, (nome, frase) in enumerate(zip(nomes, frases))],
+        }
+        tool_context.session.create_artifact(
+            name=nome_manifesto,
+            content=json.dumps(manifesto, ensure_ascii=False).encode("utf-8"),
+            mime_type="application/json"
+        )
+
+        limite = asyncio.Semaphore(max_paralelo)
+
+        async def sintetizar(chave: str, frase: str) -> bytes:
+            async with limite:
+                # Outra resposta pode ter guardado a frase enquanto esta esperava a vez
+                audio_bytes = _audio_tts_em_cache(chave)
+                if audio_bytes is None:
+                    audio_bytes = await backend.sintetizar_async(frase, voz, velocidade)
+                    _guardar_audio_tts(chave, audio_bytes)
+            return audio_bytes
+
+        async def sintetizar_parte(chave: str, nome: str, frase: str) -> None:
+            if tool_context.session.get_artifact(nome) is not None:
+                return
+            audio_bytes = _audio_tts_em_cache(chave)
+            if audio_bytes is None:
+                audio_bytes = await _sintese_compartilhada(chave, lambda: sintetizar(chave, frase))
+            if tool_context.session.get_artifact(nome) is None:  # frase repetida na resposta
+                tool_context.session.create_artifact(
+                    name=nome, content=audio_bytes, mime_type=backend.mime_type
+                )
+
+        # Tarefas criadas em ordem: o semáforo atende primeiro as frases iniciais
+        tarefas = [
+            asyncio.ensure_future(sintetizar_parte(chave, nome, frase))
+            for (chave, nome), frase in zip(partes, frases)
+        ]
+        for indice, tarefa in enumerate(tarefas):
+            await tarefa
+            yield {
+                "sucesso": True, "parcial": True,
+                "indice": indice, "total_partes": len(tarefas),
+                "nome_artefato_gerado": nomes[indice],
+                "nome_manifesto": nome_manifesto
+            }
+
+        yield {
+            "sucesso": True, "parcial": False,
+            "nome_manifesto": nome_manifesto,
+            "partes": nomes,
+            "tamanho_caracteres": len(texto)
+        }
+
+    except Exception as e:
+        yield {"erro": f"Erro ao gerar áudio TTS: {str(e)}", "sucesso": False}
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+
+
+def _sintese_compartilhada(chave: str, sintetizar: Callable[[], Awaitable[bytes]]) -> Awaitable[bytes]:
+    """Aguarda a síntese de `chave` em andamento no event loop, ou inicia uma.
+
+    A síntese é protegida (asyncio.shield): uma resposta abandonada pelo
+    cliente não cancela a síntese que outra resposta também espera.
+    """
+    loop = asyncio.get_running_loop()
+    em_andamento = _sinteses_em_andamento.setdefault(loop, {})
+    tarefa = em_andamento.get(chave)
+    if tarefa is None:
+        tarefa = em_andamento[chave] = loop.create_task(sintetizar())
+
+        def concluir(concluida: "asyncio.Task[bytes]") -> None:
+            if em_andamento.get(chave) is concluida:
+                del em_andamento[chave]
+            if not em_andamento and _sinteses_em_andamento.get(loop) is em_andamento:
+                del _sinteses_em_andamento[loop]
+            if not concluida.cancelled():
+                concluida.exception()  # um erro sem ninguém esperando não gera aviso
+
+        tarefa.add_done_callback(concluir)
+    return asyncio.shield(tarefa)
+
+
+# Registro das ferramentas assíncronas (mesmos nomes e métricas de PROFESSOR_TOOLS);
+# analisar_necessidade_visual é só CPU e leva microssegundos, segue síncrona
+PROFESSOR_TOOLS_ASYNC = instrumentar_ferramentas(memoizar_na_sessao({
+    "compreender_pergunta_audio": compreender_pergunta_audio,
+    "transcrever_audio": transcrever_audio,
+    "analisar_necessidade_visual": analisar_necessidade_visual,
+    "analisar_imagem_educacional": analisar_imagem_educacional,
+    "gerar_audio_tts": gerar_audio_tts
+}))
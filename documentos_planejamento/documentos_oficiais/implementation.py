@@ -6,9 +6,27 @@ o padrão de Artefatos para manipulação de dados binários.
 
 import re
 import base64
-from typing import Dict, Any, Optional, Tuple
+import mimetypes
+from typing import Dict, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass
-import uuid # Usado para gerar nomes de artefatos únicos
+
+from artefatos import ArtefatoLeitura, abrir_artefato
+from backends import (
+    BackendSTT, BackendTTS, BackendVisao, obter_backend_stt, obter_backend_tts, obter_backend_visao
+)
+from cabecalhos_audio import AudioInvalidoError, InfoAudio, detectar_formato_audio, inspecionar_audio
+from cabecalhos_imagem import ImagemInvalidaError, InfoImagem, inspecionar_imagem
+from caches import (
+    CacheAnaliseImagem, CacheTTS, hash_conteudo, obter_cache_analise_imagem,
+    obter_cache_transcricao, obter_cache_tts
+)
+from instruction_providers import frases_fixas
+from memoizacao_sessao import memoizar_na_sessao
+from metricas import instrumentar_ferramentas
+from pre_processamento import obter_resultado_antecipado
+from preparo_audio import AudioPreparado, configuracao_preparo, preparar_audio
+from preparo_imagem import TAMANHO_MAXIMO_ENTRADA, TAMANHO_MAXIMO_IMAGEM, preparar_imagem
+from qualidade_imagem import avaliar_qualidade, avaliar_resolucao
 
 # Imports do ADK (conforme documentação)
 from google.adk.tools import ToolContext, FunctionTool
@@ -33,6 +51,86 @@ class AnaliseImagemResult:
     sugestao_acao: Optional[str]
 
 
+# Vocabulário de referências visuais, escrito com a acentuação correta. Cada
+# letra acentuada vira uma classe que também aceita a forma sem acento, então
+# "aí"/"ai" e "tá"/"ta" casam igualmente; letras sem acento continuam literais
+# (por isso o demonstrativo "esta" não casa com o verbo "está").
+_DEMONSTRATIVOS_VISUAIS = ["esse", "esta", "esses", "estas", "aqui", "aí", "isso", "isto"]
+_VERBOS_VISUAIS = [r"mostr\w+", "ve[jr]", r"olh\w+", r"observ\w+"]
+_OBJETOS_VISUAIS = [
+    "figura", "imagem", "foto", "desenho", "gráfico", "diagrama",
+    "exercício", "questão", "problema",
+]
+_FRASES_VISUAIS = [
+    r"(?:tá|está)\s+(?:escrito|mostrando|aparecendo)",
+    r"o que (?:é|significa|quer dizer) (?:isso|isto)",
+    r"não (?:entendi|compreendi) (?:esse|este|essa|esta)",
+    r"(?:ajuda|me ajude|help) com (?:isso|este|esse)",
+]
+_ACENTOS = {
+    "á": "aá", "à": "aà", "â": "aâ", "ã": "aã", "é": "eé", "ê": "eê",
+    "í": "ií", "ó": "oó", "ô": "oô", "õ": "oõ", "ú": "uú", "ç": "cç",
+}
+
+
+def _sem_acento(padrao: str) -> str:
+    """Troca cada letra acentuada do padrão por uma classe com e sem acento."""
+    return "".join(f"[{_ACENTOS[c]}]" if c in _ACENTOS else c for c in padrao)
+
+
+def _alternativa(palavras: list[str]) -> str:
+    return "|".join(_sem_acento(p) for p in palavras)
+
+
+# Scanner único compilado na importação: uma só alternação percorre o texto uma
+# vez. As frases são consumidas inteiras (com um "aqui" opcional no fim) e as
+# palavras visuais dentro delas são contadas à parte, reproduzindo a contagem
+# dos sete padrões independentes da versão anterior.
+_PALAVRAS_VISUAIS = _alternativa(_DEMONSTRATIVOS_VISUAIS + _VERBOS_VISUAIS + _OBJETOS_VISUAIS)
+_SCANNER_VISUAL = re.compile(
+    r"\b(?:(?P<frase>" + _alternativa(_FRASES_VISUAIS) + r")(?P<frase_aqui>\s+aqui)?"
+    r"|(?P<aqui>(?:esse|esta|isso)\s+aqui)"
+    r"|(?P<palavra>" + _PALAVRAS_VISUAIS + r")"
+    r"|(?P<exercicio>(?:" + _alternativa(["exercício", "questão"]) + r")\w*)"
+    r")\b"
+)
+_PALAVRA_VISUAL = re.compile(r"\b(?:" + _PALAVRAS_VISUAIS + r")\b")
+_FINAL_AQUI = re.compile(r"(?:esse|esta|isso)\s+aqui$")
+
+
+def _pontuar_referencias_visuais(texto: str) -> Tuple[float, list[str]]:
+    """Varre o texto uma única vez e devolve (confiança, referências encontradas).
+
+    Cada referência vale 0.15; qualquer menção a exercício/questão soma 0.3 e
+    expressões como "esse aqui" somam 0.4, como na heurística original.
+    """
+    referencias = []
+    exercicio = aqui = False
+    for m in _SCANNER_VISUAL.finditer(texto.lower()):
+        tipo = m.lastgroup
+        if tipo == "palavra":
+            ref = m.group(0)
+            referencias.append(ref)
+            if ref[:5] in ("exerc", "quest"):
+                exercicio = True
+        elif tipo == "exercicio":
+            exercicio = True
+        else:
+            # Frases e "esse aqui": as palavras visuais internas contam separadamente
+            trecho = m.group(0)
+            if tipo != "aqui":
+                referencias.append(m.group("frase"))
+            referencias.extend(_PALAVRA_VISUAL.findall(trecho))
+            if tipo == "aqui" or _FINAL_AQUI.search(trecho):
+                aqui = True
+    pontuacao = len(referencias) * 0.15
+    if exercicio:
+        pontuacao += 0.3
+    if aqui:
+        pontuacao += 0.4
+    return min(pontuacao, 1.0), list(dict.fromkeys(referencias))
+
+
 def transcrever_audio(
     nome_artefato_audio: str,
     tool_context: ToolContext
@@ -53,50 +151,226 @@ def transcrever_audio(
         - sucesso: bool indicando se a transcrição foi bem-sucedida
         - texto: str com o texto transcrito (se sucesso=True)
         - erro: str com mensagem de erro (se sucesso=False)
-        - duracao_segundos: float com duração do áudio
-        - formato: str com formato do arquivo (extraído do artefato)
+        - duracao_segundos: float com duração real do áudio (lida do cabeçalho)
+        - formato: str com formato do arquivo (detectado pelo conteúdo)
+        - codec: str com o codec do áudio (ex: pcm, mp3, aac)
+        - taxa_amostragem: int com a taxa de amostragem em Hz
+        - canais: int com o número de canais
         - tamanho_bytes: int com tamanho do arquivo
         - idioma_detectado: str com idioma detectado (padrão pt-BR)
+        - segundos_removidos: float com o silêncio recortado antes do STT
+        - bytes_economizados: int com a redução do áudio enviado ao STT
+        Áudio sem fala ou saturado retorna sucesso=False com
+        audio_adequado=False, motivo_qualidade e sugestao_acao.
     """
+    # Áudio já transcrito pelo pré-processamento antecipado (ver pre_processamento.py)
+    antecipado = obter_resultado_antecipado(tool_context, nome_artefato_audio)
+    if antecipado is not None:
+        return antecipado["transcricao"]
+    return _transcrever_audio(nome_artefato_audio, tool_context)
+
+
+def _transcrever_audio(nome_artefato_audio: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """Transcrição sem consultar o pré-processamento (usada também por ele)."""
     try:
-        # 1. Acessar o artefato usando o tool_context
-        artifact = tool_context.session.get_artifact(nome_artefato_audio)
-        if not artifact:
-            return {
-                "erro": f"Artefato de áudio '{nome_artefato_audio}' não encontrado na sessão.",
-                "sucesso": False
-            }
+        # 1 e 2. Acessar o artefato e validar tamanho e cabeçalho
+        audio_bytes, info, erro = _carregar_audio(nome_artefato_audio, tool_context)
+        if erro:
+            return erro
         
-        audio_bytes = artifact.content
-        formato = artifact.name.split('.')[-1] if '.' in artifact.name else "desconhecido"
-
-        # 2. Validações (agora sobre os dados reais do artefato)
-        formatos_suportados = ["wav", "mp3", "m4a"]
-        if formato not in formatos_suportados:
-            return {"erro": f"Formato {formato} não suportado", "sucesso": False}
+        # 3. Cache pelo conteúdo do artefato: o mesmo áudio já transcrito
+        # dispensa o preparo e o STT
+        backend = obter_backend_stt()
+        chave, em_cache = _consultar_cache_transcricao(audio_bytes, info, backend)
+        if em_cache is not None:
+            texto_transcrito, preparo = em_cache
+            return {"sucesso": True, "texto": texto_transcrito, **_metadados_audio(audio_bytes, info, preparo)}
         
-        max_size = 10 * 1024 * 1024  # 10MB
-        if len(audio_bytes) > max_size:
-            return {"erro": "Arquivo de áudio muito grande (máximo 10MB)", "sucesso": False}
+        # 4. Recorte de silêncio, mono 16 kHz e rejeição de áudio inutilizável
+        preparado, erro = _preparar_audio(audio_bytes, info)
+        if erro:
+            return erro
         
-        # 3. Lógica de negócio (simulada)
-        # NOTA: Em produção, aqui você integraria com um serviço real de STT
-        texto_transcrito = "Este é um texto simulado da transcrição do áudio do artefato."
-        duracao_segundos = len(audio_bytes) / (16000 * 2)  # Estimativa básica
+        # 5. Transcrição pelo backend de STT configurado (ver backends.py)
+        texto_transcrito = backend.transcrever(preparado.dados, preparado.formato, "pt-BR")
+        preparo = _resumo_preparo(preparado)
+        _guardar_transcricao(chave, texto_transcrito, preparo)
         
         return {
             "sucesso": True,
             "texto": texto_transcrito,
-            "duracao_segundos": duracao_segundos,
-            "formato": formato,
-            "tamanho_bytes": len(audio_bytes),
-            "idioma_detectado": "pt-BR"
+            **_metadados_audio(audio_bytes, info, preparo)
         }
         
     except Exception as e:
         return {"erro": f"Erro ao transcrever áudio: {str(e)}", "sucesso": False}
 
 
+def transcrever_audio_stream(
+    nome_artefato_audio: str,
+    tool_context: ToolContext,
+    tamanho_bloco: int = 32 * 1024
+) -> Iterator[Dict[str, Any]]:
+    """Transcreve um artefato de áudio produzindo transcrições parciais.
+    
+    Versão em streaming de `transcrever_audio` para uso pelo runner/aplicação:
+    o artefato é entregue ao backend de STT em blocos e cada transcrição parcial
+    é repassada assim que fica disponível, permitindo iniciar a análise de
+    necessidade visual antes do fim do reconhecimento.
+    
+    Args:
+        nome_artefato_audio: O nome do artefato de áudio a ser processado.
+        tool_context: Contexto da ferramenta ADK, usado para acessar o artefato.
+        tamanho_bloco: Tamanho, em bytes, de cada bloco enviado ao backend.
+        
+    Yields:
+        Dicts parciais ({"sucesso": True, "parcial": True, "texto": ...}) e, por
+        último, o mesmo dict de `transcrever_audio` com "parcial": False. Em
+        caso de erro, um único dict com sucesso=False.
+    """
+    try:
+        audio_bytes, info, erro = _carregar_audio(nome_artefato_audio, tool_context)
+        if erro:
+            yield erro
+            return
+        
+        backend = obter_backend_stt()
+        chave, em_cache = _consultar_cache_transcricao(audio_bytes, info, backend)
+        if em_cache is not None:
+            texto_transcrito, preparo = em_cache
+            yield {"sucesso": True, "parcial": True, "texto": texto_transcrito}
+        else:
+            preparado, erro = _preparar_audio(audio_bytes, info)
+            if erro:
+                yield erro
+                return
+            # Fatias de memoryview: os blocos não copiam o conteúdo do artefato
+            visao = memoryview(preparado.dados)
+            blocos = (visao[i:i + tamanho_bloco] for i in range(0, len(visao), tamanho_bloco))
+            texto_transcrito = ""
+            for texto_transcrito in backend.transcrever_stream(blocos, preparado.formato, "pt-BR"):
+                yield {"sucesso": True, "parcial": True, "texto": texto_transcrito}
+            preparo = _resumo_preparo(preparado)
+            _guardar_transcricao(chave, texto_transcrito, preparo)
+        
+        yield {
+            "sucesso": True,
+            "parcial": False,
+            "texto": texto_transcrito,
+            **_metadados_audio(audio_bytes, info, preparo)
+        }
+        
+    except Exception as e:
+        yield {"erro": f"Erro ao transcrever áudio: {str(e)}", "sucesso": False}
+
+
+def _consultar_cache_transcricao(
+    audio_bytes: bytes,
+    info: InfoAudio,
+    backend: BackendSTT
+) -> Tuple[Optional[str], Optional[Tuple[str, Dict[str, Any]]]]:
+    """Retorna (chave, (transcrição, resumo do preparo) em cache).
+
+    A chave usa o artefato original e os parâmetros do preparo, para que um
+    acerto não precise preparar o áudio; ela é None com o cache desativado.
+    """
+    cache = obter_cache_transcricao()
+    if cache is None:
+        return None, None
+    chave = cache.chave(audio_bytes, "pt-BR", f"{backend.configuracao()}|{configuracao_preparo()}")
+    return chave, cache.obter(chave, info.duracao_segundos)
+
+
+def _guardar_transcricao(chave: Optional[str], texto: str, preparo: Dict[str, Any]) -> None:
+    cache = obter_cache_transcricao()
+    if cache is not None and chave is not None:
+        cache.guardar(chave, texto, preparo)
+
+
+def _resumo_preparo(preparado: AudioPreparado) -> Dict[str, Any]:
+    """Economia do preparo, guardada junto da transcrição no cache."""
+    return {
+        "segundos_removidos": round(preparado.segundos_removidos, 3),
+        "bytes_economizados": preparado.bytes_economizados
+    }
+
+
+def _metadados_audio(audio_bytes: bytes, info: InfoAudio, preparo: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "duracao_segundos": info.duracao_segundos,
+        "formato": info.formato,
+        "codec": info.codec,
+        "taxa_amostragem": info.taxa_amostragem,
+        "canais": info.canais,
+        "tamanho_bytes": len(audio_bytes),
+        "idioma_detectado": "pt-BR",
+        **preparo
+    }
+
+
+_ERROS_PREPARO_AUDIO = {
+    "silencioso": "Nenhuma fala detectada no áudio (silêncio ou volume muito baixo)",
+    "saturado": "Áudio saturado (volume alto demais)",
+}
+
+
+def _preparar_audio(
+    audio_bytes: bytes,
+    info: InfoAudio
+) -> Tuple[AudioPreparado, Optional[Dict[str, Any]]]:
+    """Prepara o áudio para o STT (ver preparo_audio.py); retorna (preparado, erro)."""
+    preparado = preparar_audio(audio_bytes, info)
+    if preparado.adequado:
+        return preparado, None
+    return preparado, {
+        "erro": _ERROS_PREPARO_AUDIO[preparado.motivo],
+        "sucesso": False,
+        "audio_adequado": False,
+        "motivo_qualidade": preparado.motivo,
+        "sugestao_acao": preparado.sugestao_acao
+    }
+
+
+def _carregar_audio(
+    nome_artefato_audio: str,
+    tool_context: ToolContext
+) -> Tuple[Optional[bytes], Optional[InfoAudio], Optional[Dict[str, Any]]]:
+    """Busca e valida o artefato de áudio; retorna (bytes, info do cabeçalho, erro).
+    
+    Formato, duração e parâmetros vêm do cabeçalho do próprio arquivo (ver
+    cabecalhos_audio.py), de modo que áudio corrompido ou longo demais é
+    rejeitado antes de chegar ao backend de STT. Tamanho e bytes mágicos são
+    verificados antes de o conteúdo completo ser lido (ver artefatos.py).
+    """
+    artefato = abrir_artefato(tool_context, nome_artefato_audio)
+    if artefato is None:
+        return None, None, {
+            "erro": f"Artefato de áudio '{nome_artefato_audio}' não encontrado na sessão.",
+            "sucesso": False
+        }
+
+    max_size = 10 * 1024 * 1024  # 10MB
+    if artefato.tamanho > max_size:
+        return None, None, {"erro": "Arquivo de áudio muito grande (máximo 10MB)", "sucesso": False}
+    
+    formatos_suportados = ["wav", "mp3", "m4a"]
+    if detectar_formato_audio(artefato.cabecalho(16)) not in formatos_suportados:
+        return None, None, {"erro": f"Formato {artefato.extensao} não suportado", "sucesso": False}
+    
+    # Duração de MP3/M4A pode exigir percorrer o arquivo: só aqui o conteúdo é lido
+    audio_bytes = artefato.conteudo()
+    try:
+        info = inspecionar_audio(audio_bytes)
+    except AudioInvalidoError as e:
+        return None, None, {"erro": f"Arquivo de áudio inválido: {e}", "sucesso": False}
+    
+    max_duracao = 5 * 60  # segundos
+    if info.duracao_segundos > max_duracao:
+        return None, None, {"erro": "Áudio muito longo (máximo 5 minutos)", "sucesso": False}
+    
+    return audio_bytes, info, None
+
+
 def analisar_necessidade_visual(
     texto: str,
     tool_context: ToolContext
@@ -113,29 +387,11 @@ def analisar_necessidade_visual(
     Returns:
         Dict com análise de necessidade visual.
     """
-    # Nenhuma mudança necessária nesta função, pois ela não lida com dados binários.
-    padroes_visuais = [
-        r'\b(esse|esta|esses|estas|aqui|aí|isso|isto)\b', r'\b(mostr\w+|ve[jr]|olh\w+|observ\w+)\b',
-        r'\b(figura|imagem|foto|desenho|gráfico|diagrama|exercício|questão|problema)\b',
-        r'\b(tá|está)\s+(escrito|mostrando|aparecendo)', r'o que (é|significa|quer dizer) (isso|isto)',
-        r'não (entendi|compreendi) (esse|este|essa|esta)', r'(ajuda|me ajude|help) com (isso|este|esse)',
-    ]
-    texto_lower = texto.lower()
-    referencias_encontradas = []
-    pontuacao_visual = 0.0
-    for padrao in padroes_visuais:
-        matches = re.findall(padrao, texto_lower)
-        if matches:
-            referencias_encontradas.extend(matches)
-            pontuacao_visual += len(matches) * 0.15
-    if "exercício" in texto_lower or "questão" in texto_lower: pontuacao_visual += 0.3
-    if any(word in texto_lower for word in ["esse aqui", "esta aqui", "isso aqui"]): pontuacao_visual += 0.4
-    
-    confianca = min(pontuacao_visual, 1.0)
+    confianca, referencias_encontradas = _pontuar_referencias_visuais(texto)
     resultado = AnaliseVisualResult(
         necessita_imagem=confianca >= 0.5,
         confianca=confianca,
-        referencias_encontradas=list(set(referencias_encontradas))
+        referencias_encontradas=referencias_encontradas
     )
     return {
         "necessita_imagem": resultado.necessita_imagem, "confianca": resultado.confianca,
@@ -164,44 +420,21 @@ def analisar_imagem_educacional(
         Dict com análise educacional da imagem.
     """
     try:
-        # 1. Acessar o artefato
-        artifact = tool_context.session.get_artifact(nome_artefato_imagem)
-        if not artifact:
-            return {
-                "erro": f"Artefato de imagem '{nome_artefato_imagem}' não encontrado.",
-                "sucesso": False, "qualidade_adequada": False
-            }
-        
-        imagem_bytes = artifact.content
-
-        # 2. Validações
-        max_size = 5 * 1024 * 1024  # 5MB
-        if len(imagem_bytes) > max_size:
-            return {
-                "erro": "Imagem muito grande (máximo 5MB)",
-                "sucesso": False, "qualidade_adequada": False
-            }
-        
-        # 3. Lógica de negócio (simulada)
-        # NOTA: Em produção, aqui você integraria com um serviço real de visão
-        resultado = AnaliseImagemResult(
-            tipo_conteudo="exercicio_matematica",
-            elementos_detectados=["equação quadrática", "gráfico de parábola"],
-            contexto_educacional="Exercício de matemática sobre funções quadráticas",
-            qualidade_adequada=True, sugestao_acao=None
+        backend = obter_backend_visao()
+        resposta, preparo = _preparar_analise_imagem(
+            nome_artefato_imagem, contexto_pergunta, tool_context, backend
         )
-        if len(imagem_bytes) < 10000:
-            resultado.qualidade_adequada = False
-            resultado.sugestao_acao = "Imagem pode estar com baixa resolução"
+        if resposta:
+            return resposta
+        imagem_bytes, info, chave, analise, tamanho_original = preparo
         
-        return {
-            "sucesso": True, "tipo_conteudo": resultado.tipo_conteudo,
-            "elementos_detectados": resultado.elementos_detectados,
-            "contexto_educacional": resultado.contexto_educacional,
-            "qualidade_adequada": resultado.qualidade_adequada,
-            "sugestao_acao": resultado.sugestao_acao,
-            "tamanho_bytes": len(imagem_bytes), "contexto_pergunta": contexto_pergunta
-        }
+        # 5. Análise pelo backend de visão, reaproveitando fotos quase idênticas
+        if analise is None:
+            analise = backend.analisar(imagem_bytes, contexto_pergunta)
+            _guardar_analise_imagem(chave, analise)
+        return _resposta_analise_imagem(
+            analise, info, tamanho_original, len(imagem_bytes), contexto_pergunta
+        )
         
     except Exception as e:
         return {
@@ -210,6 +443,126 @@ def analisar_imagem_educacional(
         }
 
 
+def _preparar_analise_imagem(
+    nome_artefato_imagem: str,
+    contexto_pergunta: str,
+    tool_context: ToolContext,
+    backend: BackendVisao
+) -> Tuple[Optional[Dict[str, Any]], Optional[tuple]]:
+    """Busca, valida e avalia a imagem e consulta o cache de análises.
+    
+    Retorna (resposta, preparo): `resposta` é o dict final quando a imagem é
+    rejeitada antes do backend de visão; senão, `preparo` traz (bytes a enviar,
+    info do cabeçalho, chave do cache, análise em cache ou None, tamanho do
+    artefato). Sem análise em cache, os bytes já vêm reduzidos para o backend
+    (ver preparo_imagem.py).
+    """
+    # 1. Acessar o artefato (só metadados até aqui)
+    artefato = abrir_artefato(tool_context, nome_artefato_imagem)
+    if artefato is None:
+        return {
+            "erro": f"Artefato de imagem '{nome_artefato_imagem}' não encontrado.",
+            "sucesso": False, "qualidade_adequada": False
+        }, None
+
+    # 2. Validações (com o preparo disponível, fotos acima de 5MB são reduzidas)
+    if artefato.tamanho > TAMANHO_MAXIMO_ENTRADA:
+        return _imagem_muito_grande(TAMANHO_MAXIMO_ENTRADA), None
+    
+    # 3. Portão de qualidade: cabeçalho e miniatura, antes do serviço de visão
+    try:
+        info = _inspecionar_cabecalho_imagem(artefato)
+    except ImagemInvalidaError as e:
+        return {
+            "erro": f"Imagem inválida: {e}",
+            "sucesso": False, "qualidade_adequada": False
+        }, None
+    avaliacao = avaliar_resolucao(info)
+    if avaliacao.adequada:
+        avaliacao = avaliar_qualidade(artefato.conteudo(), info)
+    if not avaliacao.adequada:
+        return {
+            "sucesso": True, "qualidade_adequada": False,
+            "motivo_qualidade": avaliacao.motivo,
+            "sugestao_acao": avaliacao.sugestao_acao,
+            "largura": info.largura, "altura": info.altura,
+            "tamanho_bytes": artefato.tamanho, "contexto_pergunta": contexto_pergunta
+        }, None
+    imagem_bytes = artefato.conteudo()
+
+    cache = obter_cache_analise_imagem()
+    chave = analise = None
+    if cache is not None:
+        impressao = (
+            avaliacao.medidas.hash_perceptual if avaliacao.medidas is not None
+            else hash_conteudo(imagem_bytes)
+        )
+        chave = CacheAnaliseImagem.chave(impressao, backend.configuracao())
+        analise = cache.obter(chave)
+
+    # 4. Orientação, recorte da página, redução e recompressão antes do envio
+    if analise is None:
+        imagem_bytes = preparar_imagem(imagem_bytes, info, backend.lado_maximo_px).dados
+        if len(imagem_bytes) > TAMANHO_MAXIMO_IMAGEM:
+            return _imagem_muito_grande(TAMANHO_MAXIMO_IMAGEM), None
+    return None, (imagem_bytes, info, chave, analise, artefato.tamanho)
+
+
+def _imagem_muito_grande(limite: int) -> Dict[str, Any]:
+    return {
+        "erro": f"Imagem muito grande (máximo {limite // (1024 * 1024)}MB)",
+        "sucesso": False, "qualidade_adequada": False
+    }
+
+
+def _inspecionar_cabecalho_imagem(artefato: ArtefatoLeitura) -> InfoImagem:
+    """Lê as dimensões do trecho inicial; o conteúdo todo só se o cabeçalho não couber."""
+    trecho = artefato.cabecalho()
+    try:
+        return inspecionar_imagem(trecho)
+    except ImagemInvalidaError:
+        if len(trecho) >= artefato.tamanho:
+            raise
+        # Ex: JPEG com metadados EXIF maiores que o trecho antes do SOF
+        return inspecionar_imagem(artefato.conteudo())
+
+
+# Partes da análise que dependem só da imagem; o que depende da pergunta
+# (contexto_pergunta) é montado a cada chamada por _resposta_analise_imagem
+_CAMPOS_ANALISE_IMAGEM = ("tipo_conteudo", "elementos_detectados", "contexto_educacional")
+
+
+def _guardar_analise_imagem(chave: Optional[tuple], analise: Dict[str, Any]) -> None:
+    cache = obter_cache_analise_imagem()
+    if cache is not None and chave is not None:
+        cache.guardar(chave, {campo: analise[campo] for campo in _CAMPOS_ANALISE_IMAGEM})
+
+
+def _resposta_analise_imagem(
+    analise: Dict[str, Any],
+    info: InfoImagem,
+    tamanho_bytes: int,
+    tamanho_enviado: int,
+    contexto_pergunta: str
+) -> Dict[str, Any]:
+    resultado = AnaliseImagemResult(
+        tipo_conteudo=analise["tipo_conteudo"],
+        elementos_detectados=list(analise["elementos_detectados"]),
+        contexto_educacional=analise["contexto_educacional"],
+        qualidade_adequada=True, sugestao_acao=None
+    )
+    return {
+        "sucesso": True, "tipo_conteudo": resultado.tipo_conteudo,
+        "elementos_detectados": resultado.elementos_detectados,
+        "contexto_educacional": resultado.contexto_educacional,
+        "qualidade_adequada": resultado.qualidade_adequada,
+        "sugestao_acao": resultado.sugestao_acao,
+        "largura": info.largura, "altura": info.altura,
+        "tamanho_bytes": tamanho_bytes, "bytes_economizados": tamanho_bytes - tamanho_enviado,
+        "contexto_pergunta": contexto_pergunta
+    }
+
+
 def gerar_audio_tts(
     texto: str,
     tool_context: ToolContext,
@@ -220,7 +573,9 @@ def gerar_audio_tts(
     
     Converte o texto da resposta educacional em áudio e o salva como um novo
     artefato na sessão. O nome do artefato gerado é retornado para que o
-    aplicativo cliente possa recuperá-lo e reproduzi-lo.
+    aplicativo cliente possa recuperá-lo e reproduzi-lo. Textos repetidos
+    (frases fixas, mensagens de erro) reutilizam o artefato já existente na
+    sessão ou o áudio guardado no cache de TTS, sem sintetizar de novo.
     
     Args:
         texto: Texto para converter em áudio.
@@ -238,21 +593,22 @@ def gerar_audio_tts(
         if not texto or len(texto.strip()) == 0:
             return {"erro": "Texto vazio fornecido", "sucesso": False}
         
-        # NOTA: Em produção, aqui você integraria com um serviço real de TTS
-        # e obteria os bytes reais do áudio.
-        audio_bytes_simulados = b"audio_data_simulado_tts_" + texto.encode('utf-8')
-        
-        # 1. Criar um nome único para o novo artefato
-        nome_artefato = f"resposta_tts_{uuid.uuid4()}.mp3"
-        
-        # 2. Criar o artefato na sessão atual
-        tool_context.session.create_artifact(
-            name=nome_artefato,
-            content=audio_bytes_simulados,
-            mime_type="audio/mpeg"
-        )
+        # 1. Nome derivado do conteúdo: o mesmo texto/voz/velocidade sempre gera
+        # o mesmo artefato, então pedidos repetidos na sessão o reaproveitam
+        backend = obter_backend_tts()
+        chave, nome_artefato = _nome_artefato_tts(texto, voz, velocidade, backend)
+        if tool_context.session.get_artifact(nome_artefato) is None:
+            # 2. Sintetizar apenas se o áudio não estiver no cache do processo
+            audio_bytes = _sintetizar_com_cache(chave, texto, voz, velocidade)
+            
+            # 3. Criar o artefato na sessão atual
+            tool_context.session.create_artifact(
+                name=nome_artefato,
+                content=audio_bytes,
+                mime_type=backend.mime_type
+            )
         
-        # 3. Retornar apenas a referência (o nome do artefato)
+        # 4. Retornar apenas a referência (o nome do artefato)
         return {
             "sucesso": True,
             "nome_artefato_gerado": nome_artefato,
@@ -263,35 +619,223 @@ def gerar_audio_tts(
         return {"erro": f"Erro ao gerar áudio TTS: {str(e)}", "sucesso": False}
 
 
+# Extensões usuais que o mimetypes não conhece ou nomeia de outro jeito (ogg -> .oga)
+_EXTENSOES_AUDIO = {"audio/mpeg": "mp3", "audio/wav": "wav", "audio/ogg": "ogg", "audio/webm": "webm"}
+
+
+def _extensao_audio(mime_type: str) -> str:
+    tipo = mime_type.split(";")[0].strip().lower()
+    if tipo in _EXTENSOES_AUDIO:
+        return _EXTENSOES_AUDIO[tipo]
+    extensao = mimetypes.guess_extension(tipo)
+    return extensao[1:] if extensao else "bin"
+
+
+def _chave_tts(texto: str, voz: str, velocidade: float, backend: BackendTTS) -> str:
+    return CacheTTS.chave(texto, voz, velocidade, backend.configuracao(), backend.mime_type)
+
+
+def _nome_artefato_tts(
+    texto: str,
+    voz: str,
+    velocidade: float,
+    backend: BackendTTS
+) -> Tuple[str, str]:
+    chave = _chave_tts(texto, voz, velocidade, backend)
+    return chave, f"resposta_tts_{chave}.{_extensao_audio(backend.mime_type)}"
+
+
+def _audio_tts_em_cache(chave: str) -> Optional[bytes]:
+    cache = obter_cache_tts()
+    return cache.obter(chave) if cache is not None else None
+
+
+def _guardar_audio_tts(chave: str, audio_bytes: bytes) -> None:
+    cache = obter_cache_tts()
+    if cache is not None:
+        cache.guardar(chave, audio_bytes)
+
+
+def _sintetizar_com_cache(chave: str, texto: str, voz: str, velocidade: float) -> bytes:
+    audio_bytes = _audio_tts_em_cache(chave)
+    if audio_bytes is None:
+        audio_bytes = obter_backend_tts().sintetizar(texto, voz, velocidade)
+        _guardar_audio_tts(chave, audio_bytes)
+    return audio_bytes
+
+
+def pre_gerar_audios_fixos(
+    frases: Optional[list[str]] = None,
+    velocidade: float = 1.0,
+    voz: str = "pt-BR-Standard-A"
+) -> int:
+    """Aquece o cache de TTS com as frases fixas, para chamar na inicialização.
+    
+    Args:
+        frases: Frases a sintetizar (padrão: `frases_fixas()` dos instruction providers).
+        velocidade: Velocidade usada nas respostas.
+        voz: Voz usada nas respostas.
+        
+    Returns:
+        Quantidade de frases efetivamente sintetizadas (as já em cache são puladas).
+    """
+    cache = obter_cache_tts()
+    if cache is None:
+        return 0
+    backend = obter_backend_tts()
+    sintetizadas = 0
+    for frase in frases if frases is not None else frases_fixas():
+        chave = _chave_tts(frase, voz, velocidade, backend)
+        if chave not in cache:
+            cache.guardar(chave, backend.sintetizar(frase, voz, velocidade))
+            sintetizadas += 1
+    return sintetizadas
+
+
+_FIM_DE_FRASE = re.compile(r"(?<=[.!?…])\s+")
+_FIM_DE_ORACAO = re.compile(r"(?<=[,;:])\s+")
+
+
+def dividir_em_frases(texto: str, max_caracteres: int = 200) -> list[str]:
+    """Divide a resposta em frases para síntese em streaming.
+    
+    Frases mais longas que `max_caracteres` são quebradas nas vírgulas, pontos e
+    vírgulas e dois-pontos, agrupando orações até o limite. Uma oração sozinha
+    maior que o limite é mantida inteira (não se corta no meio da fala).
+    """
+    partes = []
+    for frase in _FIM_DE_FRASE.split(texto.strip()):
+        if len(frase) <= max_caracteres:
+            partes.append(frase)
+            continue
+        atual = ""
+        for oracao in _FIM_DE_ORACAO.split(frase):
+            if atual and len(atual) + 1 + len(oracao) > max_caracteres:
+                partes.append(atual)
+                atual = oracao
+            else:
+                atual = f"{atual} {oracao}" if atual else oracao
+        partes.append(atual)
+    return [p for p in partes if p]
+
+
 # Funções auxiliares (a função de validação de metadados foi removida pois
 # a validação agora ocorre dentro da própria ferramenta, de forma mais robusta)
 
-def extrair_contexto_educacional(texto: str) -> Dict[str, Any]:
-    """Extrai contexto educacional do texto para melhor processamento"""
-    materias = {
-        "matematica": ["conta", "número", "equação", "calcul", "soma", "multiplicação"],
-        "portugues": ["palavra", "frase", "texto", "verbo", "substantivo", "letra"],
-        "ciencias": ["animal", "planta", "corpo", "natureza", "experimento"],
-        "historia": ["ano", "época", "aconteceu", "passado", "história"],
-        "geografia": ["país", "cidade", "mapa", "continente", "oceano"]
-    }
-    texto_lower = texto.lower()
-    materia_detectada = "geral"
-    for materia, palavras_chave in materias.items():
-        if any(palavra in texto_lower for palavra in palavras_chave):
-            materia_detectada = materia
-            break
+MATERIAS_PALAVRAS_CHAVE = {
+    "matematica": ["conta", "número", "equação", "calcul", "soma", "multiplicação"],
+    "portugues": ["palavra", "frase", "texto", "verbo", "substantivo", "letra"],
+    "ciencias": ["animal", "planta", "corpo", "natureza", "experimento"],
+    "historia": ["ano", "época", "aconteceu", "passado", "história"],
+    "geografia": ["país", "cidade", "mapa", "continente", "oceano"]
+}
+
+_MATERIA_DA_PALAVRA = {p: materia for materia, palavras in MATERIAS_PALAVRAS_CHAVE.items() for p in palavras}
+
+
+def _alternacao_por_prefixo(palavras: list[str]) -> str:
+    """Monta a alternação das palavras fatorada por prefixo comum.
+
+    "conta|continente" vira "cont(?:a|inente)": o motor de regex testa cada
+    prefixo uma vez por posição, em vez de uma vez por palavra.
+    """
+    grupos: Dict[str, list[str]] = {}
+    for palavra in palavras:
+        grupos.setdefault(palavra[0], []).append(palavra[1:])
+    alternativas = []
+    for inicial, restos in sorted(grupos.items()):
+        if len(restos) == 1:
+            alternativas.append(re.escape(inicial + restos[0]))
+            continue
+        sufixos = _alternacao_por_prefixo([r for r in restos if r])
+        # Palavra que termina aqui: o sufixo fica opcional (guloso, a mais longa vence)
+        alternativas.append(re.escape(inicial) + f"(?:{sufixos})" + ("?" if "" in restos else ""))
+    return "|".join(alternativas)
+
+
+# Alternação compilada na importação: o motor de regex percorre o texto uma
+# única vez e cada palavra encontrada conta para a sua matéria. As palavras
+# casam como substrings ("calcul" em "calcular"), sem sobreposição: "oceano"
+# conta só para geografia, não também "ano" para história.
+_SCANNER_MATERIAS = re.compile(_alternacao_por_prefixo(list(_MATERIA_DA_PALAVRA)))
+
+
+def _contexto_educacional(texto: str) -> Dict[str, Any]:
+    materias_ranqueadas = []
+    encontradas = _SCANNER_MATERIAS.findall(texto.lower())
+    if encontradas:
+        contagens = dict.fromkeys(MATERIAS_PALAVRAS_CHAVE, 0)
+        for palavra in encontradas:
+            contagens[_MATERIA_DA_PALAVRA[palavra]] += 1
+        materias_ranqueadas = [
+            {"materia": materia, "ocorrencias": n}
+            # sort estável: empates seguem a ordem da tabela
+            for materia, n in sorted(contagens.items(), key=lambda item: -item[1]) if n
+        ]
     return {
-        "materia_provavel": materia_detectada,
+        "materia_provavel": materias_ranqueadas[0]["materia"] if materias_ranqueadas else "geral",
+        "materias_ranqueadas": materias_ranqueadas,
         "nivel_complexidade": "basico",
         "tipo_ajuda": "explicacao"
     }
 
 
-# Registro das ferramentas para uso com o ADK
-PROFESSOR_TOOLS = {
+def extrair_contexto_educacional(texto: str) -> Dict[str, Any]:
+    """Extrai contexto educacional do texto para melhor processamento.
+    
+    Todas as matérias são pontuadas pelo número de palavras-chave encontradas;
+    `materia_provavel` é a de maior pontuação e `materias_ranqueadas` traz a
+    lista completa, em ordem decrescente de ocorrências.
+    """
+    return _contexto_educacional(texto)
+
+
+def compreender_pergunta_audio(
+    nome_artefato_audio: str,
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """Transcreve a pergunta gravada e já analisa o texto, numa única chamada.
+    
+    Reúne `transcrever_audio`, `analisar_necessidade_visual` e
+    `extrair_contexto_educacional`, que o fluxo do professor sempre executa em
+    sequência; cada chamada de ferramenta custa uma rodada inteira do modelo,
+    então juntá-las elimina duas rodadas por pergunta. Usa o resultado do
+    pré-processamento antecipado quando houver (ver pre_processamento.py).
+    
+    Args:
+        nome_artefato_audio: O nome do artefato de áudio a ser processado.
+                             Ex: "pergunta_aluno_123.wav"
+        tool_context: Contexto da ferramenta ADK, usado para acessar o artefato.
+        
+    Returns:
+        Dict com os mesmos campos de `transcrever_audio` e, se sucesso=True:
+        - necessidade_visual: dict retornado por `analisar_necessidade_visual`
+        - contexto_educacional: dict retornado por `extrair_contexto_educacional`
+    """
+    antecipado = obter_resultado_antecipado(tool_context, nome_artefato_audio)
+    if antecipado is not None:
+        return {
+            **antecipado["transcricao"],
+            "necessidade_visual": antecipado["necessidade_visual"],
+            "contexto_educacional": antecipado["contexto_educacional"]
+        }
+
+    transcricao = _transcrever_audio(nome_artefato_audio, tool_context)
+    if not transcricao.get("sucesso"):
+        return transcricao
+    return {
+        **transcricao,
+        "necessidade_visual": analisar_necessidade_visual(transcricao["texto"], tool_context),
+        "contexto_educacional": extrair_contexto_educacional(transcricao["texto"])
+    }
+
+
+# Registro das ferramentas para uso com o ADK, com métricas de latência (ver metricas.py)
+# e memoização por sessão das ferramentas de áudio (ver memoizacao_sessao.py)
+PROFESSOR_TOOLS = instrumentar_ferramentas(memoizar_na_sessao({
+    "compreender_pergunta_audio": compreender_pergunta_audio,
     "transcrever_audio": transcrever_audio,
     "analisar_necessidade_visual": analisar_necessidade_visual,
     "analisar_imagem_educacional": analisar_imagem_educacional,
     "gerar_audio_tts": gerar_audio_tts
-}
\ No newline at end of file
+}))
@@ -39,13 +39,14 @@ Você tem acesso a ferramentas para entender as perguntas. O usuário fornecerá
 
 1.  **Para processar ÁUDIO**:
     - O prompt do usuário conterá uma referência como: "transcreva o áudio 'pergunta_aluno_123.wav'".
-    - Você DEVE chamar a ferramenta `transcrever_audio` com o argumento `nome_artefato_audio` sendo o nome exato do arquivo (ex: 'pergunta_aluno_123.wav').
-    - O resultado será o texto da pergunta do aluno.
+    - Você DEVE chamar a ferramenta `compreender_pergunta_audio` com o argumento `nome_artefato_audio` sendo o nome exato do arquivo (ex: 'pergunta_aluno_123.wav').
+    - Numa única chamada ela retorna o texto da pergunta do aluno (`texto`), a análise de necessidade visual (`necessidade_visual`) e a matéria provável (`contexto_educacional`).
+    - Prefira-a a chamar `transcrever_audio` e `analisar_necessidade_visual` separadamente: cada chamada extra atrasa a resposta ao aluno.
 
-2.  **Para analisar o TEXTO e decidir se precisa de uma IMAGEM**:
-    - Após transcrever o áudio, analise o texto.
-    - Se o texto contiver palavras como "isso aqui", "este exercício", "olha essa figura", chame a ferramenta `analisar_necessidade_visual` com o texto transcrito.
-    - Se a ferramenta retornar `necessita_imagem: true`, sua resposta para o sistema deve ser: "Por favor, peça ao usuário para enviar uma foto do exercício." NÃO tente responder a pergunta ainda.
+2.  **Para decidir se precisa de uma IMAGEM**:
+    - Use o campo `necessidade_visual` retornado por `compreender_pergunta_audio`; não é preciso chamar `analisar_necessidade_visual` de novo.
+    - Só chame `analisar_necessidade_visual` para textos que não vieram dessa ferramenta (ex: uma pergunta digitada com palavras como "isso aqui", "este exercício", "olha essa figura").
+    - Se `necessita_imagem` for `true`, sua resposta para o sistema deve ser: "Por favor, peça ao usuário para enviar uma foto do exercício." NÃO tente responder a pergunta ainda.
 
 3.  **Para processar IMAGEM**:
     - Se o usuário fornecer uma imagem, o prompt conterá uma referência como: "analise a imagem 'exercicio_abc.png' no contexto da pergunta anterior".
@@ -111,6 +112,30 @@ def boas_vindas_provider(context: ReadonlyContext) -> str:
 # dentro do 'professor_instruction_provider'. O LLM agora gera essas respostas
 # dinamicamente em vez de seguir um template rígido.
 
+class _ContextoFixo:
+    """Contexto mínimo (só `state`) para renderizar mensagens fora de uma sessão."""
+
+    def __init__(self, state: Dict[str, Any]):
+        self.state = state
+
+
+def frases_fixas() -> List[str]:
+    """Mensagens ao usuário que não dependem de dados do aluno.
+    
+    Usadas para pré-gerar o áudio TTS dessas frases na inicialização
+    (ver `pre_gerar_audios_fixos` em implementation.py).
+    """
+    estados = [
+        {"temp:tipo_erro": "entender_audio"},
+        {"temp:tipo_erro": "processar_imagem"},
+        {"temp:tipo_erro": "processar"},
+    ]
+    frases = [erro_instruction_provider(_ContextoFixo(estado)) for estado in estados]
+    frases.append(boas_vindas_provider(_ContextoFixo({"primeira_interacao": True})))
+    frases.append(boas_vindas_provider(_ContextoFixo({"primeira_interacao": False})))
+    frases.append("Ótima pergunta!")
+    return frases
+
 # Dicionário para facilitar acesso aos providers
 INSTRUCTION_PROVIDERS = {
     "professor_instructions": professor_instruction_provider,
@@ -0,0 +1,129 @@
+"""
+Agendador de lotes de speech-to-text para o Professor Virtual ADK
+No começo da aula dezenas de crianças perguntam no mesmo segundo, e cada
+`transcrever_audio` faria sua própria requisição ao STT. O agendador junta as
+transcrições pendentes de sessões simultâneas (no mesmo event loop) e as envia
+como um único lote (`BackendSTT.transcrever_lote_async`) quando o lote atinge
+`max_lote` ou quando a primeira transcrição pendente já esperou
+`espera_maxima_ms`; cada resultado volta para a chamada que o pediu.
+
+Desativado por padrão; ao ser configurado, passa a ser usado pelo
+pré-processamento dos uploads (pre_processamento.py), por onde passa toda
+pergunta gravada no fluxo do agente, e pela versão assíncrona de
+`transcrever_audio` (ferramentas_async.py) quando não há resultado antecipado:
+
+    configurar_agendador_stt(AgendadorLoteSTT(max_lote=16, espera_maxima_ms=25))
+
+O pré-processamento roda num event loop próprio e as ferramentas no do
+runner; cada event loop tem seus próprios lotes pendentes.
+
+Lotes maiores e esperas mais longas aumentam a vazão e o custo por requisição
+cai, mas a latência de cada pergunta sobe até `espera_maxima_ms`; ver
+benchmarks/bench_lote_stt.py.
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from backends import BackendSTT, obter_backend_stt
+
+
+class AgendadorLoteSTT:
+    """Agrupa transcrições concorrentes em lotes para o backend de STT.
+
+    Args:
+        max_lote: Número de áudios que dispara o envio imediato do lote.
+        espera_maxima_ms: Quanto a primeira transcrição pendente pode esperar
+                          pelas demais antes de o lote ser enviado.
+        backend: Backend de STT; None usa o configurado em backends.py no
+                 momento do envio.
+    """
+
+    def __init__(
+        self,
+        max_lote: int = 8,
+        espera_maxima_ms: float = 20.0,
+        backend: Optional[BackendSTT] = None
+    ):
+        if max_lote < 1:
+            raise ValueError("max_lote deve ser pelo menos 1")
+        self.max_lote = max_lote
+        self.espera_maxima_ms = espera_maxima_ms
+        self.backend = backend
+        # Por event loop: cada futuro só pode ser resolvido no loop que o criou
+        self._pendentes: Dict[asyncio.AbstractEventLoop, List[Tuple[bytes, str, str, asyncio.Future]]] = {}
+        self._temporizadores: Dict[asyncio.AbstractEventLoop, asyncio.TimerHandle] = {}
+        self._envios: Set[asyncio.Task] = set()
+        self.lotes = 0
+        self.itens = 0
+
+    async def transcrever(self, audio: bytes, formato: str, idioma: str = "pt-BR") -> str:
+        """Entra no próximo lote e aguarda a transcrição deste áudio."""
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        pendentes = self._pendentes.setdefault(loop, [])
+        pendentes.append((audio, formato, idioma, futuro))
+        if len(pendentes) >= self.max_lote:
+            self._despachar(loop)
+        elif loop not in self._temporizadores:
+            self._temporizadores[loop] = loop.call_later(self.espera_maxima_ms / 1000, self._despachar, loop)
+        return await futuro
+
+    def estatisticas(self) -> Dict[str, Any]:
+        return {
+            "lotes": self.lotes,
+            "itens": self.itens,
+            "tamanho_medio_lote": self.itens / self.lotes if self.lotes else 0.0,
+        }
+
+    def _despachar(self, loop: asyncio.AbstractEventLoop) -> None:
+        temporizador = self._temporizadores.pop(loop, None)
+        if temporizador is not None:
+            temporizador.cancel()
+        pendentes = self._pendentes.pop(loop, [])
+
+        # Um lote por idioma; a ordem de chegada é mantida dentro de cada lote
+        por_idioma: Dict[str, list] = defaultdict(list)
+        for audio, formato, idioma, futuro in pendentes:
+            if not futuro.done():  # chamadas canceladas enquanto esperavam saem do lote
+                por_idioma[idioma].append((audio, formato, futuro))
+        for idioma, itens in por_idioma.items():
+            envio = asyncio.ensure_future(self._enviar(idioma, itens))
+            self._envios.add(envio)
+            envio.add_done_callback(self._envios.discard)
+
+    async def _enviar(self, idioma: str, itens: List[Tuple[bytes, str, asyncio.Future]]) -> None:
+        self.lotes += 1
+        self.itens += len(itens)
+        backend = self.backend or obter_backend_stt()
+        try:
+            textos = await backend.transcrever_lote_async(
+                [(audio, formato) for audio, formato, _ in itens], idioma
+            )
+            if len(textos) != len(itens):
+                raise RuntimeError(
+                    f"backend retornou {len(textos)} transcrições para um lote de {len(itens)}"
+                )
+        except Exception as e:
+            for _, _, futuro in itens:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+        for (_, _, futuro), texto in zip(itens, textos):
+            if not futuro.done():
+                futuro.set_result(texto)
+
+
+_agendador: Optional[AgendadorLoteSTT] = None
+
+
+def obter_agendador_stt() -> Optional[AgendadorLoteSTT]:
+    """Retorna o agendador de lotes configurado (None = transcrições individuais)."""
+    return _agendador
+
+
+def configurar_agendador_stt(agendador: Optional[AgendadorLoteSTT]) -> None:
+    """Substitui o agendador de lotes; None desativa o agrupamento."""
+    global _agendador
+    _agendador = agendador
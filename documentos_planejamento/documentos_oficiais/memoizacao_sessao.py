@@ -0,0 +1,151 @@
+"""
+Memoização por sessão das ferramentas de áudio do Professor Virtual ADK
+O modelo às vezes chama `transcrever_audio` ou `compreender_pergunta_audio`
+de novo para o mesmo áudio na mesma conversa, por exemplo num turno seguinte,
+depois de pedir um esclarecimento. Cada entrada de FERRAMENTAS_MEMOIZADAS em
+PROFESSOR_TOOLS / PROFESSOR_TOOLS_ASYNC é envolvida por `memoizar_na_sessao`,
+que guarda a resposta no estado da sessão e a devolve na repetição sem
+executar a ferramenta (nenhum backend é chamado).
+
+A chave combina o nome da ferramenta, os argumentos normalizados (defaults
+aplicados, texto em NFC e sem espaços nas pontas) e, para cada artefato citado
+(`nome_artefato_*`), o nome e a versão (`version`, que muda a cada gravação,
+ver armazenamento_artefatos.py): nada do conteúdo é lido nem hasheado, e um
+artefato regravado com o mesmo nome não reaproveita a resposta anterior.
+Artefatos sem versão não são memoizados.
+
+As respostas ficam todas sob a chave CHAVE_MEMO do estado, sem o prefixo
+`temp:`: valem para a sessão inteira, de um turno do aluno para o outro, e
+persistem com ela. Só as MAX_RESPOSTAS_MEMO mais recentes são mantidas, para
+o estado (reenviado ao serviço de sessões a cada mudança) não crescer com a
+conversa. `analisar_necessidade_visual` não é memoizada: a análise leva
+microssegundos, menos que montar a chave.
+
+Só respostas com sucesso são guardadas: um erro (ex: backend indisponível)
+pode ser passageiro, e a repetição executa a ferramenta de novo.
+"""
+
+import functools
+import inspect
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from caches import hash_conteudo
+
+CHAVE_MEMO = "memo_ferramentas"
+MAX_RESPOSTAS_MEMO = 8
+
+# Ferramentas sem efeitos colaterais cuja resposta depende só dos argumentos e
+# do conteúdo dos artefatos, e cara o bastante para valer a memoização;
+# gerar_audio_tts cria artefatos e fica de fora
+FERRAMENTAS_MEMOIZADAS = frozenset({"transcrever_audio", "compreender_pergunta_audio"})
+
+
+def memoizar_na_sessao(
+    ferramentas: Dict[str, Callable[..., Any]],
+    nomes: Iterable[str] = FERRAMENTAS_MEMOIZADAS
+) -> Dict[str, Callable[..., Any]]:
+    """Envolve as ferramentas de `nomes` com a memoização no estado da sessão.
+
+    As demais passam sem alteração. As funções envolvidas mantêm nome,
+    docstring e assinatura (functools.wraps); as `async def` continuam corrotinas.
+    """
+    nomes = frozenset(nomes)
+    return {
+        nome: _memoizar(nome, funcao) if nome in nomes else funcao
+        for nome, funcao in ferramentas.items()
+    }
+
+
+def chave_memo(nome: str, argumentos: Dict[str, Any], tool_context: Any) -> Optional[str]:
+    """Chave da resposta em CHAVE_MEMO; None se algum artefato citado não
+    existir ou não tiver versão.
+
+    `argumentos` vem na ordem da assinatura, com os defaults aplicados.
+    """
+    normalizados = []
+    for parametro, valor in argumentos.items():
+        if parametro.startswith("nome_artefato"):
+            artefato = tool_context.session.get_artifact(valor)
+            versao = getattr(artefato, "version", None) if artefato else None
+            if versao is None:
+                return None
+            valor = (valor, versao)
+        elif isinstance(valor, str):
+            valor = unicodedata.normalize("NFC", valor).strip()
+        normalizados.append(valor)
+    return f"{nome}:{hash_conteudo(repr(normalizados).encode('utf-8'))}"
+
+
+def _copiar(valor: Any) -> Any:
+    """Cópia das respostas (dicts/listas de valores JSON), bem mais barata que deepcopy."""
+    if isinstance(valor, dict):
+        return {chave: _copiar(item) for chave, item in valor.items()}
+    if isinstance(valor, list):
+        return [_copiar(item) for item in valor]
+    return valor
+
+
+def _memorizavel(resposta: Any) -> bool:
+    return isinstance(resposta, dict) and "erro" not in resposta and resposta.get("sucesso", True) is not False
+
+
+def _guardar(estado: Any, chave: str, resposta: Dict[str, Any]) -> None:
+    # Um dict novo a cada gravação: a atribuição é o que o ADK registra como
+    # mudança de estado (alterar o dict guardado no lugar não seria persistido)
+    memo = dict(estado.get(CHAVE_MEMO) or {})
+    memo[chave] = _copiar(resposta)
+    while len(memo) > MAX_RESPOSTAS_MEMO:
+        del memo[next(iter(memo))]  # a mais antiga
+    estado[CHAVE_MEMO] = memo
+
+
+def _memoizar(nome: str, funcao: Callable[..., Any]) -> Callable[..., Any]:
+    # Liga os argumentos aos parâmetros sem inspect.Signature.bind, que custaria
+    # mais que montar a chave
+    todos = list(inspect.signature(funcao).parameters.values())
+    posicao_contexto = [p.name for p in todos].index("tool_context")
+    parametros = [p for p in todos if p.name != "tool_context"]
+    nomes = [p.name for p in parametros]
+    padroes = {p.name: p.default for p in parametros if p.default is not inspect.Parameter.empty}
+
+    def chave(args: tuple, kwargs: Dict[str, Any]) -> tuple:
+        tool_context = kwargs["tool_context"] if "tool_context" in kwargs else args[posicao_contexto]
+        if tool_context is None:  # chamada fora de uma sessão: nada a memoizar
+            return None, None
+        posicionais = dict(zip(nomes, args[:posicao_contexto] + args[posicao_contexto + 1:]))
+        argumentos = {
+            n: posicionais[n] if n in posicionais else kwargs[n] if n in kwargs else padroes[n]
+            for n in nomes
+        }
+        return tool_context.state, chave_memo(nome, argumentos, tool_context)
+
+    def guardada(estado: Any, chave_estado: Optional[str]) -> Optional[Dict[str, Any]]:
+        if chave_estado is None:
+            return None
+        resposta = (estado.get(CHAVE_MEMO) or {}).get(chave_estado)
+        return _copiar(resposta) if resposta is not None else None
+
+    # A cópia protege a resposta guardada de quem alterar a devolvida
+    if inspect.iscoroutinefunction(funcao):
+        @functools.wraps(funcao)
+        async def memoizada_async(*args: Any, **kwargs: Any) -> Any:
+            estado, chave_estado = chave(args, kwargs)
+            if (resposta := guardada(estado, chave_estado)) is not None:
+                return resposta
+            resposta = await funcao(*args, **kwargs)
+            if chave_estado is not None and _memorizavel(resposta):
+                _guardar(estado, chave_estado, resposta)
+            return resposta
+        return memoizada_async
+
+    @functools.wraps(funcao)
+    def memoizada(*args: Any, **kwargs: Any) -> Any:
+        estado, chave_estado = chave(args, kwargs)
+        if (resposta := guardada(estado, chave_estado)) is not None:
+            return resposta
+        resposta = funcao(*args, **kwargs)
+        if chave_estado is not None and _memorizavel(resposta):
+            _guardar(estado, chave_estado, resposta)
+        return resposta
+    return memoizada
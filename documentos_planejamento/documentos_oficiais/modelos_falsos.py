@@ -0,0 +1,324 @@
+"""
+Modelos falsos para medições offline do Professor Virtual ADK
+Substituem o LLM (`gemini-2.5-flash`) no agente de agente.py quando o que se
+quer medir é o runner do ADK e as ferramentas, sem rede e sem variação entre
+execuções:
+
+    agente = criar_agente_professor(modelo=ModeloProfessorFalso(latencia_por_token=0.01))
+
+- `ModeloProfessorFalso` segue as regras do `professor_instruction_provider`
+  a partir das mensagens do usuário e das respostas das ferramentas;
+- `ModeloRoteirizado` reproduz as trajetórias de ferramentas dos arquivos de
+  avaliação (`.test.json` / `.evalset.json` em tests/), carregadas por
+  `carregar_trajetorias`.
+
+O tempo de cada rodada é simulado: `latencia_primeiro_token` mais
+`latencia_por_token` por token gerado, e acumulado em `tempo_simulado` para
+separar o tempo do modelo do custo do ADK e das ferramentas. Os tokens são
+estimados (4 caracteres por token) e informados em `usage_metadata`, como o
+Gemini faz.
+"""
+
+import asyncio
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Iterable, List, Optional, Tuple, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+from pydantic import PrivateAttr
+
+CARACTERES_POR_TOKEN = 4
+PEDIDO_FOTO = "Por favor, peça ao usuário para enviar uma foto do exercício."
+RESPOSTA_PADRAO = (
+    "Ótima pergunta! Vamos pensar juntos, passo a passo: primeiro vemos o que o "
+    "exercício pede, depois fazemos a conta com calma e conferimos o resultado."
+)
+RESPOSTA_ERRO = "Tive um probleminha com o arquivo. Você pode mandar de novo?"
+
+_AUDIO = re.compile(r"[áa]udio\s+'([^']+)'", re.IGNORECASE)
+_IMAGEM = re.compile(r"imagem\s+'([^']+)'", re.IGNORECASE)
+_PEDIDO_TTS = re.compile(r"ger(e|ar)\s+o\s+[áa]udio\s+da\s+(sua\s+)?resposta", re.IGNORECASE)
+
+
+def estimar_tokens(texto: str) -> int:
+    """Tokens aproximados de um texto (o suficiente para simular latência e custo)."""
+    return max(1, len(texto) // CARACTERES_POR_TOKEN) if texto else 0
+
+
+def tokens_do_conteudo(conteudos: Iterable[types.Content]) -> int:
+    """Tokens aproximados de textos, chamadas e respostas de ferramentas."""
+    total = 0
+    for conteudo in conteudos:
+        for parte in conteudo.parts or []:
+            if parte.text:
+                total += estimar_tokens(parte.text)
+            elif parte.function_call:
+                total += estimar_tokens(json.dumps(parte.function_call.args, ensure_ascii=False))
+            elif parte.function_response:
+                total += estimar_tokens(json.dumps(parte.function_response.response, ensure_ascii=False, default=str))
+    return total
+
+
+class _ModeloSimulado(BaseLlm):
+    """Base dos modelos falsos: simula a latência e preenche usage_metadata."""
+
+    latencia_primeiro_token: float = 0.0
+    latencia_por_token: float = 0.0
+    _tempo_simulado: float = PrivateAttr(default=0.0)
+    _rodadas: int = PrivateAttr(default=0)
+
+    @property
+    def tempo_simulado(self) -> float:
+        """Segundos de latência de modelo simulados desde a criação."""
+        return self._tempo_simulado
+
+    @property
+    def rodadas(self) -> int:
+        return self._rodadas
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        parte = self._proxima_parte(llm_request)
+        saida = types.Content(role="model", parts=[parte])
+        tokens_saida = tokens_do_conteudo([saida])
+        tokens_entrada = tokens_do_conteudo(llm_request.contents)
+        instrucao = llm_request.config.system_instruction if llm_request.config else None
+        if isinstance(instrucao, str):
+            tokens_entrada += estimar_tokens(instrucao)
+        latencia = self.latencia_primeiro_token + self.latencia_por_token * tokens_saida
+        self._tempo_simulado += latencia
+        self._rodadas += 1
+        await asyncio.sleep(latencia)
+        yield LlmResponse(
+            content=saida,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=tokens_entrada,
+                candidates_token_count=tokens_saida,
+                total_token_count=tokens_entrada + tokens_saida
+            )
+        )
+
+    def _proxima_parte(self, llm_request: LlmRequest) -> types.Part:
+        raise NotImplementedError
+
+
+def _chamada(nome: str, **args: Any) -> types.Part:
+    return types.Part(function_call=types.FunctionCall(name=nome, args=args))
+
+
+def _texto(texto: str) -> types.Part:
+    return types.Part(text=texto)
+
+
+class ModeloProfessorFalso(_ModeloSimulado):
+    """Modelo determinístico que segue o roteiro da instrução do professor.
+
+    - "áudio 'x.wav'" -> compreender_pergunta_audio; se a pergunta precisa de
+      imagem, pede a foto, senão responde;
+    - "imagem 'x.jpg'" -> analisar_imagem_educacional com a última pergunta
+      transcrita, e responde;
+    - "gere o áudio da sua resposta" -> gerar_audio_tts com a última resposta.
+
+    Args:
+        resposta: Texto da resposta final ao aluno.
+    """
+
+    model: str = "professor-falso"
+    resposta: str = RESPOSTA_PADRAO
+
+    def _proxima_parte(self, llm_request: LlmRequest) -> types.Part:
+        conteudos = llm_request.contents
+        ultima = conteudos[-1].parts[-1] if conteudos and conteudos[-1].parts else None
+        if ultima is None:
+            return _texto(self.resposta)
+
+        if ultima.function_response:
+            nome, resultado = ultima.function_response.name, ultima.function_response.response or {}
+            if resultado.get("sucesso") is False or "erro" in resultado:
+                return _texto(RESPOSTA_ERRO)
+            if nome == "gerar_audio_tts":
+                return _texto(f"Áudio da resposta: {resultado.get('nome_artefato_gerado', '')}")
+            if nome in ("compreender_pergunta_audio", "analisar_necessidade_visual"):
+                visual = resultado.get("necessidade_visual", resultado)
+                if visual.get("necessita_imagem"):
+                    return _texto(PEDIDO_FOTO)
+            return _texto(self.resposta)
+
+        texto = ultima.text or ""
+        if (audio := _AUDIO.search(texto)):
+            return _chamada("compreender_pergunta_audio", nome_artefato_audio=audio.group(1))
+        if (imagem := _IMAGEM.search(texto)):
+            return _chamada(
+                "analisar_imagem_educacional",
+                nome_artefato_imagem=imagem.group(1),
+                contexto_pergunta=_ultima_transcricao(conteudos) or texto
+            )
+        if _PEDIDO_TTS.search(texto):
+            return _chamada("gerar_audio_tts", texto=_ultimo_texto_do_modelo(conteudos) or self.resposta)
+        return _texto(self.resposta)
+
+
+def _ultima_transcricao(conteudos: List[types.Content]) -> Optional[str]:
+    for conteudo in reversed(conteudos):
+        for parte in conteudo.parts or []:
+            resposta: Dict[str, Any] = (parte.function_response.response or {}) if parte.function_response else {}
+            if resposta.get("texto"):
+                return resposta["texto"]
+    return None
+
+
+def _ultimo_texto_do_modelo(conteudos: List[types.Content]) -> Optional[str]:
+    for conteudo in reversed(conteudos):
+        if conteudo.role == "model":
+            textos = [parte.text for parte in conteudo.parts or [] if parte.text]
+            if textos and textos[-1] != PEDIDO_FOTO:
+                return textos[-1]
+    return None
+
+
+# --- Trajetórias dos arquivos de avaliação ---
+
+# Os arquivos de avaliação ainda usam a API antiga, com o conteúdo em base64 nos
+# argumentos; na reprodução o marcador (ex: AUDIO_SIMULADO_BASE64) vira o nome
+# de um artefato da sessão. None descarta o argumento.
+_ARGUMENTOS_LEGADOS = {
+    "audio_data": ("nome_artefato_audio", ".wav"),
+    "imagem_data": ("nome_artefato_imagem", ".jpg"),
+    "formato": None,
+}
+PEDIDO_TTS = "gere o áudio da sua resposta"
+
+
+@dataclass
+class TurnoRoteirizado:
+    """Uma mensagem do usuário, as ferramentas chamadas em ordem e a resposta final"""
+    mensagem: str
+    chamadas: List[Tuple[str, Dict[str, Any]]]
+    resposta: str
+
+
+@dataclass
+class ConversaRoteirizada:
+    """Turnos de uma sessão, com os artefatos que precisam existir nela"""
+    nome: str
+    turnos: List[TurnoRoteirizado] = field(default_factory=list)
+    artefatos: Dict[str, str] = field(default_factory=dict)  # nome -> marcador do arquivo
+    estado_inicial: Dict[str, Any] = field(default_factory=dict)
+
+
+def carregar_trajetorias(caminho: Union[str, Path]) -> List[ConversaRoteirizada]:
+    """Lê um `.test.json` (uma conversa) ou `.evalset.json` (uma por caso).
+
+    Cada caso vira um turno com `query` e `expected_tool_use`; um
+    `follow_up_input` ou `follow_up_action: request_tts` acrescenta o turno da
+    foto ou do pedido de TTS. Caminhos de diretório carregam todos os arquivos.
+    """
+    caminho = Path(caminho)
+    if caminho.is_dir():
+        arquivos = sorted([*caminho.rglob("*.test.json"), *caminho.rglob("*.evalset.json")])
+        return [conversa for arquivo in arquivos for conversa in carregar_trajetorias(arquivo)]
+
+    dados = json.loads(caminho.read_text(encoding="utf-8"))
+    if caminho.name.endswith(".evalset.json"):
+        return [
+            _conversa(caso["name"], caso["data"], caso.get("initial_session", {}).get("state", {}))
+            for caso in dados
+        ]
+    return [_conversa(caminho.name.split(".")[0], dados, {})]
+
+
+def _conversa(nome: str, casos: List[Dict[str, Any]], estado: Dict[str, Any]) -> ConversaRoteirizada:
+    conversa = ConversaRoteirizada(nome, estado_inicial=dict(estado))
+    for caso in casos:
+        referencia = caso.get("reference", "")
+        seguimento = caso.get("expected_tool_use_follow_up")
+        _adicionar_turno(
+            conversa, caso.get("query", ""), caso.get("expected_tool_use", []),
+            caso.get("intermediate_response", "") if seguimento else referencia
+        )
+        if seguimento:
+            _adicionar_turno(conversa, caso.get("query", ""), seguimento, referencia)
+        if caso.get("follow_up_action") == "request_tts":
+            _adicionar_turno(conversa, PEDIDO_TTS, caso.get("expected_tool_use_tts", []), referencia)
+    return conversa
+
+
+def _adicionar_turno(
+    conversa: ConversaRoteirizada, consulta: str, usos: List[Dict[str, Any]], resposta: str
+) -> None:
+    chamadas = [(uso["tool_name"], _adaptar_argumentos(conversa, uso.get("tool_input", {}))) for uso in usos]
+    mensagem = consulta
+    if chamadas and "nome_artefato_audio" in chamadas[0][1]:
+        mensagem = f"transcreva o áudio '{chamadas[0][1]['nome_artefato_audio']}'"
+    elif chamadas and "nome_artefato_imagem" in chamadas[0][1]:
+        mensagem = f"analise a imagem '{chamadas[0][1]['nome_artefato_imagem']}' no contexto da pergunta anterior"
+    conversa.turnos.append(TurnoRoteirizado(mensagem, chamadas, resposta))
+
+
+def _adaptar_argumentos(conversa: ConversaRoteirizada, argumentos: Dict[str, Any]) -> Dict[str, Any]:
+    adaptados = {}
+    for nome, valor in argumentos.items():
+        if nome not in _ARGUMENTOS_LEGADOS:
+            adaptados[nome] = valor
+        elif _ARGUMENTOS_LEGADOS[nome] is not None:
+            novo_nome, extensao = _ARGUMENTOS_LEGADOS[nome]
+            artefato = next((a for a, m in conversa.artefatos.items() if m == valor and a.endswith(extensao)), None)
+            if artefato is None:
+                artefato = f"{conversa.nome}_{len(conversa.artefatos)}{extensao}"
+                conversa.artefatos[artefato] = valor
+            adaptados[novo_nome] = artefato
+    return adaptados
+
+
+class ModeloRoteirizado(_ModeloSimulado):
+    """Modelo que reproduz trajetórias gravadas, no lugar do gemini-2.5-flash.
+
+    O turno é identificado pela sequência de mensagens do usuário na conversa;
+    dentro dele, cada rodada devolve a próxima chamada de ferramenta do roteiro
+    e, esgotadas as chamadas, a resposta final. Uma conversa que sai do roteiro
+    levanta ValueError, para a medição não seguir com uma trajetória diferente.
+
+    Args:
+        conversas: Roteiros (ver `carregar_trajetorias`).
+    """
+
+    model: str = "professor-roteirizado"
+    conversas: List[ConversaRoteirizada]
+    _turnos: Dict[Tuple[str, ...], TurnoRoteirizado] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, contexto: Any) -> None:
+        super().model_post_init(contexto)
+        for conversa in self.conversas:
+            mensagens: Tuple[str, ...] = ()
+            for turno in conversa.turnos:
+                mensagens += (turno.mensagem,)
+                self._turnos.setdefault(mensagens, turno)
+
+    @classmethod
+    def de_arquivos(cls, *caminhos: Union[str, Path], **opcoes: Any) -> "ModeloRoteirizado":
+        """Modelo com as trajetórias de arquivos ou diretórios de avaliação."""
+        conversas = [c for caminho in caminhos for c in carregar_trajetorias(caminho)]
+        return cls(conversas=conversas, **opcoes)
+
+    def _proxima_parte(self, llm_request: LlmRequest) -> types.Part:
+        mensagens: Tuple[str, ...] = ()
+        rodada = 0
+        for conteudo in llm_request.contents:
+            textos = [p.text for p in conteudo.parts or [] if p.text] if conteudo.role == "user" else []
+            if textos:
+                mensagens += ("".join(textos),)
+                rodada = 0
+            elif any(p.function_response for p in conteudo.parts or []):
+                rodada += 1
+
+        turno = self._turnos.get(mensagens)
+        if turno is None:
+            raise ValueError(f"mensagem fora do roteiro: {mensagens[-1] if mensagens else ''!r}")
+        if rodada < len(turno.chamadas):
+            nome, argumentos = turno.chamadas[rodada]
+            return _chamada(nome, **argumentos)
+        return _texto(turno.resposta)
@@ -0,0 +1,198 @@
+"""
+Pré-processamento antecipado de áudio para o Professor Virtual ADK
+No fluxo do `professor_instruction_provider` o modelo precisa de uma rodada só
+para decidir chamar `transcrever_audio` e de outra para `analisar_necessidade_visual`.
+Aqui a transcrição, a análise de necessidade visual e a extração do contexto
+educacional começam assim que o áudio é salvo na sessão, em paralelo com a
+primeira rodada do modelo. Quando o modelo chama a ferramenta, ela devolve o
+resultado pronto ou aguarda o que ainda está em andamento, sem chamar o STT
+de novo.
+
+O trabalho roda como tarefa num event loop próprio deste módulo (numa thread
+dedicada), pelo mesmo caminho assíncrono de `ferramentas_async`: a espera
+pelo STT não ocupa o pool de CPU de concorrencia.py, que só recebe a leitura
+e o preparo do áudio, e muitos uploads simultâneos aguardam o backend juntos.
+
+O agendamento acontece no upload, sem ToolContext: o aplicativo grava a
+pergunta do aluno no armazenamento da sessão (ArmazenamentoArtefatos com
+`id_sessao`, criado por `agente.ArtefatosPorSessao`) com `pre_processar=True`.
+Os artefatos que as ferramentas salvam (ex: as respostas de `gerar_audio_tts`)
+nunca são pré-processados. Outros armazenamentos podem agendar diretamente:
+
+    sessao.create_artifact(name=nome, content=audio, mime_type="audio/wav")
+    agendar_pre_processamento(sessao.id, nome, sessao.get_artifact(nome))
+
+Os resultados ficam neste processo, por sessão e hash do conteúdo do áudio
+(`caches.hash_conteudo`), e não no estado da sessão do ADK: o trabalho termina
+numa thread, fora de qualquer evento, e o serviço de sessões não persistiria o
+que fosse escrito ali. A ferramenta encontra o resultado pela sessão do
+`tool_context` e pelo hash do artefato que recebeu; um artefato substituído
+com o mesmo nome tem outro hash e é processado normalmente.
+
+Só resultados com sucesso ficam guardados, até `descartar_pre_processamento`
+(chamado ao fechar o armazenamento da sessão); uma falha (ex: backend
+indisponível) é descartada e a ferramenta refaz o trabalho normalmente.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
+from artefatos import abrir_artefato
+from caches import hash_conteudo
+from concorrencia import em_thread
+
+# Quanto a ferramenta aguarda um trabalho em andamento antes de fazê-lo ela mesma
+PRAZO_PADRAO_SEGUNDOS = 10.0
+
+# Trabalhos por sessão e hash do conteúdo do áudio
+_trabalhos: Dict[str, Dict[str, Future]] = {}
+_lock = threading.Lock()
+_laco: Optional[asyncio.AbstractEventLoop] = None
+_lock_laco = threading.Lock()
+
+
+def _obter_laco() -> asyncio.AbstractEventLoop:
+    """Event loop do pré-processamento, iniciado numa thread no primeiro uso."""
+    global _laco
+    with _lock_laco:
+        if _laco is None:
+            _laco = asyncio.new_event_loop()
+            threading.Thread(
+                target=_laco.run_forever, name="professor-pre-processamento", daemon=True
+            ).start()
+        return _laco
+
+
+def agendar_pre_processamento(id_sessao: str, nome_artefato: str, artefato: Any) -> Future:
+    """Inicia em segundo plano a transcrição e as análises do áudio `artefato`.
+
+    O mesmo conteúdo já agendado na sessão (em andamento ou pronto) não é
+    agendado de novo.
+
+    Args:
+        id_sessao: Sessão dona do artefato (a de `tool_context.session.id`).
+        nome_artefato: Nome com que o artefato foi salvo.
+        artefato: O artefato salvo (com `content`); o trabalho usa este objeto,
+                  mesmo que o nome seja regravado com outro conteúdo depois.
+
+    Returns:
+        Future com o resultado (ver `_pre_processar`).
+    """
+    impressao = hash_conteudo(artefato.content)
+    with _lock:
+        da_sessao = _trabalhos.setdefault(id_sessao, {})
+        futuro = da_sessao.get(impressao)
+        if futuro is not None:
+            return futuro
+        futuro = asyncio.run_coroutine_threadsafe(_pre_processar(nome_artefato, artefato), _obter_laco())
+        da_sessao[impressao] = futuro
+    futuro.add_done_callback(lambda _: _descartar_se_falhou(id_sessao, impressao, futuro))
+    return futuro
+
+
+def descartar_pre_processamento(id_sessao: str) -> None:
+    """Esquece os resultados de uma sessão encerrada (e cancela os que nem começaram)."""
+    with _lock:
+        da_sessao = _trabalhos.pop(id_sessao, {})
+    for futuro in da_sessao.values():
+        futuro.cancel()
+
+
+def obter_resultado_antecipado(
+    tool_context: Any,
+    nome_artefato: str,
+    prazo_segundos: float = PRAZO_PADRAO_SEGUNDOS
+) -> Optional[Dict[str, Any]]:
+    """Resultado antecipado do artefato, aguardando o trabalho em andamento até o prazo.
+
+    Returns:
+        Dict com "transcricao", "necessidade_visual" e "contexto_educacional",
+        ou None se o conteúdo atual do artefato não foi pré-processado na
+        sessão, se falhou ou se o prazo acabou.
+    """
+    futuro = _trabalho_do_artefato(tool_context, nome_artefato)
+    if futuro is None:
+        return None
+    try:
+        return futuro.result(timeout=prazo_segundos)
+    except Exception:
+        return None
+
+
+async def obter_resultado_antecipado_async(
+    tool_context: Any,
+    nome_artefato: str,
+    prazo_segundos: float = PRAZO_PADRAO_SEGUNDOS
+) -> Optional[Dict[str, Any]]:
+    """Versão assíncrona de `obter_resultado_antecipado`, sem bloquear o event loop."""
+    if not _trabalhos.get(_id_sessao(tool_context)):
+        return None
+    # Ler e calcular o hash do artefato fica fora do event loop
+    futuro = await em_thread(_trabalho_do_artefato, tool_context, nome_artefato)
+    if futuro is None:
+        return None
+    try:
+        return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(futuro)), prazo_segundos)
+    except Exception:
+        return None
+
+
+class _SessaoDoArtefato:
+    """Sessão com só o artefato agendado, para chamar as ferramentas no trabalho."""
+
+    def __init__(self, nome_artefato: str, artefato: Any):
+        self._nome_artefato = nome_artefato
+        self._artefato = artefato
+
+    def get_artifact(self, name: str) -> Any:
+        return self._artefato if name == self._nome_artefato else None
+
+
+class _ContextoDoArtefato:
+    """Substituto de ToolContext no trabalho: nada do que for escrito é guardado."""
+
+    def __init__(self, nome_artefato: str, artefato: Any):
+        self.session = _SessaoDoArtefato(nome_artefato, artefato)
+        self.state: Dict[str, Any] = {}
+
+
+async def _pre_processar(nome_artefato: str, artefato: Any) -> Optional[Dict[str, Any]]:
+    # Import tardio: as ferramentas consultam este módulo em transcrever_audio
+    from ferramentas_async import _transcrever_audio
+    from implementation import analisar_necessidade_visual, extrair_contexto_educacional
+
+    contexto = _ContextoDoArtefato(nome_artefato, artefato)
+    transcricao = await _transcrever_audio(nome_artefato, contexto)
+    if not transcricao.get("sucesso"):
+        return None
+    texto = transcricao["texto"]
+    return {
+        "transcricao": transcricao,
+        "necessidade_visual": analisar_necessidade_visual(texto, contexto),
+        "contexto_educacional": extrair_contexto_educacional(texto),
+    }
+
+
+def _id_sessao(tool_context: Any) -> Optional[str]:
+    return getattr(tool_context.session, "id", None)
+
+
+def _trabalho_do_artefato(tool_context: Any, nome_artefato: str) -> Optional[Future]:
+    da_sessao = _trabalhos.get(_id_sessao(tool_context))
+    if not da_sessao:
+        return None  # nada agendado na sessão: nem lê o artefato
+    artefato = abrir_artefato(tool_context, nome_artefato)
+    if artefato is None:
+        return None
+    return da_sessao.get(hash_conteudo(artefato.conteudo()))
+
+
+def _descartar_se_falhou(id_sessao: str, impressao: str, futuro: Future) -> None:
+    if not futuro.cancelled() and futuro.exception() is None and futuro.result() is not None:
+        return
+    with _lock:
+        da_sessao = _trabalhos.get(id_sessao)
+        if da_sessao is not None and da_sessao.get(impressao) is futuro:
+            del da_sessao[impressao]
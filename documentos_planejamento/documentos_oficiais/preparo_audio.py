@@ -0,0 +1,184 @@
+"""
+Preparo de áudio antes do STT para o Professor Virtual ADK
+Gravações de crianças chegam em 44,1/48 kHz estéreo, com silêncio longo antes e
+depois da pergunta; o STT cobra latência e banda por tudo isso. Antes da
+transcrição, o áudio PCM é decodificado com NumPy e:
+
+- recortado por VAD de energia (quadros de 30 ms acima de um limiar em dBFS,
+  com uma margem antes e depois da fala);
+- convertido para mono (média dos canais);
+- reamostrado para 16 kHz, a taxa usada pelos modelos de reconhecimento;
+- rejeitado cedo se não há fala (silêncio ou volume baixo demais) ou se está
+  saturado (muitas amostras no limite da escala).
+
+O resultado é um WAV PCM 16 bits mono. MP3/M4A e WAV com codecs compactados
+não são decodificados aqui e seguem sem alteração, assim como tudo quando o
+NumPy não está instalado.
+"""
+
+import io
+import wave
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from cabecalhos_audio import InfoAudio, dados_pcm_wav
+
+try:
+    import numpy as np
+except ImportError:  # sem NumPy o áudio segue sem preparo
+    np = None
+
+
+TAXA_STT_HZ = 16000
+QUADRO_VAD_SEGUNDOS = 0.03
+MARGEM_VAD_SEGUNDOS = 0.25  # preservada antes e depois da fala detectada
+LIMIAR_VOZ_DBFS = -40.0  # energia mínima (RMS) de um quadro com fala
+NIVEL_SATURACAO = 0.999  # fração do fundo de escala
+PROPORCAO_SATURADA_MAXIMA = 0.01
+TAPS_FILTRO = 63  # filtro passa-baixa anti-aliasing da reamostragem
+
+
+@dataclass
+class AudioPreparado:
+    """Áudio a enviar ao STT e a economia obtida no preparo"""
+    dados: bytes  # o original quando não há o que mudar ou não dá para decodificar
+    formato: str
+    adequado: bool = True
+    motivo: Optional[str] = None  # silencioso, saturado
+    sugestao_acao: Optional[str] = None
+    segundos_removidos: float = 0.0
+    bytes_economizados: int = 0
+
+
+def configuracao_preparo() -> str:
+    """Parâmetros do preparo que mudam o áudio enviado ao STT (entram na chave do cache)."""
+    if np is None:
+        return "sem-preparo"
+    return (
+        f"{TAXA_STT_HZ}:{QUADRO_VAD_SEGUNDOS}:{MARGEM_VAD_SEGUNDOS}:{LIMIAR_VOZ_DBFS}:"
+        f"{NIVEL_SATURACAO}:{PROPORCAO_SATURADA_MAXIMA}:{TAPS_FILTRO}"
+    )
+
+
+_SUGESTOES = {
+    "silencioso": "Não consegui ouvir a pergunta. Fale mais perto do microfone e tente de novo.",
+    "saturado": "O áudio ficou estourado. Fale um pouco mais longe do microfone e tente de novo.",
+}
+
+
+def preparar_audio(audio_bytes: bytes, info: InfoAudio) -> AudioPreparado:
+    """Recorta silêncio, converte para mono 16 kHz e rejeita áudio inutilizável.
+
+    Args:
+        audio_bytes: Conteúdo do artefato de áudio.
+        info: Metadados do cabeçalho (ver cabecalhos_audio.py).
+
+    Returns:
+        AudioPreparado com o WAV reduzido; adequado=False com o motivo quando
+        não há fala ou o áudio está saturado.
+    """
+    amostras = _decodificar_pcm(audio_bytes, info)
+    if amostras is None:
+        return AudioPreparado(audio_bytes, info.formato)
+
+    taxa = info.taxa_amostragem
+    saturadas = np.count_nonzero(np.abs(amostras) >= NIVEL_SATURACAO) / max(amostras.size, 1)
+    mono = amostras.mean(axis=1) if amostras.shape[1] > 1 else amostras[:, 0]
+
+    regiao = _regiao_de_voz(mono, taxa)
+    if regiao is None:
+        return _inadequado(audio_bytes, info, "silencioso")
+    if saturadas > PROPORCAO_SATURADA_MAXIMA:
+        return _inadequado(audio_bytes, info, "saturado")
+
+    inicio, fim = regiao
+    inalterado = (
+        inicio == 0 and fim == len(mono) and info.canais == 1
+        and taxa <= TAXA_STT_HZ and info.codec == "pcm" and info.bits_por_amostra == 16
+    )
+    if inalterado:
+        return AudioPreparado(audio_bytes, info.formato)
+
+    mono = mono[inicio:fim]
+    if taxa > TAXA_STT_HZ:
+        mono, taxa = _reamostrar(mono, taxa, TAXA_STT_HZ), TAXA_STT_HZ
+    dados = _codificar_wav(mono, taxa)
+    return AudioPreparado(
+        dados, "wav",
+        segundos_removidos=max(0.0, info.duracao_segundos - len(mono) / taxa),
+        bytes_economizados=len(audio_bytes) - len(dados)
+    )
+
+
+def _decodificar_pcm(audio_bytes: bytes, info: InfoAudio) -> Optional["np.ndarray"]:
+    """Amostras float32 em [-1, 1] com forma (quadros, canais); None se não decodificável."""
+    if np is None or info.formato != "wav":
+        return None
+    bits, canais = info.bits_por_amostra, info.canais
+    if (info.codec, bits) not in (("pcm", 8), ("pcm", 16), ("pcm", 24), ("pcm", 32),
+                                  ("pcm_float", 32), ("pcm_float", 64)):
+        return None
+
+    dados = dados_pcm_wav(audio_bytes)
+    largura = bits // 8
+    quadros = len(dados) // (largura * canais)
+    dados = dados[:quadros * largura * canais]
+    if info.codec == "pcm_float":
+        amostras = np.frombuffer(dados, dtype=f"<f{largura}").astype(np.float32)
+    elif bits == 8:  # PCM 8 bits é sem sinal
+        amostras = (np.frombuffer(dados, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif bits == 24:
+        trios = np.frombuffer(dados, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        inteiros = trios[:, 0] | (trios[:, 1] << 8) | (trios[:, 2] << 16)
+        inteiros = np.where(inteiros >= 1 << 23, inteiros - (1 << 24), inteiros)
+        amostras = inteiros.astype(np.float32) / (1 << 23)
+    else:
+        amostras = np.frombuffer(dados, dtype=f"<i{largura}").astype(np.float32) / (1 << (bits - 1))
+    return amostras.reshape(quadros, canais)
+
+
+def _regiao_de_voz(mono: "np.ndarray", taxa: int) -> Optional[Tuple[int, int]]:
+    """(início, fim) em amostras da fala com margem; None se nenhum quadro tem voz."""
+    quadro = max(1, int(taxa * QUADRO_VAD_SEGUNDOS))
+    n_quadros = len(mono) // quadro
+    if n_quadros == 0:
+        return None
+    energia = np.square(mono[:n_quadros * quadro], dtype=np.float64).reshape(n_quadros, quadro)
+    rms_db = 10 * np.log10(energia.mean(axis=1) + 1e-12)
+    com_voz = np.flatnonzero(rms_db > LIMIAR_VOZ_DBFS)
+    if com_voz.size == 0:
+        return None
+    margem = int(taxa * MARGEM_VAD_SEGUNDOS)
+    inicio = max(0, int(com_voz[0]) * quadro - margem)
+    fim = min(len(mono), (int(com_voz[-1]) + 1) * quadro + margem)
+    if com_voz[-1] == n_quadros - 1:
+        fim = len(mono)  # a sobra após o último quadro inteiro também é fala
+    return inicio, fim
+
+
+def _reamostrar(mono: "np.ndarray", taxa: int, taxa_alvo: int) -> "np.ndarray":
+    """Passa-baixa (sinc janelado) abaixo do novo Nyquist e interpolação linear."""
+    corte = 0.9 * (taxa_alvo / 2) / taxa  # em ciclos por amostra da taxa original
+    n = np.arange(TAPS_FILTRO) - (TAPS_FILTRO - 1) / 2
+    filtro = 2 * corte * np.sinc(2 * corte * n) * np.hamming(TAPS_FILTRO)
+    filtrado = np.convolve(mono, (filtro / filtro.sum()).astype(np.float32), mode="same")
+    n_saida = int(len(mono) * taxa_alvo / taxa)
+    posicoes = np.arange(n_saida) * (taxa / taxa_alvo)
+    return np.interp(posicoes, np.arange(len(filtrado)), filtrado).astype(np.float32)
+
+
+def _codificar_wav(mono: "np.ndarray", taxa: int) -> bytes:
+    pcm = (np.clip(mono, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as arquivo:
+        arquivo.setnchannels(1)
+        arquivo.setsampwidth(2)
+        arquivo.setframerate(taxa)
+        arquivo.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def _inadequado(audio_bytes: bytes, info: InfoAudio, motivo: str) -> AudioPreparado:
+    return AudioPreparado(
+        audio_bytes, info.formato, adequado=False, motivo=motivo, sugestao_acao=_SUGESTOES[motivo]
+    )
@@ -0,0 +1,151 @@
+"""
+Preparo de imagem antes da análise de visão para o Professor Virtual ADK
+Fotos de celular de folhas de exercício chegam com 12 MP ou mais, giradas só
+pela tag EXIF e com a mesa em volta da página; enviadas assim, custam banda e
+latência no serviço de visão, e muitas passavam do limite de 5MB. Antes da
+análise, a imagem é:
+
+- rotacionada conforme a orientação EXIF (e a tag é descartada);
+- recortada para a região da página, quando o papel claro se destaca de um
+  fundo mais escuro;
+- reduzida para o lado máximo que o backend de visão usa
+  (`BackendVisao.lado_maximo_px`);
+- recomprimida em JPEG.
+
+Roda dentro da validação da ferramenta, que a versão assíncrona já executa no
+pool de concorrencia.py, fora do event loop. Requer Pillow e NumPy; sem eles a
+imagem segue sem alteração e o limite de entrada continua 5MB.
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from cabecalhos_imagem import InfoImagem
+
+try:
+    import numpy as np
+    from PIL import Image, ImageOps
+except ImportError:  # preparo desativado
+    np = None
+    Image = None
+
+
+TAMANHO_MAXIMO_IMAGEM = 5 * 1024 * 1024  # enviado ao backend de visão
+# Com o preparo disponível, fotos maiores são aceitas e reduzidas antes do envio
+TAMANHO_MAXIMO_ENTRADA = 20 * 1024 * 1024 if Image is not None else TAMANHO_MAXIMO_IMAGEM
+LADO_MAXIMO_PADRAO_PX = 1568
+QUALIDADE_JPEG = 85
+LADO_DETECCAO_PAGINA_PX = 256
+# O recorte só vale se a página ocupa uma fração plausível da foto
+AREA_MINIMA_PAGINA = 0.2
+AREA_MAXIMA_PAGINA = 0.9
+MARGEM_PAGINA = 0.02  # fração do lado preservada em volta da página
+
+
+@dataclass
+class ImagemPreparada:
+    """Imagem a enviar ao backend de visão e o que mudou no preparo"""
+    dados: bytes  # o original quando o preparo não reduz nada
+    largura: int
+    altura: int
+    orientacao_corrigida: bool = False
+    recortada: bool = False
+    bytes_economizados: int = 0
+
+
+def preparar_imagem(
+    dados: bytes,
+    info: InfoImagem,
+    lado_maximo: int = LADO_MAXIMO_PADRAO_PX
+) -> ImagemPreparada:
+    """Orienta, recorta a página, reduz e recomprime a foto.
+
+    Args:
+        dados: Conteúdo da imagem.
+        info: Metadados do cabeçalho (ver cabecalhos_imagem.py).
+        lado_maximo: Maior lado, em pixels, que o backend de visão aproveita.
+
+    Returns:
+        ImagemPreparada; com o conteúdo original se nada for reduzido.
+    """
+    original = ImagemPreparada(dados, info.largura, info.altura)
+    if Image is None:
+        return original
+
+    with Image.open(io.BytesIO(dados)) as imagem:
+        # JPEG: decodifica já reduzido (escala DCT) quando a foto é bem maior;
+        # o alvo mantém a proporção, senão o lado menor impediria a redução
+        escala = min(1.0, lado_maximo / max(imagem.size))
+        imagem.draft("RGB", (int(imagem.width * escala), int(imagem.height * escala)))
+        orientada = imagem.getexif().get(0x0112, 1) != 1
+        if orientada:
+            imagem = ImageOps.exif_transpose(imagem)
+        imagem = imagem.convert("L" if imagem.mode in ("L", "LA", "I;16") else "RGB")
+
+    caixa = _regiao_da_pagina(imagem)
+    if caixa is not None:
+        imagem = imagem.crop(caixa)
+    imagem.thumbnail((lado_maximo, lado_maximo), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    mudou_geometria = orientada or caixa is not None or max(info.largura, info.altura) > lado_maximo
+    if not mudou_geometria and info.formato == "jpeg":
+        return original  # recomprimir sem reduzir só perderia qualidade
+
+    saida = io.BytesIO()
+    imagem.save(saida, format="JPEG", quality=QUALIDADE_JPEG)
+    if not orientada and len(saida.getbuffer()) >= len(dados):
+        return original
+    return ImagemPreparada(
+        saida.getvalue(), imagem.width, imagem.height,
+        orientacao_corrigida=orientada, recortada=caixa is not None,
+        bytes_economizados=len(dados) - len(saida.getbuffer())
+    )
+
+
+def _regiao_da_pagina(imagem: "Image.Image") -> Optional[Tuple[int, int, int, int]]:
+    """Caixa da página clara sobre fundo escuro, numa miniatura; None se não há recorte."""
+    miniatura = imagem.convert("L")
+    miniatura.thumbnail((LADO_DETECCAO_PAGINA_PX, LADO_DETECCAO_PAGINA_PX), Image.Resampling.BOX)
+    px = np.asarray(miniatura)
+    limiar = _limiar_otsu(px)
+    if limiar is None:
+        return None
+    papel = px > limiar
+
+    # Linhas/colunas com maioria de papel; as letras não bastam para quebrar a página
+    linhas = np.flatnonzero(papel.mean(axis=1) > 0.5)
+    colunas = np.flatnonzero(papel.mean(axis=0) > 0.5)
+    if linhas.size == 0 or colunas.size == 0:
+        return None
+    topo, base = linhas[0], linhas[-1] + 1
+    esquerda, direita = colunas[0], colunas[-1] + 1
+    area = (base - topo) * (direita - esquerda) / px.size
+    if not AREA_MINIMA_PAGINA <= area <= AREA_MAXIMA_PAGINA:
+        return None
+
+    escala_x = imagem.width / px.shape[1]
+    escala_y = imagem.height / px.shape[0]
+    margem_x = MARGEM_PAGINA * imagem.width
+    margem_y = MARGEM_PAGINA * imagem.height
+    return (
+        max(0, int(esquerda * escala_x - margem_x)),
+        max(0, int(topo * escala_y - margem_y)),
+        min(imagem.width, int(direita * escala_x + margem_x)),
+        min(imagem.height, int(base * escala_y + margem_y)),
+    )
+
+
+def _limiar_otsu(px: "np.ndarray") -> Optional[int]:
+    """Tom de cinza que melhor separa papel e fundo (método de Otsu); None se a imagem tem um tom só."""
+    histograma = np.bincount(px.ravel(), minlength=256).astype(np.float64)
+    if np.count_nonzero(histograma) < 2:
+        return None  # imagem uniforme: não há o que separar
+    pesos = np.cumsum(histograma)
+    somas = np.cumsum(histograma * np.arange(256))
+    total, soma_total = pesos[-1], somas[-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media_fundo = somas / pesos
+        media_papel = (soma_total - somas) / (total - pesos)
+        variancia = pesos * (total - pesos) * (media_fundo - media_papel) ** 2
+    return int(np.nanargmax(variancia[:-1]))
@@ -0,0 +1,126 @@
+"""
+Avaliação de qualidade de imagem para o Professor Virtual ADK
+Decide, em poucos milissegundos e antes de chamar o backend de visão, se a foto
+tem resolução, nitidez e exposição suficientes para ser analisada.
+
+A resolução vem do cabeçalho (cabecalhos_imagem.py). A estimativa de nitidez e
+brilho usa Pillow e NumPy sobre uma miniatura e é opcional: sem essas
+bibliotecas, apenas a resolução é avaliada.
+"""
+
+import io
+from dataclasses import dataclass
+from typing import Optional
+
+from cabecalhos_imagem import InfoImagem
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # estimativa por miniatura desativada
+    np = None
+    Image = None
+
+
+# Limites da heurística (calibrados para fotos de páginas/cadernos)
+LADO_MINIMO_PX = 480
+NITIDEZ_MINIMA = 60.0  # variância do laplaciano na miniatura em tons de cinza
+BRILHO_MINIMO = 45.0  # média de 0 a 255
+BRILHO_MAXIMO = 235.0
+LADO_MINIATURA_PX = 512
+# PNG não tem decodificação reduzida; acima disso a estimativa é pulada
+MEGAPIXELS_MAXIMO_PNG = 4.0
+
+
+@dataclass
+class MedidasImagem:
+    """Medidas baratas calculadas sobre a miniatura"""
+    brilho_medio: float
+    nitidez: float
+    hash_perceptual: int  # dHash de 64 bits (ver caches.CacheAnaliseImagem)
+
+
+@dataclass
+class AvaliacaoQualidade:
+    """Resultado do portão de qualidade"""
+    adequada: bool
+    motivo: Optional[str]  # resolucao_baixa, escura, clara_demais, desfocada
+    sugestao_acao: Optional[str]
+    medidas: Optional[MedidasImagem] = None
+
+
+_SUGESTOES = {
+    "resolucao_baixa": "A foto ficou pequena demais. Tire outra foto mais de perto.",
+    "escura": "A foto ficou escura. Tente tirar outra foto com mais luz.",
+    "clara_demais": "A foto ficou muito clara. Evite luz forte ou reflexo sobre a página.",
+    "desfocada": "A foto ficou tremida ou sem foco. Segure o celular firme e tente de novo.",
+}
+
+
+def estimar_medidas(dados: bytes, lado: int = LADO_MINIATURA_PX) -> Optional[MedidasImagem]:
+    """Calcula brilho médio e nitidez numa miniatura em tons de cinza.
+
+    Em JPEG, `draft` faz o decodificador já produzir a imagem reduzida (escala
+    DCT), sem decodificar a resolução completa. A nitidez é a variância do
+    laplaciano: fotos tremidas ou fora de foco têm poucas bordas e valor
+    baixo. Retorna None se Pillow/NumPy não estiverem instalados.
+    """
+    if np is None:
+        return None
+    with Image.open(io.BytesIO(dados)) as imagem:
+        imagem.draft("L", (lado, lado))
+        miniatura = imagem.convert("L")
+    miniatura.thumbnail((lado, lado), Image.Resampling.BOX)  # média por área: rápida e sem realce
+    px = np.asarray(miniatura, dtype=np.float32)
+    laplaciano = (
+        4 * px[1:-1, 1:-1] - px[:-2, 1:-1] - px[2:, 1:-1] - px[1:-1, :-2] - px[1:-1, 2:]
+    )
+    grade = np.asarray(miniatura.resize((9, 8), Image.Resampling.BOX), dtype=np.int16)
+    bits = (grade[:, 1:] > grade[:, :-1]).ravel()
+    return MedidasImagem(
+        brilho_medio=float(px.mean()),
+        nitidez=float(laplaciano.var()),
+        hash_perceptual=int.from_bytes(np.packbits(bits).tobytes(), "big")
+    )
+
+
+def avaliar_resolucao(info: InfoImagem) -> AvaliacaoQualidade:
+    """Avalia só a resolução, que vem do cabeçalho (não precisa do conteúdo)."""
+    if min(info.largura, info.altura) < LADO_MINIMO_PX:
+        return _inadequada("resolucao_baixa")
+    return AvaliacaoQualidade(adequada=True, motivo=None, sugestao_acao=None)
+
+
+def avaliar_qualidade(
+    dados: bytes,
+    info: InfoImagem,
+    estimar_miniatura: bool = True
+) -> AvaliacaoQualidade:
+    """Avalia resolução, exposição e foco da imagem.
+
+    Args:
+        dados: Conteúdo da imagem.
+        info: Metadados do cabeçalho (ver `inspecionar_imagem`).
+        estimar_miniatura: Se False, avalia apenas a resolução.
+    """
+    resolucao = avaliar_resolucao(info)
+    if not resolucao.adequada:
+        return resolucao
+
+    medidas = None
+    if estimar_miniatura and (info.formato != "png" or info.megapixels <= MEGAPIXELS_MAXIMO_PNG):
+        medidas = estimar_medidas(dados)
+    if medidas is not None:
+        if medidas.brilho_medio < BRILHO_MINIMO:
+            return _inadequada("escura", medidas)
+        if medidas.brilho_medio > BRILHO_MAXIMO:
+            return _inadequada("clara_demais", medidas)
+        if medidas.nitidez < NITIDEZ_MINIMA:
+            return _inadequada("desfocada", medidas)
+    return AvaliacaoQualidade(adequada=True, motivo=None, sugestao_acao=None, medidas=medidas)
+
+
+def _inadequada(motivo: str, medidas: Optional[MedidasImagem] = None) -> AvaliacaoQualidade:
+    return AvaliacaoQualidade(
+        adequada=False, motivo=motivo, sugestao_acao=_SUGESTOES[motivo], medidas=medidas
+    )
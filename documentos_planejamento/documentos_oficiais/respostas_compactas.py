@@ -0,0 +1,56 @@
+"""
+Modo compacto das respostas das ferramentas para o Professor Virtual ADK
+Tudo o que uma ferramenta devolve volta ao modelo como tokens de entrada, e
+fica no histórico de todas as rodadas seguintes da conversa. As respostas
+completas carregam campos de que o modelo não precisa:
+
+- ecoados dos argumentos (`contexto_pergunta`, `referencias_encontradas`);
+- deriváveis de outros campos (`justificativa`, `sucesso` quando não há
+  `erro`, `audio_adequado`, `tamanho_caracteres`);
+- metadados operacionais (formato, codec, taxa, tamanho, bytes economizados).
+
+`compactar_resposta` remove esses campos, omite `sucesso` quando a ferramenta
+deu certo e `sugestao_acao` quando não há sugestão, e arredonda os números.
+As chaves que ficam têm o mesmo nome e a mesma estrutura da resposta
+completa (`texto`, `necessidade_visual.necessita_imagem`,
+`contexto_educacional`...), que são os nomes que a instrução do agente usa
+(instruction_providers.py); por isso o modo não precisa de nota na instrução,
+que iria em todas as rodadas e custaria mais do que economiza nas conversas
+com poucas respostas de ferramenta. O agente (agente.py,
+`respostas_compactas=True`) aplica o modo na fronteira com o modelo; quem
+chama as ferramentas direto continua recebendo as respostas completas.
+Comparação de tokens: benchmarks/bench_tokens_respostas.py.
+"""
+
+from typing import Any, Dict
+
+# Campos removidos: ecoados, deriváveis ou só operacionais
+CAMPOS_DESCARTADOS = frozenset({
+    "formato", "codec", "taxa_amostragem", "canais", "tamanho_bytes", "idioma_detectado",
+    "duracao_segundos", "segundos_removidos", "bytes_economizados", "largura", "altura",
+    "contexto_pergunta", "referencias_encontradas", "justificativa", "tamanho_caracteres",
+    "materias_ranqueadas", "audio_adequado", "motivo_qualidade",
+})
+
+# Campos omitidos quando têm o valor esperado: a falha vem sempre com `erro`
+VALORES_PADRAO = {"sucesso": True, "sugestao_acao": None}
+
+CASAS_DECIMAIS = 2
+
+
+def compactar_resposta(resposta: Dict[str, Any]) -> Dict[str, Any]:
+    """Versão compacta da resposta de uma ferramenta (a original não é alterada)."""
+    compacta: Dict[str, Any] = {}
+    for chave, valor in resposta.items():
+        if chave in CAMPOS_DESCARTADOS:
+            continue
+        if chave in VALORES_PADRAO and valor == VALORES_PADRAO[chave]:
+            continue
+        if isinstance(valor, dict):
+            valor = compactar_resposta(valor)
+        elif isinstance(valor, float):
+            valor = round(valor, CASAS_DECIMAIS)
+        compacta[chave] = valor
+    if "erro" in compacta:
+        compacta.pop("sucesso", None)  # `erro` já indica a falha
+    return compacta
@@ -0,0 +1,105 @@
+"""
+Configuração compartilhada dos testes do Professor Virtual ADK
+Disponibiliza os módulos de documentos_oficiais para importação direta
+(ex: `from implementation import transcrever_audio`) e os geradores de mídia
+sintética de benchmarks/corpus.py.
+"""
+
+import sys
+from pathlib import Path
+
+_RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(_RAIZ / "benchmarks"))
+sys.path.insert(0, str(_RAIZ / "documentos_oficiais"))
+
+
+import pytest  # noqa: E402
+
+from corpus import ArtefatoFalso, ContextoFerramentaFalso, SessaoFalsa  # noqa: E402, F401
+
+
+@pytest.fixture
+def contexto():
+    return ContextoFerramentaFalso()
+
+
+@pytest.fixture(autouse=True)
+def cache_transcricao_limpo():
+    """Cada teste começa com um cache de transcrições vazio."""
+    from caches import CacheTranscricao, configurar_cache_transcricao, obter_cache_transcricao
+    anterior = obter_cache_transcricao()
+    cache = CacheTranscricao()
+    configurar_cache_transcricao(cache)
+    yield cache
+    configurar_cache_transcricao(anterior)
+
+
+@pytest.fixture(autouse=True)
+def cache_tts_limpo():
+    """Cada teste começa com um cache de TTS vazio."""
+    from caches import CacheTTS, configurar_cache_tts, obter_cache_tts
+    anterior = obter_cache_tts()
+    cache = CacheTTS()
+    configurar_cache_tts(cache)
+    yield cache
+    configurar_cache_tts(anterior)
+
+
+@pytest.fixture(autouse=True)
+def cache_analise_imagem_limpo():
+    """Cada teste começa com um cache de análises de imagem vazio."""
+    from caches import CacheAnaliseImagem, configurar_cache_analise_imagem, obter_cache_analise_imagem
+    anterior = obter_cache_analise_imagem()
+    cache = CacheAnaliseImagem()
+    configurar_cache_analise_imagem(cache)
+    yield cache
+    configurar_cache_analise_imagem(anterior)
+
+
+def _backend_do_parametro(request, classe_padrao):
+    """Backend pedido pela parametrização indireta do teste.
+
+    O parâmetro pode ser um dict com os argumentos de `classe_padrao` ou uma
+    classe/fábrica sem argumentos; sem parâmetro, usa `classe_padrao()`.
+    """
+    parametro = getattr(request, "param", {})
+    return classe_padrao(**parametro) if isinstance(parametro, dict) else parametro()
+
+
+@pytest.fixture
+def backend_stt(request):
+    """Backend de STT falso que conta as chamadas.
+
+    Para outro texto, latência ou backend, parametrize indiretamente:
+
+        @pytest.mark.parametrize("backend_stt", [{"texto": "..."}], indirect=True)
+        @pytest.mark.parametrize("backend_stt", [MeuBackendSTT], indirect=True)
+    """
+    from backends import BackendSTTFalso, configurar_backend_stt, obter_backend_stt
+    anterior = obter_backend_stt()
+    backend = _backend_do_parametro(request, BackendSTTFalso)
+    configurar_backend_stt(backend)
+    yield backend
+    configurar_backend_stt(anterior)
+
+
+@pytest.fixture
+def backend_tts(request):
+    """Backend de TTS falso; parametrizável como `backend_stt`."""
+    from backends import BackendTTSFalso, configurar_backend_tts, obter_backend_tts
+    anterior = obter_backend_tts()
+    backend = _backend_do_parametro(request, BackendTTSFalso)
+    configurar_backend_tts(backend)
+    yield backend
+    configurar_backend_tts(anterior)
+
+
+@pytest.fixture
+def backend_visao():
+    """Backend de visão falso que conta as chamadas."""
+    from backends import BackendVisaoFalso, configurar_backend_visao, obter_backend_visao
+    anterior = obter_backend_visao()
+    backend = BackendVisaoFalso()
+    configurar_backend_visao(backend)
+    yield backend
+    configurar_backend_visao(anterior)
@@ -0,0 +1,124 @@
+"""
+Testes do agente no runner do ADK com o modelo falso
+"""
+
+import asyncio
+import inspect
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+import ferramentas_async
+import implementation
+from agente import NOME_AGENTE, ArtefatosPorSessao, criar_agente_professor
+from corpus import gerar_imagem_pagina, gerar_wav
+from modelos_falsos import PEDIDO_FOTO, RESPOSTA_PADRAO, ModeloProfessorFalso
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+# O STT devolve uma pergunta que pede foto
+pergunta_visual = pytest.mark.parametrize(
+    "backend_stt", [{"texto": "Não entendi esse exercício aqui de matemática"}], indirect=True
+)
+
+
+async def _conversa(ferramentas, mensagens, artefatos_iniciais, modelo=None):
+    artefatos = ArtefatosPorSessao()
+    runner = InMemoryRunner(
+        agent=criar_agente_professor(modelo or ModeloProfessorFalso(), ferramentas, artefatos),
+        app_name=NOME_AGENTE
+    )
+    sessao = await runner.session_service.create_session(app_name=NOME_AGENTE, user_id="aluno")
+    for nome, dados in artefatos_iniciais.items():
+        artefatos.da_sessao(sessao.id).create_artifact(nome, dados)
+
+    turnos = []
+    for mensagem in mensagens:
+        eventos = []
+        async for evento in runner.run_async(
+            user_id="aluno", session_id=sessao.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=mensagem)])
+        ):
+            eventos.append(evento)
+        turnos.append(eventos)
+    return turnos, artefatos.da_sessao(sessao.id)
+
+
+def _chamadas(eventos):
+    return [p.function_call.name for e in eventos for p in e.content.parts if p.function_call]
+
+
+def _texto_final(eventos):
+    return eventos[-1].content.parts[-1].text
+
+
+@pytest.mark.parametrize("ferramentas", [
+    implementation.PROFESSOR_TOOLS, ferramentas_async.PROFESSOR_TOOLS_ASYNC
+], ids=["sincronas", "assincronas"])
+@pergunta_visual
+def test_fluxo_documentado_no_runner(ferramentas, backend_stt):
+    turnos, armazenamento = asyncio.run(_conversa(
+        ferramentas,
+        [
+            "transcreva o áudio 'pergunta.wav'",
+            "analise a imagem 'exercicio.jpg' no contexto da pergunta anterior",
+            "gere o áudio da sua resposta",
+        ],
+        {"pergunta.wav": gerar_wav(2.0), "exercicio.jpg": gerar_imagem_pagina()},
+    ))
+    audio, imagem, tts = turnos
+
+    assert _chamadas(audio) == ["compreender_pergunta_audio"]
+    assert _texto_final(audio) == PEDIDO_FOTO
+
+    assert _chamadas(imagem) == ["analisar_imagem_educacional"]
+    chamada = next(p.function_call for e in imagem for p in e.content.parts if p.function_call)
+    assert chamada.args["contexto_pergunta"] == "Não entendi esse exercício aqui de matemática"
+    assert _texto_final(imagem) == RESPOSTA_PADRAO
+
+    assert _chamadas(tts) == ["gerar_audio_tts"]
+    resposta_tts = next(p.function_response.response for e in tts for p in e.content.parts if p.function_response)
+    assert resposta_tts["sucesso"]
+    assert armazenamento.get_artifact(resposta_tts["nome_artefato_gerado"]) is not None
+
+
+def test_artefato_inexistente_vira_resposta_de_erro():
+    turnos, _ = asyncio.run(_conversa(
+        ferramentas_async.PROFESSOR_TOOLS_ASYNC, ["transcreva o áudio 'sumiu.wav'"], {}
+    ))
+    resposta = next(p.function_response.response for e in turnos[0] for p in e.content.parts if p.function_response)
+    assert resposta["sucesso"] is False
+    assert "Você pode mandar de novo" in _texto_final(turnos[0])
+
+
+def test_modelo_falso_simula_latencia_e_informa_tokens():
+    modelo = ModeloProfessorFalso(latencia_primeiro_token=0.05, latencia_por_token=0.0)
+    turnos, _ = asyncio.run(_conversa(
+        implementation.PROFESSOR_TOOLS, ["Oi, professor!"], {}, modelo
+    ))
+    uso = turnos[0][-1].usage_metadata
+    assert uso.prompt_token_count > 0
+    assert uso.candidates_token_count == len(RESPOSTA_PADRAO) // 4
+
+
+def test_ferramentas_do_agente_mantem_assinaturas():
+    agente = criar_agente_professor(ferramentas=ferramentas_async.PROFESSOR_TOOLS_ASYNC)
+    assert agente.model == "gemini-2.5-flash"
+    for funcao in agente.tools:
+        original = ferramentas_async.PROFESSOR_TOOLS_ASYNC[funcao.__name__]
+        assert inspect.signature(funcao) == inspect.signature(original)
+        assert inspect.iscoroutinefunction(funcao) == inspect.iscoroutinefunction(original)
+
+
+@pergunta_visual
+def test_gerador_de_carga_curto(backend_stt):
+    import bench_carga
+
+    gerador = bench_carga.criar_gerador(ModeloProfessorFalso(), pausa=0.05)
+    degraus = asyncio.run(gerador.executar(bench_carga.ler_rampa(["0:2", "0.5:4"]), 1.5))
+    assert [d["sessoes"] for d in degraus] == [2, 4]
+    assert gerador.erros == 0
+    assert sum(d["turnos_por_s"] for d in degraus) > 0
+    assert all(d["p50_ms"] <= d["p95_ms"] <= d["p99_ms"] for d in degraus)
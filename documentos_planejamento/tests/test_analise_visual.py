@@ -0,0 +1,48 @@
+"""
+Testes do scanner de referências visuais de analisar_necessidade_visual
+"""
+
+import pytest
+
+from implementation import analisar_necessidade_visual
+
+
+@pytest.mark.parametrize("texto, confianca", [
+    ("Não entendi esse exercício aqui de matemática", 0.9),
+    ("Olha esse problema aqui, não sei fazer", 0.6),
+    ("O que significa isso que tá mostrando no gráfico?", 0.75),
+    ("O que é fotossíntese?", 0.0),
+    ("Como resolver uma equação do primeiro grau?", 0.0),
+    ("Qual é o plural de cidadão?", 0.0),
+])
+def test_pontuacao_igual_heuristica_original(texto, confianca):
+    resultado = analisar_necessidade_visual(texto, tool_context=None)
+    assert resultado["confianca"] == pytest.approx(confianca)
+    assert resultado["necessita_imagem"] == (confianca >= 0.5)
+
+
+def test_insensivel_a_acentos():
+    com_acento = analisar_necessidade_visual("O que é isso aí? Tá escrito no gráfico", None)
+    sem_acento = analisar_necessidade_visual("o que e isso ai? ta escrito no grafico", None)
+    assert com_acento["confianca"] == pytest.approx(sem_acento["confianca"])
+    assert len(com_acento["referencias_encontradas"]) == len(sem_acento["referencias_encontradas"])
+
+
+def test_verbo_esta_nao_conta_como_demonstrativo():
+    resultado = analisar_necessidade_visual("O que está acontecendo com a planta?", None)
+    assert resultado["referencias_encontradas"] == []
+
+
+def test_frases_contam_palavras_internas():
+    resultado = analisar_necessidade_visual("me ajude com isso aqui", None)
+    refs = resultado["referencias_encontradas"]
+    assert "me ajude com isso" in refs
+    assert "isso" in refs and "aqui" in refs
+    # frase + isso + aqui (0.45) e bônus de "isso aqui" (0.4)
+    assert resultado["confianca"] == pytest.approx(0.85)
+
+
+def test_exercicio_no_plural_recebe_bonus():
+    resultado = analisar_necessidade_visual("fiz os exercícios de casa", None)
+    assert resultado["confianca"] == pytest.approx(0.3)
+    assert resultado["referencias_encontradas"] == []
@@ -0,0 +1,119 @@
+"""
+Testes do armazenamento de artefatos com transbordo para disco
+"""
+
+import os
+
+import pytest
+
+import armazenamento_artefatos
+from armazenamento_artefatos import ArmazenamentoArtefatos, ArtefatoEmDisco, ArtefatoEmMemoria, mapas_abertos
+from corpus import gerar_wav
+from implementation import gerar_audio_tts, transcrever_audio, transcrever_audio_stream
+
+
+@pytest.fixture
+def armazenamento():
+    armazenamento = ArmazenamentoArtefatos(limite_por_artefato=1024, max_bytes_memoria=4096)
+    yield armazenamento
+    armazenamento.fechar()
+
+
+@pytest.fixture
+def contexto_em_disco(contexto, armazenamento):
+    contexto.session = armazenamento
+    return contexto
+
+
+def test_pequenos_em_memoria_grandes_em_disco(armazenamento):
+    armazenamento.create_artifact("pequeno.txt", b"oi", "text/plain")
+    armazenamento.create_artifact("grande.wav", b"x" * 5000, "audio/wav")
+    pequeno, grande = armazenamento.get_artifact("pequeno.txt"), armazenamento.get_artifact("grande.wav")
+    assert isinstance(pequeno, ArtefatoEmMemoria) and pequeno.content == b"oi"
+    assert isinstance(grande, ArtefatoEmDisco) and grande.mime_type == "audio/wav"
+    assert grande.size == 5000 and grande.content == b"x" * 5000
+    assert grande.read_range(4990, 6000) == b"x" * 10
+    assert armazenamento.estatisticas() == {
+        "artefatos": 2, "artefatos_em_disco": 1, "bytes_em_memoria": 2, "bytes_em_disco": 5000,
+    }
+
+
+def test_orcamento_de_memoria_limitado(armazenamento):
+    for i in range(20):
+        armazenamento.create_artifact(f"frase_{i}.mp3", bytes([i]) * 1000)
+    assert armazenamento.bytes_em_memoria <= 4096
+    assert armazenamento.estatisticas()["artefatos_em_disco"] == 16
+    assert all(armazenamento.get_artifact(f"frase_{i}.mp3").content == bytes([i]) * 1000 for i in range(20))
+
+
+def test_substituir_e_apagar_removem_o_arquivo(armazenamento):
+    armazenamento.create_artifact("a.bin", b"1" * 2000)
+    caminho = armazenamento.get_artifact("a.bin").caminho
+    armazenamento.create_artifact("a.bin", b"2" * 10)
+    assert not os.path.exists(caminho)
+    armazenamento.create_artifact("b.bin", b"3" * 2000)
+    visao = armazenamento.get_artifact("b.bin").content  # memoryview ainda em uso
+    armazenamento.delete_artifact("b.bin")
+    assert armazenamento.get_artifact("b.bin") is None and bytes(visao[:1]) == b"3"
+    assert armazenamento.estatisticas()["bytes_em_disco"] == 0
+
+
+def test_mapas_abertos_limitados(armazenamento, monkeypatch):
+    monkeypatch.setattr(armazenamento_artefatos, "MAX_MAPAS_ABERTOS", 3)
+    for i in range(10):
+        armazenamento.create_artifact(f"{i}.bin", bytes([i]) * 2000)
+    visao = armazenamento.get_artifact("0.bin").content  # mapa fechado depois, com a visão em uso
+    for i in range(10):
+        assert armazenamento.get_artifact(f"{i}.bin").content[:3] == bytes([i]) * 3
+        assert mapas_abertos() <= 3
+    assert bytes(visao[:1]) == b"\0"
+    assert armazenamento.get_artifact("0.bin").content[1999] == 0  # reaberto sob demanda
+
+
+def test_fechar_remove_diretorio():
+    armazenamento = ArmazenamentoArtefatos(limite_por_artefato=10)
+    armazenamento.create_artifact("a.bin", b"x" * 100)
+    diretorio = armazenamento.diretorio
+    armazenamento.fechar()
+    assert not os.path.exists(diretorio)
+
+
+def test_ferramentas_com_artefatos_em_disco(contexto_em_disco, armazenamento):
+    contexto_em_disco.adicionar_artefato("pergunta.wav", gerar_wav(2.0))
+    assert isinstance(armazenamento.get_artifact("pergunta.wav"), ArtefatoEmDisco)
+    resultado = transcrever_audio("pergunta.wav", contexto_em_disco)
+    assert resultado["sucesso"] and resultado["duracao_segundos"] == pytest.approx(2.0)
+    assert list(transcrever_audio_stream("pergunta.wav", contexto_em_disco))[-1]["parcial"] is False
+    assert gerar_audio_tts("Resposta " * 200, contexto_em_disco)["sucesso"]
+
+
+def test_imagem_em_disco(contexto_em_disco, armazenamento, backend_visao):
+    pytest.importorskip("PIL")
+    from corpus import gerar_imagem_pagina
+    from implementation import analisar_imagem_educacional
+    contexto_em_disco.adicionar_artefato("foto.jpg", gerar_imagem_pagina())
+    resultado = analisar_imagem_educacional("foto.jpg", "", contexto_em_disco)
+    assert resultado["qualidade_adequada"] and backend_visao.chamadas == 1
+
+
+def test_orcamento_compartilhado_entre_sessoes():
+    from agente import ArtefatosPorSessao
+
+    artefatos = ArtefatosPorSessao(
+        fabrica=lambda **kwargs: ArmazenamentoArtefatos(limite_por_artefato=1024, **kwargs),
+        max_bytes_memoria=4096,
+    )
+    sessoes = [artefatos.da_sessao(f"sessao_{i}") for i in range(10)]
+    for i, sessao in enumerate(sessoes):
+        sessao.create_artifact("pergunta.mp3", bytes([i]) * 1000)
+    # Dez sessões com 1000 bytes cada: o limite vale para a soma, não por sessão
+    assert artefatos.orcamento.bytes_em_memoria <= 4096
+    assert sum(s.bytes_em_memoria for s in sessoes) == artefatos.orcamento.bytes_em_memoria
+    em_disco = [isinstance(s.get_artifact("pergunta.mp3"), ArtefatoEmDisco) for s in sessoes]
+    assert em_disco == [True] * 6 + [False] * 4  # as mais antigas foram para disco
+    assert all(s.get_artifact("pergunta.mp3").content == bytes([i]) * 1000 for i, s in enumerate(sessoes))
+    artefatos.fechar("sessao_9")
+    assert artefatos.orcamento.bytes_em_memoria == 3000
+    for i in range(9):
+        artefatos.fechar(f"sessao_{i}")
+    assert artefatos.orcamento.bytes_em_memoria == 0
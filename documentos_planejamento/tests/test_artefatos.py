@@ -0,0 +1,93 @@
+"""
+Testes do acesso preguiçoso aos artefatos (validação só com metadados)
+"""
+
+import struct
+
+import pytest
+
+from artefatos import abrir_artefato
+from corpus import gerar_wav
+from implementation import analisar_imagem_educacional, transcrever_audio
+
+
+class ArtefatoPorPartes:
+    """Artefato com `size` e `read_range`, que registra leituras do conteúdo."""
+
+    def __init__(self, name, dados, size=None, mime_type=None):
+        self.name = name
+        self.mime_type = mime_type
+        self.size = len(dados) if size is None else size
+        self._dados = dados
+        self.leituras_completas = 0
+        self.bytes_lidos_parcialmente = 0
+
+    def read_range(self, inicio, fim):
+        trecho = self._dados[inicio:fim]
+        self.bytes_lidos_parcialmente += len(trecho)
+        return trecho
+
+    @property
+    def content(self):
+        self.leituras_completas += 1
+        return self._dados
+
+
+def _png(largura, altura):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII5x", 13, b"IHDR", largura, altura)
+
+
+def _adicionar(contexto, artefato):
+    contexto.session.artefatos[artefato.name] = artefato
+    return artefato
+
+
+def test_metadados_sem_ler_conteudo(contexto):
+    artefato = _adicionar(contexto, ArtefatoPorPartes("a.wav", gerar_wav(1.0), mime_type="audio/wav"))
+    acesso = abrir_artefato(contexto, "a.wav")
+    assert (acesso.tamanho, acesso.mime_type, acesso.extensao) == (artefato.size, "audio/wav", "wav")
+    assert bytes(acesso.cabecalho(4)) == b"RIFF"
+    assert artefato.leituras_completas == 0 and not acesso.carregado
+    assert acesso.conteudo() is acesso.conteudo()
+    assert artefato.leituras_completas == 1
+    assert abrir_artefato(contexto, "inexistente.wav") is None
+
+
+def test_audio_grande_rejeitado_sem_leitura(contexto):
+    artefato = _adicionar(contexto, ArtefatoPorPartes("a.wav", b"RIFF", size=50 * 1024 * 1024))
+    resultado = transcrever_audio("a.wav", contexto)
+    assert resultado["erro"] == "Arquivo de áudio muito grande (máximo 10MB)"
+    assert artefato.leituras_completas == 0 and artefato.bytes_lidos_parcialmente == 0
+
+
+def test_formato_rejeitado_pelo_trecho_inicial(contexto):
+    artefato = _adicionar(contexto, ArtefatoPorPartes("a.ogg", b"OggS" + bytes(100_000)))
+    resultado = transcrever_audio("a.ogg", contexto)
+    assert resultado["erro"] == "Formato ogg não suportado"
+    assert artefato.leituras_completas == 0 and artefato.bytes_lidos_parcialmente == 16
+
+
+def test_audio_valido_lido_uma_vez(contexto):
+    artefato = _adicionar(contexto, ArtefatoPorPartes("a.wav", gerar_wav(2.0)))
+    assert transcrever_audio("a.wav", contexto)["sucesso"]
+    assert artefato.leituras_completas == 1
+
+
+def test_imagem_pequena_rejeitada_pelo_cabecalho(contexto, backend_visao):
+    artefato = _adicionar(contexto, ArtefatoPorPartes("f.png", _png(320, 240) + bytes(200_000)))
+    resultado = analisar_imagem_educacional("f.png", "", contexto)
+    assert resultado["motivo_qualidade"] == "resolucao_baixa"
+    assert resultado["tamanho_bytes"] == artefato.size
+    assert artefato.leituras_completas == 0
+
+
+def test_jpeg_com_exif_maior_que_o_trecho(contexto, backend_visao):
+    pytest.importorskip("PIL")
+    from corpus import gerar_imagem_pagina
+    jpeg = gerar_imagem_pagina()
+    app1 = b"\xff\xe1" + struct.pack(">H", 65533) + b"Exif\x00\x00" + bytes(65525)
+    dados = jpeg[:2] + app1 + app1 + jpeg[2:]
+    artefato = _adicionar(contexto, ArtefatoPorPartes("f.jpg", dados))
+    resultado = analisar_imagem_educacional("f.jpg", "", contexto)
+    assert (resultado["largura"], resultado["altura"]) == (1280, 960)
+    assert artefato.leituras_completas == 1
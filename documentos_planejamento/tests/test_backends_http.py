@@ -0,0 +1,163 @@
+"""
+Testes dos backends HTTP (pool keep-alive, prazo, disjuntor) contra o servidor local
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backends import configurar_backends, obter_backend_stt, obter_backend_tts
+from backends_http import (
+    BackendSTTHTTP, BackendTTSHTTP, BackendVisaoHTTP, CircuitoAbertoError, ClienteHTTP,
+    Disjuntor, ErroBackend, PrazoEsgotadoError,
+)
+from corpus import gerar_wav
+from implementation import gerar_audio_tts, transcrever_audio
+from servidor_local import ServidorLocal
+
+
+@pytest.fixture
+def servidor():
+    with ServidorLocal() as servidor:
+        yield servidor
+
+
+@pytest.mark.usefixtures("backend_stt", "backend_tts", "backend_visao")
+def test_configurar_backends_http_ponta_a_ponta(servidor, contexto):
+    configurar_backends({
+        "stt": {"tipo": "http", "url_base": servidor.url_base},
+        "tts": {"tipo": "http", "url_base": servidor.url_base, "prazo_segundos": 5},
+    })
+    assert isinstance(obter_backend_stt(), BackendSTTHTTP)
+    assert isinstance(obter_backend_tts(), BackendTTSHTTP)
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0))
+    assert transcrever_audio("pergunta.wav", contexto)["texto"] == servidor.texto
+    resultado = gerar_audio_tts("Olá!", contexto)
+    audio = contexto.session.get_artifact(resultado["nome_artefato_gerado"]).content
+    assert audio == "audio_data_simulado_tts_Olá!".encode("utf-8")
+
+
+@pytest.mark.usefixtures("backend_stt", "backend_tts", "backend_visao")
+def test_backend_substituido_e_fechado(servidor):
+    configurar_backends({"stt": {"tipo": "http", "url_base": servidor.url_base}})
+    primeiro = obter_backend_stt()
+    assert primeiro.transcrever(b"x", "wav") == servidor.texto
+    configurar_backends({"stt": {"tipo": "http", "url_base": servidor.url_base}})
+    assert obter_backend_stt() is not primeiro
+    with pytest.raises(RuntimeError):  # o pool de threads do cliente foi encerrado
+        asyncio.run(primeiro.transcrever_async(b"x", "wav"))
+
+
+@pytest.mark.usefixtures("backend_stt", "backend_tts", "backend_visao")
+def test_tipo_desconhecido():
+    with pytest.raises(ValueError):
+        configurar_backends({"stt": {"tipo": "nuvem"}})
+
+
+def test_conexao_reaproveitada(servidor):
+    backend = BackendVisaoHTTP(servidor.url_base)
+    for _ in range(20):
+        assert backend.analisar(b"imagem", "contexto")["tipo_conteudo"] == "exercicio_matematica"
+    assert servidor.conexoes == 1
+    assert backend.cliente.pool.reutilizacoes == 19
+
+
+def test_chamadas_simultaneas_limitadas_pelo_pool(servidor):
+    servidor.latencia = 0.05
+    backend = BackendSTTHTTP(servidor.url_base, max_conexoes=2)
+    threads = [threading.Thread(target=backend.transcrever, args=(b"x", "wav")) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert servidor.requisicoes == 6
+    assert servidor.maximo_simultaneo == 2
+    assert servidor.conexoes == 2
+
+
+def test_prazo_esgotado(servidor):
+    servidor.latencia = 0.5
+    backend = BackendSTTHTTP(servidor.url_base, prazo_segundos=0.1)
+    inicio = time.monotonic()
+    with pytest.raises(PrazoEsgotadoError):
+        backend.transcrever(b"x", "wav")
+    assert time.monotonic() - inicio < 0.4
+
+
+def test_disjuntor_abre_e_se_recupera(servidor):
+    cliente = ClienteHTTP(servidor.url_base, limite_falhas=3, tempo_recuperacao=0.1)
+    servidor.falhas_programadas = 3
+    for _ in range(3):
+        with pytest.raises(ErroBackend):
+            cliente.chamar("POST", "/stt", b"x")
+    with pytest.raises(CircuitoAbertoError):
+        cliente.chamar("POST", "/stt", b"x")
+    assert servidor.requisicoes == 3  # a chamada rejeitada não chegou ao servidor
+    time.sleep(0.12)
+    assert cliente.chamar("POST", "/stt", b"x").status == 200
+    assert cliente.disjuntor.estado == Disjuntor.FECHADO
+
+
+def test_disjuntor_meio_aberto_reabre_na_falha():
+    agora = [0.0]
+    disjuntor = Disjuntor(limite_falhas=1, tempo_recuperacao=10, relogio=lambda: agora[0])
+    disjuntor.registrar_falha()
+    assert disjuntor.estado == Disjuntor.ABERTO
+    agora[0] = 10.0
+    disjuntor.liberar()
+    assert disjuntor.estado == Disjuntor.MEIO_ABERTO
+    with pytest.raises(CircuitoAbertoError):
+        disjuntor.liberar()  # só uma chamada de teste por vez
+    disjuntor.registrar_falha()
+    assert disjuntor.estado == Disjuntor.ABERTO and disjuntor.aberto_em == 10.0
+
+
+def test_excecao_inesperada_na_chamada_de_teste_reabre_o_disjuntor(servidor, monkeypatch):
+    cliente = ClienteHTTP(servidor.url_base, limite_falhas=1, tempo_recuperacao=0.05)
+    cliente.disjuntor.registrar_falha()
+    time.sleep(0.06)
+
+    def quebrar(*args):
+        raise RuntimeError("erro inesperado")
+
+    monkeypatch.setattr(cliente.pool, "requisitar", quebrar)
+    with pytest.raises(RuntimeError):
+        cliente.chamar("POST", "/stt", b"x")
+    assert cliente.disjuntor.estado == Disjuntor.ABERTO
+    monkeypatch.undo()
+    time.sleep(0.06)
+    assert cliente.chamar("POST", "/stt", b"x").status == 200
+
+
+def test_erro_4xx_nao_conta_para_o_disjuntor(servidor):
+    cliente = ClienteHTTP(servidor.url_base, limite_falhas=1)
+    with pytest.raises(ErroBackend):
+        cliente.chamar("POST", "/inexistente", b"")
+    assert cliente.disjuntor.estado == Disjuntor.FECHADO
+
+
+@pytest.mark.usefixtures("backend_stt", "backend_tts", "backend_visao")
+def test_servidor_fora_do_ar(contexto):
+    with ServidorLocal() as servidor:
+        url_base = servidor.url_base
+    configurar_backends({"stt": {"tipo": "http", "url_base": url_base, "limite_falhas": 1}})
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0))
+    resultado = transcrever_audio("pergunta.wav", contexto)
+    assert resultado["sucesso"] is False and "falha de conexão" in resultado["erro"]
+    resultado = transcrever_audio("pergunta.wav", contexto)
+    assert "disjuntor aberto" in resultado["erro"]
+
+
+def test_versao_assincrona_usa_o_pool_do_cliente(servidor):
+    servidor.latencia = 0.1
+    backend = BackendSTTHTTP(servidor.url_base, max_conexoes=4)
+
+    async def quatro():
+        return await asyncio.gather(*(backend.transcrever_async(b"x", "wav") for _ in range(4)))
+
+    inicio = time.monotonic()
+    assert asyncio.run(quatro()) == [servidor.texto] * 4
+    assert time.monotonic() - inicio < 0.3
+    assert servidor.maximo_simultaneo == 4
@@ -0,0 +1,66 @@
+"""
+Testes da suíte de desempenho offline (benchmarks/bench_pipeline.py)
+"""
+
+import json
+
+import pytest
+
+import bench_pipeline
+from bench_pipeline import FOLGA_ABSOLUTA, LINHA_BASE, METRICAS, comparar
+
+BASE = {"cenario": {
+    "vazao_por_s": 100.0, "p50_ms": 10.0, "p95_ms": 12.0, "p99_ms": 15.0, "pico_memoria_kb": 1000.0,
+}}
+
+
+def test_sem_regressao_dentro_da_tolerancia():
+    atual = {"cenario": {
+        "vazao_por_s": 75.0, "p50_ms": 12.9, "p95_ms": 12.0, "p99_ms": 19.0, "pico_memoria_kb": 1300.0,
+    }}
+    assert comparar(atual, BASE, tolerancia=0.3) == []
+
+
+def test_regressoes_em_cada_direcao():
+    atual = {"cenario": {
+        "vazao_por_s": 60.0, "p50_ms": 10.0, "p95_ms": 20.0, "p99_ms": 15.0, "pico_memoria_kb": 2000.0,
+    }}
+    regressoes = comparar(atual, BASE, tolerancia=0.3)
+    assert [r.split(":")[1].split()[0] for r in regressoes] == ["vazao_por_s", "p95_ms", "pico_memoria_kb"]
+    # Melhorar nunca é regressão
+    melhor = {"cenario": {"vazao_por_s": 500.0, "p50_ms": 1.0, "pico_memoria_kb": 10.0}}
+    assert comparar(melhor, BASE) == []
+
+
+def test_folga_absoluta_ignora_ruido_em_cenarios_rapidos():
+    base = {"rapido": {"p99_ms": 0.01}}
+    assert comparar({"rapido": {"p99_ms": 0.01 + FOLGA_ABSOLUTA["ms"]}}, base) == []
+    assert comparar({"rapido": {"p99_ms": 0.2}}, base) != []
+
+
+def test_cenario_sem_linha_de_base_e_ignorado():
+    assert comparar({"novo": {"p50_ms": 1e6}}, BASE) == []
+
+
+def test_linha_base_gravada_cobre_todos_os_cenarios():
+    gravada = json.loads(LINHA_BASE.read_text(encoding="utf-8"))
+    cenarios = bench_pipeline._cenarios({"transcricoes": []})
+    assert set(gravada["cenarios"]) == set(cenarios)
+    for metricas in gravada["cenarios"].values():
+        assert set(metricas) == set(METRICAS)
+
+
+# configurar_ambiente troca os backends globais; os fixtures os restauram
+@pytest.mark.usefixtures("backend_stt", "backend_tts", "backend_visao")
+def test_mede_um_cenario():
+    bench_pipeline.configurar_ambiente()
+    corpora = {"transcricoes": ["Professor, o que é fotossíntese?"],
+               "audio_16k": bench_pipeline.gerar_wav(1.0)}
+    cenarios = bench_pipeline._cenarios(corpora)
+
+    for nome in ("analisar_necessidade_visual", "transcrever_audio/16k_mono_6s", "gerar_audio_tts"):
+        metricas = bench_pipeline.medir_cenario(cenarios[nome], iteracoes=5, aquecimento=1)
+        assert set(metricas) == set(METRICAS)
+        assert metricas["vazao_por_s"] > 0
+        assert 0 <= metricas["p50_ms"] <= metricas["p95_ms"] <= metricas["p99_ms"]
+        assert metricas["pico_memoria_kb"] >= 0
@@ -0,0 +1,106 @@
+"""
+Testes da leitura de cabeçalhos de áudio e da validação em transcrever_audio
+"""
+
+import struct
+
+import pytest
+
+from cabecalhos_audio import AudioInvalidoError, inspecionar_audio
+from corpus import gerar_m4a, gerar_mp3, gerar_wav
+from implementation import transcrever_audio
+
+
+@pytest.mark.parametrize("taxa, canais", [(16000, 1), (44100, 2), (8000, 1)])
+def test_wav_duracao_e_parametros_reais(taxa, canais):
+    info = inspecionar_audio(gerar_wav(1.5, taxa_amostragem=taxa, canais=canais))
+    assert (info.formato, info.codec) == ("wav", "pcm")
+    assert info.duracao_segundos == pytest.approx(1.5)
+    assert (info.taxa_amostragem, info.canais, info.bits_por_amostra) == (taxa, canais, 16)
+
+
+@pytest.mark.parametrize("com_xing", [False, True])
+def test_mp3_duracao_pelos_quadros(com_xing):
+    info = inspecionar_audio(gerar_mp3(6.0, kbps=64, canais=1, com_xing=com_xing))
+    assert (info.formato, info.codec, info.taxa_amostragem, info.canais) == ("mp3", "mp3", 44100, 1)
+    assert info.taxa_bits == 64000
+    assert info.duracao_segundos == pytest.approx(6.0, abs=0.03)
+
+
+def test_m4a_duracao_do_mvhd_e_parametros_do_stsd():
+    info = inspecionar_audio(gerar_m4a(4.2, taxa_amostragem=48000, canais=1))
+    assert (info.formato, info.codec, info.taxa_amostragem, info.canais) == ("m4a", "aac", 48000, 1)
+    assert info.duracao_segundos == pytest.approx(4.2)
+
+
+def test_aceita_memoryview():
+    dados = gerar_wav(0.5)
+    assert inspecionar_audio(memoryview(dados)).duracao_segundos == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("dados", [
+    b"RIFF\x04\x00\x00\x00WAVE",                       # sem fmt/data
+    gerar_wav(0.1)[:30],                               # fmt truncado
+    b"\x00\x00\x00\x20ftypM4A " + b"\x00" * 24,        # sem moov
+    b"\x00\x00\x00\x08ftyp\xff\xff\xff\xffmoov",        # átomo maior que o arquivo
+    b"ID3\x04\x00\x00\x00\x00\x00\x00" + b"\x00" * 500,  # nenhum quadro MP3
+    b"OggS" + b"\x00" * 100,
+])
+def test_cabecalhos_invalidos_sao_rejeitados(dados):
+    with pytest.raises(AudioInvalidoError):
+        inspecionar_audio(dados)
+
+
+def _moov_aninhado(niveis):
+    atomo = b""
+    for _ in range(niveis):
+        atomo = struct.pack(">I", 8 + len(atomo)) + b"moov" + atomo
+    return b"\x00\x00\x00\x08ftyp" + atomo
+
+
+@pytest.mark.parametrize("dados", [
+    b"\x00\x00\x00\x08ftyp\x00\x00\x00\x10moov\x00\x00\x00\x08mvhd",  # mvhd vazio
+    _moov_aninhado(2000),
+], ids=["mvhd_truncado", "aninhamento_profundo"])
+def test_m4a_malformado_vira_audio_invalido(dados):
+    with pytest.raises(AudioInvalidoError):
+        inspecionar_audio(dados)
+
+
+def test_wav_extensivel_truncado_vira_audio_invalido(contexto):
+    fmt = struct.pack("<HHIIHH", 0xFFFE, 1, 16000, 32000, 2, 16) + b"\x16\x00\x10\x00"
+    dados = b"RIFF" + struct.pack("<I", 4 + 8 + 40) + b"WAVE" + b"fmt " + struct.pack("<I", 40) + fmt
+    with pytest.raises(AudioInvalidoError):
+        inspecionar_audio(dados)
+
+    contexto.adicionar_artefato("pergunta.wav", dados)
+    resultado = transcrever_audio("pergunta.wav", contexto)
+    assert resultado["sucesso"] is False and "struct" not in resultado["erro"]
+
+
+def test_wav_com_tamanho_de_dados_desconhecido_usa_o_restante():
+    dados = bytearray(gerar_wav(1.0))
+    struct.pack_into("<I", dados, 40, 0xFFFFFFFF)
+    assert inspecionar_audio(bytes(dados)).duracao_segundos == pytest.approx(1.0)
+
+
+def test_transcrever_audio_usa_duracao_do_cabecalho(contexto):
+    contexto.adicionar_artefato("pergunta.mp3", gerar_mp3(4.0, kbps=128))
+    resultado = transcrever_audio("pergunta.mp3", contexto)
+    assert resultado["sucesso"] is True
+    assert resultado["duracao_segundos"] == pytest.approx(4.0, abs=0.03)
+    assert (resultado["codec"], resultado["taxa_amostragem"], resultado["canais"]) == ("mp3", 44100, 2)
+
+
+def test_formato_detectado_pelo_conteudo_e_nao_pela_extensao(contexto):
+    contexto.adicionar_artefato("pergunta.wav", gerar_m4a(2.0))
+    assert transcrever_audio("pergunta.wav", contexto)["formato"] == "m4a"
+
+
+def test_audio_corrompido_ou_longo_nao_chega_ao_stt(contexto):
+    contexto.adicionar_artefato("corrompido.wav", b"RIFF\x04\x00\x00\x00WAVE")
+    contexto.adicionar_artefato("longo.m4a", gerar_m4a(6 * 60, kbps=8))
+    erro = transcrever_audio("corrompido.wav", contexto)
+    assert erro["sucesso"] is False and "inválido" in erro["erro"]
+    erro = transcrever_audio("longo.m4a", contexto)
+    assert erro["sucesso"] is False and "longo" in erro["erro"]
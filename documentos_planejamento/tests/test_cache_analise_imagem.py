@@ -0,0 +1,93 @@
+"""
+Testes do cache de análises de imagem por hash perceptual
+"""
+
+import io
+
+import pytest
+
+from caches import CacheAnaliseImagem, distancia_hamming
+from implementation import analisar_imagem_educacional
+
+Image = pytest.importorskip("PIL.Image")
+from corpus import gerar_imagem_pagina  # noqa: E402
+
+
+def _variante(dados, **transformacao):
+    imagem = Image.open(io.BytesIO(dados)).convert("RGB")
+    if "escala" in transformacao:
+        largura, altura = imagem.size
+        imagem = imagem.resize((int(largura * transformacao["escala"]), int(altura * transformacao["escala"])))
+    saida = io.BytesIO()
+    imagem.save(saida, format="JPEG", quality=transformacao.get("qualidade", 90))
+    return saida.getvalue()
+
+
+def test_distancia_hamming():
+    assert distancia_hamming(0b1011, 0b0010) == 2
+    assert distancia_hamming(2**63, 0) == 1
+
+
+def test_foto_quase_igual_reaproveita_analise(contexto, backend_visao, cache_analise_imagem_limpo):
+    original = gerar_imagem_pagina(semente=1)
+    contexto.adicionar_artefato("aluno1.jpg", original)
+    contexto.adicionar_artefato("aluno2.jpg", _variante(original, qualidade=40, escala=0.8))
+    primeira = analisar_imagem_educacional("aluno1.jpg", "", contexto)
+    segunda = analisar_imagem_educacional("aluno2.jpg", "", contexto)
+    assert backend_visao.chamadas == 1
+    assert segunda["tipo_conteudo"] == primeira["tipo_conteudo"]
+    assert segunda["elementos_detectados"] == primeira["elementos_detectados"]
+    estatisticas = cache_analise_imagem_limpo.estatisticas()
+    assert (estatisticas["acertos_aproximados"], estatisticas["faltas"]) == (1, 1)
+
+
+def test_paginas_diferentes_chamam_backend(contexto, backend_visao, cache_analise_imagem_limpo):
+    for semente in range(1, 5):
+        contexto.adicionar_artefato(f"p{semente}.jpg", gerar_imagem_pagina(semente=semente))
+        analisar_imagem_educacional(f"p{semente}.jpg", "", contexto)
+    assert backend_visao.chamadas == 4
+    assert cache_analise_imagem_limpo.estatisticas()["acertos"] == 0
+
+
+def test_mesma_foto_acerto_exato(contexto, backend_visao, cache_analise_imagem_limpo):
+    contexto.adicionar_artefato("foto.jpg", gerar_imagem_pagina())
+    for _ in range(3):
+        analisar_imagem_educacional("foto.jpg", "", contexto)
+    assert backend_visao.chamadas == 1
+    assert cache_analise_imagem_limpo.estatisticas()["acertos_exatos"] == 2
+
+
+def test_limite_de_itens_e_impressao_por_conteudo():
+    cache = CacheAnaliseImagem(max_itens=2, distancia_maxima=2)
+    cache.guardar(cache.chave(0b0000, "v"), {"n": 1})
+    cache.guardar(cache.chave(0xFF00, "v"), {"n": 2})
+    cache.guardar(cache.chave("abc", "v"), {"n": 3})
+    assert cache.obter(cache.chave(0b0001, "v")) is None  # vizinha foi removida
+    assert cache.obter(cache.chave(0xFF03, "v")) == {"n": 2}
+    assert cache.obter(cache.chave(0xFF03, "outro_backend")) is None
+    assert cache.obter(cache.chave("abd", "v")) is None  # sem busca aproximada para str
+    assert cache.estatisticas()["removidos"] == 1
+
+
+def test_perguntas_diferentes_sobre_a_mesma_folha_dividem_a_analise(
+    contexto, backend_visao, cache_analise_imagem_limpo
+):
+    contexto.adicionar_artefato("foto.jpg", gerar_imagem_pagina())
+    contexto.adicionar_artefato("foto_colega.jpg", gerar_imagem_pagina(qualidade=70))
+    primeira = analisar_imagem_educacional("foto.jpg", "Quanto é 3 + 4?", contexto)
+    segunda = analisar_imagem_educacional("foto_colega.jpg", "O que é esse desenho?", contexto)
+
+    assert backend_visao.chamadas == 1
+    assert segunda["tipo_conteudo"] == primeira["tipo_conteudo"]
+    assert (primeira["contexto_pergunta"], segunda["contexto_pergunta"]) == (
+        "Quanto é 3 + 4?", "O que é esse desenho?"
+    )
+
+
+def test_cache_desativado(contexto, backend_visao):
+    from caches import configurar_cache_analise_imagem
+    configurar_cache_analise_imagem(None)
+    contexto.adicionar_artefato("foto.jpg", gerar_imagem_pagina())
+    analisar_imagem_educacional("foto.jpg", "", contexto)
+    analisar_imagem_educacional("foto.jpg", "", contexto)
+    assert backend_visao.chamadas == 2
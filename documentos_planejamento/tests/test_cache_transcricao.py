@@ -0,0 +1,98 @@
+"""
+Testes do cache de transcrições endereçado por conteúdo
+"""
+
+import pytest
+
+from backends import BackendSTTFalso, configurar_backend_stt
+from caches import CacheLRU, CacheTranscricao
+from corpus import gerar_wav
+import implementation
+from implementation import transcrever_audio, transcrever_audio_stream
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_lru_remove_o_menos_usado():
+    cache = CacheLRU(max_itens=2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obter("a") == 1
+    cache.guardar("c", 3)
+    assert cache.obter("b") is None
+    assert (cache.obter("a"), cache.obter("c")) == (1, 3)
+    assert cache.removidos == 1
+
+
+def test_lru_expira_pelo_ttl():
+    relogio = Relogio()
+    cache = CacheLRU(ttl_segundos=10, relogio=relogio)
+    cache.guardar("a", 1)
+    relogio.agora = 9.9
+    assert cache.obter("a") == 1
+    relogio.agora = 10.1
+    assert cache.obter("a") is None
+    assert (cache.acertos, cache.faltas, cache.expirados) == (1, 1, 1)
+
+
+def test_camada_sqlite_sobrevive_a_novo_processo(tmp_path):
+    caminho = str(tmp_path / "transcricoes.sqlite")
+    primeiro = CacheTranscricao(caminho_sqlite=caminho)
+    chave = primeiro.chave(b"audio", "pt-BR", "backend")
+    preparo = {"segundos_removidos": 0.5, "bytes_economizados": 1024}
+    primeiro.guardar(chave, "olá", preparo)
+    primeiro.fechar()
+
+    segundo = CacheTranscricao(caminho_sqlite=caminho)
+    assert segundo.obter(chave, duracao_segundos=2.5) == ("olá", preparo)
+    assert segundo.obter(chave) == ("olá", preparo)  # agora vem da memória
+    estatisticas = segundo.estatisticas()
+    assert (estatisticas["acertos_disco"], estatisticas["acertos_memoria"], estatisticas["faltas"]) == (1, 1, 0)
+    assert estatisticas["segundos_audio_economizados"] == pytest.approx(2.5)
+    segundo.fechar()
+
+
+def test_mesmo_audio_nao_volta_ao_stt(contexto, backend_stt, cache_transcricao_limpo):
+    audio = gerar_wav(1.0)
+    contexto.adicionar_artefato("pergunta.wav", audio)
+    contexto.adicionar_artefato("reenvio.wav", audio)
+
+    primeiro = transcrever_audio("pergunta.wav", contexto)
+    segundo = transcrever_audio("reenvio.wav", contexto)
+    ultimo = list(transcrever_audio_stream("pergunta.wav", contexto))[-1]
+
+    assert backend_stt.chamadas == 1
+    assert primeiro == segundo
+    assert ultimo["texto"] == primeiro["texto"]
+    estatisticas = cache_transcricao_limpo.estatisticas()
+    assert (estatisticas["acertos"], estatisticas["faltas"]) == (2, 1)
+    assert estatisticas["segundos_audio_economizados"] == pytest.approx(2.0)
+
+
+def test_configuracao_do_backend_faz_parte_da_chave(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0))
+    transcrever_audio("pergunta.wav", contexto)
+    configurar_backend_stt(BackendSTTFalso(texto="outro modelo"))
+    assert transcrever_audio("pergunta.wav", contexto)["texto"] == "outro modelo"
+
+
+def test_acerto_nao_prepara_o_audio_de_novo(contexto, backend_stt, cache_transcricao_limpo, monkeypatch):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0, silencio_segundos=1.0))
+    primeiro = transcrever_audio("pergunta.wav", contexto)
+    assert primeiro["segundos_removidos"] > 0
+
+    def sem_preparo(audio_bytes, info):
+        raise AssertionError("o acerto no cache não deveria preparar o áudio")
+
+    monkeypatch.setattr(implementation, "preparar_audio", sem_preparo)
+    assert transcrever_audio("pergunta.wav", contexto) == primeiro
+    assert list(transcrever_audio_stream("pergunta.wav", contexto))[-1]["segundos_removidos"] == (
+        primeiro["segundos_removidos"]
+    )
+    assert backend_stt.chamadas == 1
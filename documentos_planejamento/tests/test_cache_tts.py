@@ -0,0 +1,73 @@
+"""
+Testes da deduplicação de áudios em gerar_audio_tts
+"""
+
+from caches import CacheLRU, CacheTTS
+from implementation import gerar_audio_tts, pre_gerar_audios_fixos
+from instruction_providers import frases_fixas
+
+
+def test_lru_limitado_por_bytes():
+    cache = CacheLRU(max_itens=None, ttl_segundos=None, max_bytes=10)
+    cache.guardar("a", b"12345")
+    cache.guardar("b", b"12345")
+    cache.guardar("c", b"123")
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert cache.bytes_total == 8
+    cache.guardar("grande", b"x" * 11)
+    assert "grande" not in cache
+
+
+def test_mesmo_texto_na_sessao_reutiliza_o_artefato(contexto, backend_tts):
+    primeiro = gerar_audio_tts("Ótima pergunta!", contexto)
+    segundo = gerar_audio_tts("Ótima pergunta!", contexto)
+    assert primeiro["nome_artefato_gerado"] == segundo["nome_artefato_gerado"]
+    assert backend_tts.chamadas == 1
+    assert len(contexto.session.artefatos) == 1
+
+
+def test_outra_sessao_recebe_os_bytes_do_cache(contexto, backend_tts, cache_tts_limpo):
+    from conftest import ContextoFerramentaFalso
+    outra_sessao = ContextoFerramentaFalso()
+    nome = gerar_audio_tts("Ótima pergunta!", contexto)["nome_artefato_gerado"]
+    assert gerar_audio_tts("Ótima pergunta!", outra_sessao)["nome_artefato_gerado"] == nome
+    assert backend_tts.chamadas == 1
+    artefato = outra_sessao.session.get_artifact(nome)
+    assert artefato.content == contexto.session.get_artifact(nome).content
+    assert artefato.mime_type == "audio/mpeg"
+    assert cache_tts_limpo.estatisticas()["acertos"] == 1
+
+
+def test_voz_e_velocidade_fazem_parte_da_chave(contexto, backend_tts):
+    nomes = {
+        gerar_audio_tts("Oi!", contexto)["nome_artefato_gerado"],
+        gerar_audio_tts("Oi!", contexto, velocidade=1.5)["nome_artefato_gerado"],
+        gerar_audio_tts("Oi!", contexto, voz="pt-BR-Standard-B")["nome_artefato_gerado"],
+    }
+    assert len(nomes) == 3
+    assert backend_tts.chamadas == 3
+
+
+def test_formato_do_backend_define_extensao_e_chave(contexto, backend_tts):
+    mp3 = gerar_audio_tts("Oi!", contexto)["nome_artefato_gerado"]
+    backend_tts.mime_type = "audio/ogg"
+    ogg = gerar_audio_tts("Oi!", contexto)["nome_artefato_gerado"]
+    assert mp3.endswith(".mp3") and ogg.endswith(".ogg")
+    assert mp3[:-4] != ogg[:-4]
+    assert contexto.session.get_artifact(ogg).mime_type == "audio/ogg"
+    assert backend_tts.chamadas == 2
+
+
+def test_pre_geracao_das_frases_fixas(contexto, backend_tts, cache_tts_limpo):
+    frases = frases_fixas()
+    assert pre_gerar_audios_fixos() == len(frases)
+    assert pre_gerar_audios_fixos() == 0
+    gerar_audio_tts(frases[0], contexto)
+    assert backend_tts.chamadas == len(frases)
+    assert cache_tts_limpo.estatisticas()["faltas"] == 0
+
+
+def test_chave_ignora_espacos_nas_pontas():
+    assert CacheTTS.chave(" Oi! ", "v", 1.0, "b", "audio/mpeg") == (
+        CacheTTS.chave("Oi!", "v", 1.0, "b", "audio/mpeg")
+    )
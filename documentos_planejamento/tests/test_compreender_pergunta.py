@@ -0,0 +1,66 @@
+"""
+Testes da ferramenta composta compreender_pergunta_audio
+"""
+
+import asyncio
+
+import ferramentas_async
+from corpus import gerar_wav
+from implementation import (
+    analisar_necessidade_visual, compreender_pergunta_audio, extrair_contexto_educacional,
+    transcrever_audio,
+)
+from instruction_providers import professor_instruction_provider
+from pre_processamento import agendar_pre_processamento
+
+import pytest
+
+
+pergunta_de_soma = pytest.mark.parametrize(
+    "backend_stt", [{"texto": "Professor, o que é isso aqui no exercício de soma?"}], indirect=True
+)
+
+
+@pergunta_de_soma
+def test_combina_as_tres_ferramentas(contexto, backend_stt, cache_transcricao_limpo):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0))
+    resultado = compreender_pergunta_audio("pergunta.wav", contexto)
+    cache_transcricao_limpo.memoria.limpar()
+
+    transcricao = transcrever_audio("pergunta.wav", contexto)
+    assert resultado == {
+        **transcricao,
+        "necessidade_visual": analisar_necessidade_visual(transcricao["texto"], contexto),
+        "contexto_educacional": extrair_contexto_educacional(transcricao["texto"]),
+    }
+    assert resultado["necessidade_visual"]["necessita_imagem"] is True
+    assert resultado["contexto_educacional"]["materia_provavel"] == "matematica"
+
+
+@pergunta_de_soma
+def test_erro_de_transcricao_e_repassado(contexto, backend_stt):
+    resultado = compreender_pergunta_audio("inexistente.wav", contexto)
+    assert resultado["sucesso"] is False and "necessidade_visual" not in resultado
+    assert backend_stt.chamadas == 0
+
+
+@pergunta_de_soma
+def test_usa_o_pre_processamento(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0))
+    artefato = contexto.session.get_artifact("pergunta.wav")
+    agendar_pre_processamento(contexto.session.id, "pergunta.wav", artefato).result()
+    assert compreender_pergunta_audio("pergunta.wav", contexto)["texto"] == backend_stt.texto
+    assert backend_stt.chamadas == 1
+
+
+@pergunta_de_soma
+def test_versao_assincrona_igual(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0))
+    assincrona = asyncio.run(ferramentas_async.compreender_pergunta_audio("pergunta.wav", contexto))
+    assert assincrona == compreender_pergunta_audio("pergunta.wav", contexto)
+
+
+def test_instrucao_prefere_a_ferramenta_composta(contexto):
+    instrucao = professor_instruction_provider(contexto)
+    assert "`compreender_pergunta_audio`" in instrucao
+    assert instrucao.index("compreender_pergunta_audio") < instrucao.index("analisar_necessidade_visual")
@@ -0,0 +1,31 @@
+"""
+Testes da classificação de matérias em extrair_contexto_educacional
+"""
+
+from implementation import extrair_contexto_educacional
+
+
+def test_palavra_chave_dentro_de_outra_conta_uma_vez():
+    # "oceano" contém "ano" (história), mas a ocorrência é só de geografia
+    resultado = extrair_contexto_educacional("Qual o maior oceano? E como calcular a soma?")
+    assert resultado["materias_ranqueadas"] == [
+        {"materia": "matematica", "ocorrencias": 2},
+        {"materia": "geografia", "ocorrencias": 1},
+    ]
+
+
+def test_materia_com_mais_ocorrencias_vence_ordem_da_tabela():
+    # "conta" (matemática) aparece antes na tabela, mas geografia tem mais termos
+    resultado = extrair_contexto_educacional("Em que país fica essa cidade do mapa? Faz a conta")
+    assert resultado["materia_provavel"] == "geografia"
+    assert resultado["materias_ranqueadas"] == [
+        {"materia": "geografia", "ocorrencias": 3},
+        {"materia": "matematica", "ocorrencias": 1},
+    ]
+
+
+def test_sem_palavras_chave_retorna_geral():
+    resultado = extrair_contexto_educacional("Por que o céu é azul?")
+    assert resultado["materia_provavel"] == "geral"
+    assert resultado["materias_ranqueadas"] == []
+
@@ -0,0 +1,80 @@
+"""
+Testes das versões assíncronas das ferramentas
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+
+import pytest
+
+import ferramentas_async
+from backends import BackendSTT
+from corpus import gerar_wav
+from implementation import PROFESSOR_TOOLS, transcrever_audio
+
+
+class BackendBloqueante(BackendSTT):
+    """STT só com a versão síncrona; guarda a thread em que transcreveu."""
+
+    def transcrever(self, audio, formato, idioma="pt-BR"):
+        self.thread = threading.current_thread()
+        return "texto"
+
+
+def test_mesmos_nomes_e_assinaturas_das_versoes_sincronas():
+    assert set(ferramentas_async.PROFESSOR_TOOLS_ASYNC) == set(PROFESSOR_TOOLS)
+    for nome, funcao in ferramentas_async.PROFESSOR_TOOLS_ASYNC.items():
+        assert funcao.__name__ == nome
+        assert inspect.signature(funcao) == inspect.signature(PROFESSOR_TOOLS[nome])
+
+
+def test_transcricao_assincrona_igual_a_sincrona(contexto, cache_transcricao_limpo):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(2.0))
+    assincrona = asyncio.run(ferramentas_async.transcrever_audio("pergunta.wav", contexto))
+    cache_transcricao_limpo.memoria.limpar()
+    assert assincrona == transcrever_audio("pergunta.wav", contexto)
+
+
+def test_erros_seguem_o_formato_das_sincronas(contexto):
+    resultado = asyncio.run(ferramentas_async.transcrever_audio("inexistente.wav", contexto))
+    assert resultado["sucesso"] is False and "não encontrado" in resultado["erro"]
+    resultado = asyncio.run(ferramentas_async.gerar_audio_tts("  ", contexto))
+    assert resultado == {"erro": "Texto vazio fornecido", "sucesso": False}
+
+
+@pytest.mark.parametrize("backend_stt", [{"latencia": 0.2}], indirect=True)
+@pytest.mark.parametrize("backend_tts", [{"atraso_por_caractere": 0.01}], indirect=True)
+def test_sessoes_simultaneas_nao_se_bloqueiam(backend_stt, backend_tts, backend_visao):
+    pytest.importorskip("PIL")
+    backend_visao.latencia = 0.2
+    from conftest import ContextoFerramentaFalso
+    from corpus import gerar_imagem_pagina
+
+    audio, imagem = gerar_wav(1.0), gerar_imagem_pagina()
+
+    async def sessao(i):
+        contexto = ContextoFerramentaFalso()
+        contexto.adicionar_artefato("p.wav", audio)
+        contexto.adicionar_artefato("f.jpg", imagem)
+        transcricao = await ferramentas_async.transcrever_audio("p.wav", contexto)
+        analise = await ferramentas_async.analisar_imagem_educacional("f.jpg", "", contexto)
+        audio_tts = await ferramentas_async.gerar_audio_tts(f"Resposta número {i:02d}", contexto)
+        return transcricao["sucesso"] and analise["sucesso"] and audio_tts["sucesso"]
+
+    async def todas():
+        return await asyncio.gather(*(sessao(i) for i in range(10)))
+
+    inicio = time.perf_counter()
+    assert all(asyncio.run(todas()))
+    # Em série seriam ~10 x 0.6 s; em paralelo, pouco mais que uma sessão
+    assert time.perf_counter() - inicio < 2.0
+
+
+@pytest.mark.parametrize("backend_stt", [BackendBloqueante], indirect=True)
+def test_backend_sem_versao_assincrona_roda_fora_do_loop(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0))
+    resultado = asyncio.run(ferramentas_async.transcrever_audio("pergunta.wav", contexto))
+    assert resultado["texto"] == "texto"
+    assert backend_stt.thread is not threading.main_thread()
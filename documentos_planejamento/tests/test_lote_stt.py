@@ -0,0 +1,155 @@
+"""
+Testes do agendador de lotes de STT
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import ferramentas_async
+from backends import BackendSTTFalso
+from corpus import gerar_wav
+from lote_stt import AgendadorLoteSTT, configurar_agendador_stt, obter_agendador_stt
+
+
+class _STTEco(BackendSTTFalso):
+    """Devolve o próprio áudio como texto, para conferir o roteamento."""
+
+    async def transcrever_lote_async(self, audios, idioma="pt-BR"):
+        await super().transcrever_lote_async(audios, idioma)
+        return [f"{idioma}:{audio.decode()}" for audio, _ in audios]
+
+
+async def _simultaneas(agendador, audios, idioma="pt-BR"):
+    return await asyncio.gather(*(agendador.transcrever(a, "wav", idioma) for a in audios))
+
+
+def test_agrupa_ate_max_lote_e_devolve_cada_resultado_a_sua_chamada():
+    backend = _STTEco()
+    agendador = AgendadorLoteSTT(max_lote=4, espera_maxima_ms=50, backend=backend)
+    audios = [f"a{i}".encode() for i in range(10)]
+
+    textos = asyncio.run(_simultaneas(agendador, audios))
+    assert textos == [f"pt-BR:a{i}" for i in range(10)]
+    assert backend.lotes == [4, 4, 2]
+    assert agendador.estatisticas()["lotes"] == 3
+
+
+def test_lote_incompleto_sai_apos_a_espera_maxima():
+    backend = _STTEco()
+    agendador = AgendadorLoteSTT(max_lote=8, espera_maxima_ms=30, backend=backend)
+
+    inicio = time.perf_counter()
+    assert asyncio.run(_simultaneas(agendador, [b"x"])) == ["pt-BR:x"]
+    assert 0.025 <= time.perf_counter() - inicio < 0.5
+    assert backend.lotes == [1]
+
+
+def test_idiomas_diferentes_vao_em_lotes_separados():
+    backend = _STTEco()
+    agendador = AgendadorLoteSTT(max_lote=8, espera_maxima_ms=10, backend=backend)
+
+    async def misturadas():
+        return await asyncio.gather(
+            agendador.transcrever(b"um", "wav", "pt-BR"),
+            agendador.transcrever(b"one", "wav", "en-US"),
+            agendador.transcrever(b"dois", "wav", "pt-BR"),
+        )
+
+    assert asyncio.run(misturadas()) == ["pt-BR:um", "en-US:one", "pt-BR:dois"]
+    assert sorted(backend.lotes) == [1, 2]
+
+
+def test_erro_do_backend_chega_a_todas_as_chamadas_do_lote():
+    class _Falha(BackendSTTFalso):
+        async def transcrever_lote_async(self, audios, idioma="pt-BR"):
+            raise ConnectionError("STT indisponível")
+
+    agendador = AgendadorLoteSTT(max_lote=2, backend=_Falha())
+
+    async def chamar():
+        return await asyncio.gather(
+            *(agendador.transcrever(b"a", "wav") for _ in range(2)), return_exceptions=True
+        )
+
+    assert all(isinstance(r, ConnectionError) for r in asyncio.run(chamar()))
+
+
+def test_max_lote_invalido():
+    with pytest.raises(ValueError):
+        AgendadorLoteSTT(max_lote=0)
+
+
+@pytest.mark.parametrize("backend_stt", [{"latencia": 0.1}], indirect=True)
+def test_sessoes_simultaneas_da_ferramenta_dividem_um_lote(backend_stt, cache_transcricao_limpo):
+    from conftest import ContextoFerramentaFalso
+
+    anterior = obter_agendador_stt()
+    configurar_agendador_stt(AgendadorLoteSTT(max_lote=16, espera_maxima_ms=50))
+    cache_transcricao_limpo.guardar = lambda *args: None  # cada sessão vai ao STT
+    try:
+        contextos = [ContextoFerramentaFalso() for _ in range(5)]
+        for i, contexto in enumerate(contextos):
+            contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0, frequencia_hz=200 + i))
+
+        async def sessoes():
+            return await asyncio.gather(
+                *(ferramentas_async.transcrever_audio("pergunta.wav", c) for c in contextos)
+            )
+
+        resultados = asyncio.run(sessoes())
+        assert all(r["sucesso"] and r["texto"] == backend_stt.texto for r in resultados)
+        assert backend_stt.lotes == [5]
+    finally:
+        configurar_agendador_stt(anterior)
+
+
+def test_cada_event_loop_tem_seus_lotes():
+    import threading
+
+    backend = _STTEco()
+    agendador = AgendadorLoteSTT(max_lote=8, espera_maxima_ms=30, backend=backend)
+    resultados = {}
+
+    def sessoes(nome):
+        resultados[nome] = asyncio.run(_simultaneas(agendador, [f"{nome}{i}".encode() for i in range(3)]))
+
+    threads = [threading.Thread(target=sessoes, args=(nome,)) for nome in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert resultados == {nome: [f"pt-BR:{nome}{i}" for i in range(3)] for nome in ("a", "b")}
+    assert backend.lotes == [3, 3]
+
+
+@pytest.mark.parametrize("backend_stt", [{"latencia": 0.1}], indirect=True)
+def test_uploads_simultaneos_sao_pre_processados_num_lote(backend_stt):
+    from agente import ArtefatosPorSessao
+    from conftest import ContextoFerramentaFalso
+    from pre_processamento import obter_resultado_antecipado
+
+    anterior = obter_agendador_stt()
+    configurar_agendador_stt(AgendadorLoteSTT(max_lote=16, espera_maxima_ms=100))
+    artefatos = ArtefatosPorSessao()
+    contextos = [ContextoFerramentaFalso() for _ in range(5)]
+    try:
+        audios = [gerar_wav(1.0, frequencia_hz=200 + i) for i in range(len(contextos))]
+        for contexto, audio in zip(contextos, audios):
+            artefatos.da_sessao(contexto.session.id).create_artifact(
+                "pergunta.wav", audio, "audio/wav", pre_processar=True
+            )
+        for contexto in contextos:
+            resultado = obter_resultado_antecipado(artefatos.contexto(contexto), "pergunta.wav")
+            assert resultado["transcricao"]["texto"] == backend_stt.texto
+
+        # A ferramenta, num outro event loop, usa o resultado do lote
+        sessao = artefatos.contexto(contextos[0])
+        resultado = asyncio.run(ferramentas_async.transcrever_audio("pergunta.wav", sessao))
+        assert resultado["texto"] == backend_stt.texto
+        assert backend_stt.lotes == [5]
+    finally:
+        configurar_agendador_stt(anterior)
+        for contexto in contextos:
+            artefatos.fechar(contexto.session.id)
@@ -0,0 +1,157 @@
+"""
+Testes da memoização por sessão das ferramentas de áudio
+"""
+
+import asyncio
+import inspect
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+import ferramentas_async
+import implementation
+from agente import NOME_AGENTE, ArtefatosPorSessao, criar_agente_professor
+from backends import BackendSTTFalso
+from caches import configurar_cache_transcricao
+from corpus import gerar_wav
+from memoizacao_sessao import CHAVE_MEMO, MAX_RESPOSTAS_MEMO
+from modelos_falsos import ConversaRoteirizada, ModeloRoteirizado, TurnoRoteirizado
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+
+class BackendSTTInstavel(BackendSTTFalso):
+    """Falha na primeira transcrição e funciona nas seguintes."""
+
+    def transcrever(self, audio, formato, idioma="pt-BR"):
+        if self.chamadas == 0:
+            self.chamadas += 1
+            raise ConnectionError("STT indisponível")
+        return super().transcrever(audio, formato, idioma)
+
+
+@pytest.fixture(autouse=True)
+def sem_cache_de_transcricao(cache_transcricao_limpo):
+    """Só a memoização evita chamadas ao STT (o fixture do conftest restaura o cache)."""
+    configurar_cache_transcricao(None)
+
+
+def _chaves_memo(contexto):
+    return list(contexto.state.get(CHAVE_MEMO, {}))
+
+
+def test_repeticao_nao_chama_o_backend(backend_stt, contexto):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(2.0))
+    transcrever = implementation.PROFESSOR_TOOLS["transcrever_audio"]
+
+    primeira = transcrever("pergunta.wav", contexto)
+    segunda = transcrever(nome_artefato_audio="pergunta.wav", tool_context=contexto)
+    assert segunda == primeira
+    assert backend_stt.chamadas == 1
+    assert _chaves_memo(contexto)[0].startswith("transcrever_audio:")
+
+
+def test_chave_usa_a_versao_do_artefato(backend_stt, contexto):
+    contexto.adicionar_artefato("a.wav", gerar_wav(2.0))
+    transcrever = implementation.PROFESSOR_TOOLS["transcrever_audio"]
+    transcrever("a.wav", contexto)
+
+    del contexto.session.get_artifact("a.wav").content  # a repetição não lê o conteúdo
+    transcrever("a.wav", contexto)
+    assert backend_stt.chamadas == 1
+
+    contexto.adicionar_artefato("a.wav", gerar_wav(2.0))  # regravado: nova versão
+    transcrever("a.wav", contexto)
+    assert backend_stt.chamadas == 2
+
+
+def test_numero_de_respostas_guardadas_limitado(backend_stt, contexto):
+    transcrever = implementation.PROFESSOR_TOOLS["transcrever_audio"]
+    for i in range(MAX_RESPOSTAS_MEMO + 3):
+        contexto.adicionar_artefato(f"pergunta_{i}.wav", gerar_wav(1.0))
+        transcrever(f"pergunta_{i}.wav", contexto)
+    assert len(_chaves_memo(contexto)) == MAX_RESPOSTAS_MEMO
+    transcrever(f"pergunta_{MAX_RESPOSTAS_MEMO + 2}.wav", contexto)  # das mais recentes
+    assert backend_stt.chamadas == MAX_RESPOSTAS_MEMO + 3
+    transcrever("pergunta_0.wav", contexto)  # a mais antiga saiu
+    assert backend_stt.chamadas == MAX_RESPOSTAS_MEMO + 4
+
+
+def test_resposta_devolvida_e_uma_copia(backend_stt, contexto):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(2.0))
+    transcrever = implementation.PROFESSOR_TOOLS["transcrever_audio"]
+    resposta = transcrever("pergunta.wav", contexto)
+    resposta["texto"] = "alterado"
+    assert transcrever("pergunta.wav", contexto)["texto"] != "alterado"
+
+
+@pytest.mark.parametrize("backend_stt", [BackendSTTInstavel], indirect=True)
+def test_erros_nao_sao_memoizados(contexto, backend_stt):
+    transcrever = implementation.PROFESSOR_TOOLS["transcrever_audio"]
+    assert transcrever("sumiu.wav", contexto)["sucesso"] is False
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(2.0))
+    assert transcrever("pergunta.wav", contexto)["sucesso"] is False
+    assert _chaves_memo(contexto) == []
+    assert transcrever("pergunta.wav", contexto)["sucesso"] is True
+
+
+def test_ferramentas_nao_memoizadas_passam_direto():
+    assert implementation.PROFESSOR_TOOLS["gerar_audio_tts"].__wrapped__ is implementation.gerar_audio_tts
+    assert implementation.PROFESSOR_TOOLS["analisar_necessidade_visual"].__wrapped__ is (
+        implementation.analisar_necessidade_visual
+    )
+    assert implementation.PROFESSOR_TOOLS["analisar_imagem_educacional"].__wrapped__ is (
+        implementation.analisar_imagem_educacional
+    )
+
+
+def test_ferramentas_async_memoizadas(backend_stt, contexto):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(2.0))
+    transcrever = ferramentas_async.PROFESSOR_TOOLS_ASYNC["transcrever_audio"]
+    assert inspect.iscoroutinefunction(transcrever)
+
+    async def duas_vezes():
+        return [await transcrever("pergunta.wav", contexto) for _ in range(2)]
+
+    primeira, segunda = asyncio.run(duas_vezes())
+    assert segunda == primeira and primeira["sucesso"]
+    assert backend_stt.chamadas + len(backend_stt.lotes) == 1
+
+
+def test_no_runner_vale_entre_turnos_e_persiste(backend_stt):
+    argumentos = {"nome_artefato_audio": "pergunta.wav"}
+    conversa = ConversaRoteirizada("repeticao", [
+        TurnoRoteirizado(
+            "transcreva o áudio 'pergunta.wav'",
+            [("transcrever_audio", argumentos), ("transcrever_audio", argumentos)],
+            "Entendi a sua pergunta!",
+        ),
+        TurnoRoteirizado(
+            "pode repetir o que eu perguntei?",
+            [("transcrever_audio", argumentos)],
+            "Você perguntou sobre soma.",
+        ),
+    ])
+    artefatos = ArtefatosPorSessao()
+    runner = InMemoryRunner(
+        agent=criar_agente_professor(ModeloRoteirizado(conversas=[conversa]), artefatos=artefatos),
+        app_name=NOME_AGENTE
+    )
+
+    async def conversar():
+        sessao = await runner.session_service.create_session(app_name=NOME_AGENTE, user_id="aluno")
+        artefatos.da_sessao(sessao.id).create_artifact("pergunta.wav", gerar_wav(2.0))
+        for turno in conversa.turnos:
+            async for _ in runner.run_async(
+                user_id="aluno", session_id=sessao.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=turno.mensagem)])
+            ):
+                pass
+        return await runner.session_service.get_session(
+            app_name=NOME_AGENTE, user_id="aluno", session_id=sessao.id
+        )
+
+    sessao = asyncio.run(conversar())
+    assert backend_stt.chamadas == 1
+    assert len(sessao.state[CHAVE_MEMO]) == 1
@@ -0,0 +1,195 @@
+"""
+Testes das métricas por ferramenta
+"""
+
+import asyncio
+import inspect
+import urllib.request
+
+import pytest
+
+import ferramentas_async
+import implementation
+import metricas
+from metricas import (
+    RegistroMetricas, indice_bucket, instrumentar_ferramentas, limite_superior_bucket
+)
+
+
+def _contagem_inline(microssegundos):
+    """Bucket em que o wrapper (conta em linha) registra uma chamada de `microssegundos`."""
+    registro = RegistroMetricas()
+    relogio = metricas.time.perf_counter_ns
+    instantes = iter([0, microssegundos * 1000])
+    metricas.time.perf_counter_ns = lambda: next(instantes)  # lido ao envolver a função
+    try:
+        funcao = metricas._instrumentar(lambda: None, registro.ferramenta("g"))
+        funcao()
+    finally:
+        metricas.time.perf_counter_ns = relogio
+    return registro.ferramenta("g").contagens.index(1)
+
+
+@pytest.mark.parametrize("us", [0, 15, 16, 17, 31, 32, 1000, 1023, 1024, 123456, 2 ** 40 - 1, 2 ** 40, 2 ** 50])
+def test_indice_bucket_e_limite_superior_sao_consistentes(us):
+    indice = indice_bucket(us)
+    assert indice < metricas._N_BUCKETS
+    if us < 2 ** metricas._MAX_BITS:
+        assert limite_superior_bucket(indice) >= us
+        if indice > 0:
+            assert limite_superior_bucket(indice - 1) < us
+        # erro relativo do bucket de no máximo 12,5%
+        assert limite_superior_bucket(indice) - us <= us / 8
+    else:
+        assert indice == metricas._N_BUCKETS - 1
+    assert _contagem_inline(us) == indice
+
+
+def test_conta_chamadas_erros_e_bytes():
+    registro = RegistroMetricas()
+    ferramentas = instrumentar_ferramentas({
+        "ok": lambda: {"sucesso": True, "tamanho_bytes": 100},
+        "falha": lambda: {"sucesso": False, "erro": "x"},
+    }, registro)
+
+    ferramentas["ok"]()
+    ferramentas["ok"]()
+    ferramentas["falha"]()
+
+    ok, falha = registro.ferramenta("ok"), registro.ferramenta("falha")
+    assert (ok.chamadas, ok.erros, ok.bytes) == (2, 0, 200)
+    assert (falha.chamadas, falha.erros, falha.bytes) == (1, 1, 0)
+    assert sum(ok.contagens) == 2
+
+
+def test_respostas_contadas_em_lotes():
+    registro = RegistroMetricas()
+    falha = instrumentar_ferramentas({"falha": lambda: {"sucesso": False, "tamanho_bytes": 1}}, registro)["falha"]
+    total = metricas.RESPOSTAS_POR_LOTE * 3 + 5
+    for _ in range(total):
+        falha()
+    m = registro.ferramenta("falha")
+    assert len(m.respostas) == 5  # as guardadas não passam de um lote
+    assert (m.erros, m.bytes) == (total, total)
+    assert m.respostas == []
+
+
+def test_wrapper_aceita_as_mesmas_chamadas_que_a_ferramenta():
+    def ferramenta(texto, tool_context, velocidade=1.0):
+        return {"texto": texto, "velocidade": velocidade}
+
+    def variadica(*args, resultado=None, **kwargs):  # cai no wrapper genérico
+        return {"args": args, "kwargs": kwargs}
+
+    registro = RegistroMetricas()
+    ferramentas = instrumentar_ferramentas({"f": ferramenta, "v": variadica}, registro)
+    f, v = ferramentas["f"], ferramentas["v"]
+    assert inspect.signature(f) == inspect.signature(ferramenta)
+    assert f("oi", None) == {"texto": "oi", "velocidade": 1.0}
+    assert f(texto="oi", tool_context=None, velocidade=2.0)["velocidade"] == 2.0
+    with pytest.raises(TypeError):
+        f("oi")  # recusada pelo wrapper, como pela ferramenta
+    assert v(1, x=2) == {"args": (1,), "kwargs": {"x": 2}}
+    assert registro.ferramenta("f").chamadas == 2
+
+
+def test_excecao_e_contada_e_propagada():
+    registro = RegistroMetricas()
+
+    def explode():
+        raise RuntimeError("falhou")
+
+    funcao = instrumentar_ferramentas({"explode": explode}, registro)["explode"]
+    with pytest.raises(RuntimeError):
+        funcao()
+    m = registro.ferramenta("explode")
+    assert (m.chamadas, m.excecoes, m.erros) == (1, 1, 0)
+
+
+def test_async_continua_corrotina():
+    registro = RegistroMetricas()
+
+    async def espera(x: int) -> dict:
+        """Documentação preservada"""
+        await asyncio.sleep(0.01)
+        return {"sucesso": True, "tamanho_bytes": x}
+
+    funcao = instrumentar_ferramentas({"espera": espera}, registro)["espera"]
+    assert inspect.iscoroutinefunction(funcao)
+    assert funcao.__doc__ == "Documentação preservada"
+    assert inspect.signature(funcao) == inspect.signature(espera)
+
+    assert asyncio.run(funcao(7)) == {"sucesso": True, "tamanho_bytes": 7}
+    m = registro.ferramenta("espera")
+    assert (m.chamadas, m.bytes) == (1, 7)
+    assert m.soma_us >= 10000
+    assert m.percentil(99) >= 0.01
+
+
+def test_registros_do_professor_mantem_nomes_e_assinaturas():
+    for registro_ferramentas in (implementation.PROFESSOR_TOOLS, ferramentas_async.PROFESSOR_TOOLS_ASYNC):
+        for nome, funcao in registro_ferramentas.items():
+            assert funcao.__name__ == nome
+            assert inspect.signature(funcao) == inspect.signature(funcao.__wrapped__)
+    assert inspect.iscoroutinefunction(ferramentas_async.PROFESSOR_TOOLS_ASYNC["transcrever_audio"])
+    nomes = {m.nome for m in metricas.obter_registro_metricas().ferramentas()}
+    assert set(implementation.PROFESSOR_TOOLS) <= nomes
+
+
+def _registro_com_chamadas():
+    registro = RegistroMetricas()
+    m = registro.ferramenta("transcrever_audio")
+    for us in (500, 3000, 3000, 200000, 90_000_000):
+        m.registrar(us)
+    m.erros, m.excecoes, m.bytes = 1, 2, 4096
+    return registro
+
+
+def test_texto_prometheus():
+    texto = _registro_com_chamadas().texto_prometheus()
+    linhas = texto.splitlines()
+    assert "# TYPE professor_ferramenta_latencia_segundos histogram" in linhas
+
+    def valor(prefixo):
+        return next(l.rsplit(" ", 1)[1] for l in linhas if l.startswith(prefixo))
+
+    bucket = 'professor_ferramenta_latencia_segundos_bucket{ferramenta="transcrever_audio",'
+    assert valor(bucket + 'le="0.001"}') == "1"
+    assert valor(bucket + 'le="0.005"}') == "3"
+    assert valor(bucket + 'le="0.25"}') == "4"
+    assert valor(bucket + 'le="60.0"}') == "4"
+    assert valor(bucket + 'le="+Inf"}') == "5"
+    assert float(valor('professor_ferramenta_latencia_segundos_sum{ferramenta="transcrever_audio"}')) == pytest.approx(90.2065)
+    assert valor('professor_ferramenta_latencia_segundos_count{ferramenta="transcrever_audio"}') == "5"
+    assert valor('professor_ferramenta_chamadas_total{ferramenta="transcrever_audio"}') == "5"
+    assert valor('professor_ferramenta_bytes_total{ferramenta="transcrever_audio"}') == "4096"
+    assert valor('professor_ferramenta_erros_total{ferramenta="transcrever_audio",tipo="resposta"}') == "1"
+    assert valor('professor_ferramenta_erros_total{ferramenta="transcrever_audio",tipo="excecao"}') == "2"
+
+    # Buckets acumulados nunca diminuem
+    acumulados = [int(l.rsplit(" ", 1)[1]) for l in linhas if l.startswith(bucket)]
+    assert acumulados == sorted(acumulados)
+
+
+def test_gravar_arquivo(tmp_path):
+    registro = _registro_com_chamadas()
+    caminho = tmp_path / "professor.prom"
+    registro.gravar(str(caminho))
+    assert caminho.read_text(encoding="utf-8") == registro.texto_prometheus()
+    assert list(tmp_path.iterdir()) == [caminho]
+
+
+def test_servir_endpoint():
+    registro = _registro_com_chamadas()
+    servidor = registro.servir(porta=0)
+    try:
+        porta = servidor.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{porta}/metrics", timeout=5) as resposta:
+            assert resposta.status == 200
+            assert resposta.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert resposta.read().decode("utf-8") == registro.texto_prometheus()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{porta}/outro", timeout=5)
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
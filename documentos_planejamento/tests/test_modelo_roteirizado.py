@@ -0,0 +1,102 @@
+"""
+Testes do modelo roteirizado com as trajetórias de avaliação
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+import implementation
+from agente import NOME_AGENTE, ArtefatosPorSessao, criar_agente_professor
+from modelos_falsos import (
+    PEDIDO_TTS, ConversaRoteirizada, ModeloRoteirizado, TurnoRoteirizado, carregar_trajetorias,
+)
+
+# bench_trajetorias troca o STT global; backend_stt o restaura no fim
+pytestmark = [pytest.mark.filterwarnings("ignore::UserWarning"), pytest.mark.usefixtures("backend_stt")]
+
+TESTES = Path(__file__).parent
+
+
+def test_carrega_test_json_como_uma_conversa():
+    conversas = carregar_trajetorias(TESTES / "unit" / "basic_questions.test.json")
+    assert len(conversas) == 1
+    conversa = conversas[0]
+    assert conversa.artefatos == {"basic_questions_0.wav": "AUDIO_SIMULADO_BASE64"}
+    primeiro = conversa.turnos[0]
+    assert primeiro.mensagem == "transcreva o áudio 'basic_questions_0.wav'"
+    # Argumentos da API antiga viram o nome do artefato; `formato` é descartado
+    assert primeiro.chamadas == [
+        ("transcrever_audio", {"nome_artefato_audio": "basic_questions_0.wav"}),
+        ("analisar_necessidade_visual", {"texto": "O que é fotossíntese?"}),
+    ]
+    assert primeiro.resposta.startswith("A fotossíntese")
+
+
+def test_carrega_evalset_com_seguimento_e_tts():
+    conversas = {c.nome: c for c in carregar_trajetorias(TESTES / "integration" / "full_flow.evalset.json")}
+    assert set(conversas) == {"complete_visual_flow", "error_handling_flow", "tts_generation_flow"}
+
+    visual = conversas["complete_visual_flow"]
+    assert visual.estado_inicial["user:name"] == "Maria"
+    assert [t.resposta[:10] for t in visual.turnos] == ["Vejo que v", "Ótima perg"]
+    assert visual.turnos[1].chamadas[0] == ("analisar_imagem_educacional", {
+        "nome_artefato_imagem": "complete_visual_flow_1.jpg",
+        "contexto_pergunta": "Não entendi esse exercício aqui de matemática",
+    })
+
+    tts = conversas["tts_generation_flow"]
+    assert tts.turnos[1].mensagem == PEDIDO_TTS
+    assert tts.turnos[1].chamadas[0][0] == "gerar_audio_tts"
+
+
+def test_diretorio_carrega_todos_os_arquivos():
+    nomes = [c.nome for c in carregar_trajetorias(TESTES)]
+    assert sorted(nomes) == sorted([
+        "complete_visual_flow", "error_handling_flow", "tts_generation_flow",
+        "basic_questions", "visual_detection",
+    ])
+
+
+def test_reproduz_trajetorias_no_runner():
+    import bench_trajetorias
+
+    conversas = carregar_trajetorias(TESTES)
+    modelo = ModeloRoteirizado(conversas=conversas, latencia_primeiro_token=0.01)
+    artefatos = ArtefatosPorSessao()
+    runner = InMemoryRunner(
+        agent=criar_agente_professor(modelo, implementation.PROFESSOR_TOOLS, artefatos), app_name=NOME_AGENTE
+    )
+
+    async def todas():
+        return [await bench_trajetorias.reproduzir(runner, artefatos, modelo, c) for c in conversas]
+
+    resultados = asyncio.run(todas())
+    assert all(r["conforme"] for r in resultados)
+    rodadas = sum(len(t.chamadas) + 1 for c in conversas for t in c.turnos)
+    assert modelo.rodadas == rodadas
+    assert modelo.tempo_simulado == pytest.approx(0.01 * rodadas)
+    assert all(r["total_s"] >= r["modelo_s"] for r in resultados)
+
+
+def test_mensagem_fora_do_roteiro_falha():
+    conversa = ConversaRoteirizada("roteiro", [TurnoRoteirizado("Oi", [], "Olá!")])
+    modelo = ModeloRoteirizado(conversas=[conversa])
+    runner = InMemoryRunner(agent=criar_agente_professor(modelo), app_name=NOME_AGENTE)
+
+    async def conversar(texto):
+        sessao = await runner.session_service.create_session(app_name=NOME_AGENTE, user_id="u")
+        eventos = []
+        async for evento in runner.run_async(
+            user_id="u", session_id=sessao.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=texto)])
+        ):
+            eventos.append(evento)
+        return eventos
+
+    assert asyncio.run(conversar("Oi"))[-1].content.parts[0].text == "Olá!"
+    with pytest.raises(ValueError, match="fora do roteiro"):
+        asyncio.run(conversar("Outra coisa"))
@@ -0,0 +1,156 @@
+"""
+Testes do pré-processamento antecipado de áudio
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import ferramentas_async
+from agente import ArtefatosPorSessao
+from caches import configurar_cache_transcricao
+from backends import BackendTTSFalso
+from corpus import gerar_mp3, gerar_wav
+from concorrencia import obter_executor
+from implementation import gerar_audio_tts, transcrever_audio
+from pre_processamento import agendar_pre_processamento, obter_resultado_antecipado
+
+
+stt_lento = pytest.mark.parametrize(
+    "backend_stt", [{"texto": "Professor, o que é isso aqui no exercício?", "latencia": 0.3}], indirect=True
+)
+
+
+class BackendTTSMP3(BackendTTSFalso):
+    """Sintetiza MP3 de verdade, como os backends de produção."""
+
+    def sintetizar(self, texto, voz, velocidade=1.0):
+        super().sintetizar(texto, voz, velocidade)
+        return gerar_mp3(1.0)
+
+
+@pytest.fixture
+def artefatos(contexto):
+    artefatos = ArtefatosPorSessao()
+    yield artefatos
+    artefatos.fechar(contexto.session.id)
+
+
+@pytest.fixture
+def sessao(contexto, artefatos):
+    """Contexto das ferramentas com o armazenamento de artefatos da sessão, como no agente."""
+    return artefatos.contexto(contexto)
+
+
+def _enviar_pergunta(artefatos, contexto, nome="pergunta.wav", audio=None):
+    """Upload da pergunta gravada, como o aplicativo faz."""
+    audio = gerar_wav(1.0) if audio is None else audio
+    artefatos.da_sessao(contexto.session.id).create_artifact(nome, audio, "audio/wav", pre_processar=True)
+
+
+@stt_lento
+def test_upload_agenda_o_pre_processamento(contexto, artefatos, sessao, backend_stt):
+    _enviar_pergunta(artefatos, contexto)
+
+    resultado = obter_resultado_antecipado(sessao, "pergunta.wav")
+    assert resultado["transcricao"]["texto"] == backend_stt.texto
+    assert resultado["necessidade_visual"]["necessita_imagem"] is True
+    assert "materia_provavel" in resultado["contexto_educacional"]
+    assert sessao.state == {}  # nada é escrito no estado da sessão fora de um evento
+
+
+@stt_lento
+def test_ferramenta_responde_sem_chamar_o_stt(contexto, artefatos, sessao, backend_stt):
+    _enviar_pergunta(artefatos, contexto)
+    obter_resultado_antecipado(sessao, "pergunta.wav")
+
+    inicio = time.perf_counter()
+    resultado = transcrever_audio("pergunta.wav", sessao)
+    assert time.perf_counter() - inicio < 0.05
+    assert resultado["sucesso"] and resultado["texto"] == backend_stt.texto
+    assert backend_stt.chamadas == 1
+
+
+@stt_lento
+def test_ferramenta_aguarda_o_trabalho_em_andamento(contexto, artefatos, sessao, backend_stt):
+    _enviar_pergunta(artefatos, contexto)
+
+    resultado = asyncio.run(ferramentas_async.transcrever_audio("pergunta.wav", sessao))
+    assert resultado["texto"] == backend_stt.texto
+    assert backend_stt.chamadas == 1
+
+
+@stt_lento
+@pytest.mark.parametrize("backend_tts", [BackendTTSMP3], indirect=True)
+def test_artefatos_salvos_pelas_ferramentas_nao_sao_pre_processados(sessao, backend_stt, backend_tts):
+    sessao.session.create_artifact("gravacao.wav", gerar_wav(1.0), "audio/wav")
+    assert obter_resultado_antecipado(sessao, "gravacao.wav") is None
+
+    resposta = gerar_audio_tts("A fotossíntese transforma luz em energia.", sessao)
+    assert resposta["sucesso"]
+    assert obter_resultado_antecipado(sessao, resposta["nome_artefato_gerado"]) is None
+    assert backend_stt.chamadas == 0
+
+
+@stt_lento
+def test_prazo_da_espera_e_limitado(contexto, artefatos, sessao, backend_stt):
+    _enviar_pergunta(artefatos, contexto)
+    inicio = time.perf_counter()
+    assert obter_resultado_antecipado(sessao, "pergunta.wav", prazo_segundos=0.05) is None
+    assert time.perf_counter() - inicio < 0.2
+
+
+@pytest.mark.parametrize("backend_stt", [{"latencia": 0.5}], indirect=True)
+def test_uploads_simultaneos_nao_ocupam_o_pool_de_cpu(backend_stt):
+    from conftest import ContextoFerramentaFalso
+
+    artefatos = ArtefatosPorSessao()
+    contextos = [ContextoFerramentaFalso() for _ in range(32)]
+    try:
+        inicio = time.perf_counter()
+        for i, contexto in enumerate(contextos):
+            _enviar_pergunta(artefatos, contexto, audio=gerar_wav(1.0, frequencia_hz=200 + i))
+        # Enquanto o STT responde, o pool de CPU continua livre para as ferramentas
+        assert obter_executor().submit(lambda: "livre").result(timeout=0.3) == "livre"
+        for contexto in contextos:
+            assert obter_resultado_antecipado(artefatos.contexto(contexto), "pergunta.wav") is not None
+        assert time.perf_counter() - inicio < 1.5
+    finally:
+        for contexto in contextos:
+            artefatos.fechar(contexto.session.id)
+
+
+@stt_lento
+def test_falha_nao_fica_guardada(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.wav", b"RIFF" + bytes(40))
+    artefato = contexto.session.get_artifact("pergunta.wav")
+    assert agendar_pre_processamento(contexto.session.id, "pergunta.wav", artefato).result() is None
+    assert obter_resultado_antecipado(contexto, "pergunta.wav") is None
+    assert transcrever_audio("pergunta.wav", contexto)["sucesso"] is False
+
+
+@stt_lento
+def test_artefato_substituido_com_o_mesmo_tamanho_nao_usa_o_resultado(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0, frequencia_hz=200))
+    artefato = contexto.session.get_artifact("pergunta.wav")
+    agendar_pre_processamento(contexto.session.id, "pergunta.wav", artefato).result()
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(1.0, frequencia_hz=300))
+    backend_stt.texto = "Outra pergunta"
+
+    assert obter_resultado_antecipado(contexto, "pergunta.wav") is None
+    assert transcrever_audio("pergunta.wav", contexto)["texto"] == "Outra pergunta"
+
+
+@stt_lento
+def test_fechar_a_sessao_descarta_os_resultados(contexto, artefatos, backend_stt):
+    configurar_cache_transcricao(None)  # o STT só é evitado pelo pré-processamento
+    sessao = artefatos.contexto(contexto)
+    _enviar_pergunta(artefatos, contexto)
+    assert obter_resultado_antecipado(sessao, "pergunta.wav") is not None
+
+    artefatos.fechar(contexto.session.id)
+    sessao = artefatos.contexto(contexto)
+    _enviar_pergunta(artefatos, contexto)
+    assert obter_resultado_antecipado(sessao, "pergunta.wav") is not None
+    assert backend_stt.chamadas == 2
@@ -0,0 +1,93 @@
+"""
+Testes do preparo de áudio antes do STT
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from backends import BackendSTTFalso  # noqa: E402
+from cabecalhos_audio import inspecionar_audio  # noqa: E402
+from corpus import gerar_mp3, gerar_wav  # noqa: E402
+from implementation import transcrever_audio  # noqa: E402
+from preparo_audio import MARGEM_VAD_SEGUNDOS, TAXA_STT_HZ, preparar_audio  # noqa: E402
+
+
+class _STTQueGuarda(BackendSTTFalso):
+    def transcrever(self, audio, formato, idioma):
+        self.recebido = (bytes(audio), formato)
+        return super().transcrever(audio, formato, idioma)
+
+
+stt_que_guarda = pytest.mark.parametrize("backend_stt", [_STTQueGuarda], indirect=True)
+
+
+def _preparar(dados):
+    return preparar_audio(dados, inspecionar_audio(dados))
+
+
+def test_recorta_silencio_e_converte_para_mono_16khz():
+    original = gerar_wav(2.0, taxa_amostragem=48000, canais=2, silencio_segundos=1.5)
+    preparado = _preparar(original)
+
+    info = inspecionar_audio(preparado.dados)
+    assert (info.taxa_amostragem, info.canais, info.bits_por_amostra) == (TAXA_STT_HZ, 1, 16)
+    assert info.duracao_segundos == pytest.approx(2.0 + 2 * MARGEM_VAD_SEGUNDOS, abs=0.05)
+    assert preparado.segundos_removidos == pytest.approx(3.0 - 2 * MARGEM_VAD_SEGUNDOS, abs=0.05)
+    assert preparado.bytes_economizados == len(original) - len(preparado.dados)
+    assert len(preparado.dados) < len(original) / 8
+
+
+def test_audio_ja_adequado_segue_sem_copia():
+    original = gerar_wav(1.0)
+    preparado = _preparar(original)
+    assert preparado.adequado and preparado.dados is original
+    assert preparado.bytes_economizados == 0
+
+
+def test_reamostragem_preserva_o_tom():
+    import numpy as np
+    from cabecalhos_audio import dados_pcm_wav
+
+    preparado = _preparar(gerar_wav(1.0, taxa_amostragem=44100, frequencia_hz=440.0))
+    amostras = np.frombuffer(dados_pcm_wav(preparado.dados), dtype="<i2").astype(np.float64)
+    espectro = np.abs(np.fft.rfft(amostras))
+    assert np.argmax(espectro) * TAXA_STT_HZ / len(amostras) == pytest.approx(440.0, abs=2.0)
+    assert amostras.max() / 32767 == pytest.approx(0.3, abs=0.02)
+
+
+@pytest.mark.parametrize("dados, motivo", [
+    (gerar_wav(1.0, amplitude=0.0), "silencioso"),
+    (gerar_wav(1.0, amplitude=0.005), "silencioso"),
+    (gerar_wav(1.0, amplitude=1.0), "saturado"),
+])
+def test_rejeita_audio_inutilizavel(dados, motivo):
+    preparado = _preparar(dados)
+    assert not preparado.adequado and preparado.motivo == motivo
+    assert preparado.sugestao_acao
+
+
+def test_formatos_compactados_seguem_sem_alteracao():
+    original = gerar_mp3(1.0)
+    preparado = _preparar(original)
+    assert preparado.adequado and preparado.dados is original and preparado.formato == "mp3"
+
+
+@stt_que_guarda
+def test_transcricao_envia_o_audio_reduzido(contexto, backend_stt):
+    original = gerar_wav(2.0, taxa_amostragem=48000, canais=2, silencio_segundos=1.0)
+    contexto.adicionar_artefato("pergunta.wav", original)
+    resultado = transcrever_audio("pergunta.wav", contexto)
+
+    assert resultado["sucesso"] and resultado["tamanho_bytes"] == len(original)
+    assert resultado["bytes_economizados"] == len(original) - len(backend_stt.recebido[0])
+    assert resultado["segundos_removidos"] > 1.0
+    assert backend_stt.recebido[1] == "wav"
+
+
+@stt_que_guarda
+def test_transcricao_rejeita_silencio_sem_chamar_o_stt(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(2.0, amplitude=0.0))
+    resultado = transcrever_audio("pergunta.wav", contexto)
+    assert resultado["sucesso"] is False and resultado["motivo_qualidade"] == "silencioso"
+    assert backend_stt.chamadas == 0
@@ -0,0 +1,111 @@
+"""
+Testes do preparo de imagem antes da análise de visão
+"""
+
+import io
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("numpy")
+
+from PIL import Image  # noqa: E402
+
+import ferramentas_async  # noqa: E402
+from cabecalhos_imagem import inspecionar_imagem  # noqa: E402
+from corpus import gerar_imagem_pagina  # noqa: E402
+from implementation import analisar_imagem_educacional  # noqa: E402
+from preparo_imagem import QUALIDADE_JPEG, TAMANHO_MAXIMO_IMAGEM, preparar_imagem  # noqa: E402
+
+
+def _preparar(dados, lado_maximo=1568):
+    return preparar_imagem(dados, inspecionar_imagem(dados), lado_maximo)
+
+
+def test_reduz_para_o_lado_maximo_do_backend():
+    original = gerar_imagem_pagina(4000, 3000, qualidade=95)
+    preparada = _preparar(original)
+
+    assert (preparada.largura, preparada.altura) == (1568, 1176)
+    with Image.open(io.BytesIO(preparada.dados)) as imagem:
+        assert imagem.size == (1568, 1176) and imagem.format == "JPEG"
+    assert preparada.bytes_economizados == len(original) - len(preparada.dados) > 0
+
+
+def test_foto_ja_pequena_segue_sem_alteracao():
+    original = gerar_imagem_pagina()
+    preparada = _preparar(original)
+    assert preparada.dados is original and preparada.bytes_economizados == 0
+
+
+def test_aplica_a_orientacao_exif():
+    original = gerar_imagem_pagina(1600, 1200, orientacao_exif=6)  # girar 90° no sentido horário
+    preparada = _preparar(original)
+    assert preparada.orientacao_corrigida
+    assert preparada.altura > preparada.largura
+    with Image.open(io.BytesIO(preparada.dados)) as imagem:
+        assert imagem.getexif().get(0x0112, 1) == 1
+
+
+def test_recorta_a_pagina_sobre_a_mesa():
+    original = gerar_imagem_pagina(1000, 1300, borda_mesa=400)
+    preparada = _preparar(original, lado_maximo=4000)
+
+    assert preparada.recortada
+    # Página de 1000x1300 mais margem de 2% da foto (1800x2100) em cada lado
+    assert preparada.largura == pytest.approx(1000 + 2 * 36, abs=20)
+    assert preparada.altura == pytest.approx(1300 + 2 * 42, abs=20)
+
+
+def test_pagina_inteira_nao_e_recortada():
+    preparada = _preparar(gerar_imagem_pagina(3000, 2000))
+    assert not preparada.recortada
+
+
+def test_imagem_uniforme_nao_e_recortada(contexto, backend_visao):
+    buffer = io.BytesIO()
+    Image.new("L", (2600, 2000), 128).save(buffer, format="PNG")
+    preparada = _preparar(buffer.getvalue())
+    assert not preparada.recortada
+
+    contexto.adicionar_artefato("em_branco.png", buffer.getvalue())
+    resultado = analisar_imagem_educacional("em_branco.png", "questão 2", contexto)
+    assert "erro" not in resultado, resultado
+
+
+def test_foto_acima_de_5mb_e_aceita_e_reduzida(contexto, backend_visao):
+    # PNG de ruído não comprime: passa de 5MB com poucos megapixels
+    import numpy as np
+    ruido = np.random.default_rng(1).integers(0, 256, (1600, 1600, 3), dtype=np.uint8)
+    pagina = Image.open(io.BytesIO(gerar_imagem_pagina(1600, 1600))).convert("RGB")
+    misturada = Image.blend(pagina, Image.fromarray(ruido), 0.15)
+    buffer = io.BytesIO()
+    misturada.save(buffer, format="PNG")
+    assert len(buffer.getvalue()) > TAMANHO_MAXIMO_IMAGEM
+
+    contexto.adicionar_artefato("exercicio.png", buffer.getvalue())
+    resultado = analisar_imagem_educacional("exercicio.png", "questão 2", contexto)
+    assert resultado["sucesso"] and resultado["qualidade_adequada"], resultado
+    assert resultado["tamanho_bytes"] == len(buffer.getvalue())
+    assert resultado["bytes_economizados"] > len(buffer.getvalue()) // 2
+
+
+def test_backend_recebe_a_imagem_reduzida(contexto, backend_visao):
+    import asyncio
+
+    recebidas = []
+    analisar_async = backend_visao.analisar_async
+
+    async def analisar_e_medir(imagem, contexto_pergunta):
+        recebidas.append(len(imagem))
+        return await analisar_async(imagem, contexto_pergunta)
+
+    backend_visao.analisar_async = analisar_e_medir
+    original = gerar_imagem_pagina(4000, 3000, qualidade=QUALIDADE_JPEG)
+    contexto.adicionar_artefato("exercicio.jpg", original)
+
+    resultado = asyncio.run(
+        ferramentas_async.analisar_imagem_educacional("exercicio.jpg", "questão 2", contexto)
+    )
+    assert resultado["sucesso"] and backend_visao.chamadas == 1
+    assert resultado["bytes_economizados"] == len(original) - recebidas[0] > 0
@@ -0,0 +1,93 @@
+"""
+Testes da leitura de cabeçalhos de imagem e do portão de qualidade em
+analisar_imagem_educacional
+"""
+
+import struct
+
+import pytest
+
+from cabecalhos_imagem import ImagemInvalidaError, inspecionar_imagem
+from implementation import analisar_imagem_educacional
+
+
+def _png(largura, altura):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I4sII5x", 13, b"IHDR", largura, altura)
+
+
+def _jpeg(largura, altura):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    sof2 = b"\xff\xc2" + struct.pack(">HBHHB", 11, 8, altura, largura, 1) + bytes(3)
+    return b"\xff\xd8" + app0 + b"\xff\xff" + sof2 + b"\xff\xda"
+
+
+def _webp(chunk, payload):
+    corpo = b"WEBP" + chunk + struct.pack("<I", len(payload)) + payload
+    return b"RIFF" + struct.pack("<I", len(corpo)) + corpo
+
+
+@pytest.mark.parametrize("dados, esperado", [
+    (_png(1024, 768), ("png", 1024, 768)),
+    (_jpeg(4032, 3024), ("jpeg", 4032, 3024)),
+    (_webp(b"VP8 ", bytes(3) + b"\x9d\x01\x2a" + struct.pack("<HH", 800, 600)), ("webp", 800, 600)),
+    (_webp(b"VP8L", b"\x2f" + struct.pack("<I", 639 | (479 << 14)) + bytes(5)), ("webp", 640, 480)),
+    (_webp(b"VP8X", bytes(4) + (1919).to_bytes(3, "little") + (1079).to_bytes(3, "little")), ("webp", 1920, 1080)),
+])
+def test_dimensoes_lidas_do_cabecalho(dados, esperado):
+    info = inspecionar_imagem(dados)
+    assert (info.formato, info.largura, info.altura) == esperado
+
+
+@pytest.mark.parametrize("dados", [b"GIF89a" + bytes(20), _png(1, 1)[:20], b"\xff\xd8\xff\xe0\x00\x10JF"])
+def test_cabecalho_invalido(dados):
+    with pytest.raises(ImagemInvalidaError):
+        inspecionar_imagem(dados)
+
+
+def test_dimensoes_reais_de_imagens_codificadas():
+    from corpus import gerar_imagem_pagina
+    pytest.importorskip("PIL")
+    for formato in ("JPEG", "PNG", "WEBP"):
+        info = inspecionar_imagem(gerar_imagem_pagina(900, 700, formato=formato))
+        assert (info.largura, info.altura) == (900, 700)
+
+
+def test_imagem_nitida_vai_ao_backend(contexto, backend_visao):
+    pytest.importorskip("PIL")
+    from corpus import gerar_imagem_pagina
+    contexto.adicionar_artefato("foto.jpg", gerar_imagem_pagina())
+    resultado = analisar_imagem_educacional("foto.jpg", "não entendi", contexto)
+    assert resultado["sucesso"] and resultado["qualidade_adequada"]
+    assert (resultado["largura"], resultado["altura"]) == (1280, 960)
+    assert resultado["tipo_conteudo"] == "exercicio_matematica"
+    assert backend_visao.chamadas == 1
+
+
+@pytest.mark.parametrize("parametros, motivo", [
+    ({"desfoque": 8}, "desfocada"),
+    ({"fundo": 30, "tinta": 5}, "escura"),
+    ({"fundo": 255, "tinta": 250}, "clara_demais"),
+])
+def test_imagem_ruim_nao_chama_backend(contexto, backend_visao, parametros, motivo):
+    pytest.importorskip("PIL")
+    from corpus import gerar_imagem_pagina
+    contexto.adicionar_artefato("foto.jpg", gerar_imagem_pagina(**parametros))
+    resultado = analisar_imagem_educacional("foto.jpg", "", contexto)
+    assert resultado["sucesso"] and not resultado["qualidade_adequada"]
+    assert resultado["motivo_qualidade"] == motivo
+    assert resultado["sugestao_acao"]
+    assert backend_visao.chamadas == 0
+
+
+def test_resolucao_baixa_decidida_so_pelo_cabecalho(contexto, backend_visao):
+    contexto.adicionar_artefato("foto.png", _png(320, 240))
+    resultado = analisar_imagem_educacional("foto.png", "", contexto)
+    assert resultado["motivo_qualidade"] == "resolucao_baixa"
+    assert backend_visao.chamadas == 0
+
+
+def test_conteudo_que_nao_e_imagem(contexto, backend_visao):
+    contexto.adicionar_artefato("foto.jpg", b"isto nao e uma imagem" * 1000)
+    resultado = analisar_imagem_educacional("foto.jpg", "", contexto)
+    assert not resultado["sucesso"] and "Imagem inválida" in resultado["erro"]
+    assert backend_visao.chamadas == 0
@@ -0,0 +1,117 @@
+"""
+Testes do modo compacto das respostas das ferramentas
+"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from agente import NOME_AGENTE, ArtefatosPorSessao, criar_agente_professor
+from corpus import gerar_imagem_pagina, gerar_wav
+from implementation import (
+    analisar_imagem_educacional, analisar_necessidade_visual, gerar_audio_tts, transcrever_audio,
+)
+from modelos_falsos import PEDIDO_FOTO, ModeloProfessorFalso, carregar_trajetorias
+from instruction_providers import professor_instruction_provider
+from respostas_compactas import compactar_resposta
+
+pytestmark = pytest.mark.filterwarnings("ignore::UserWarning")
+
+PERGUNTA = "Não entendi esse exercício aqui de matemática"
+
+
+def test_transcricao_fica_so_com_o_texto(contexto):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(2.0))
+    resposta = transcrever_audio("pergunta.wav", contexto)
+    assert compactar_resposta(resposta) == {"texto": resposta["texto"]}
+
+
+def test_necessidade_visual_sem_campos_ecoados(contexto):
+    compacta = compactar_resposta(analisar_necessidade_visual(PERGUNTA, contexto))
+    assert compacta == {"necessita_imagem": True, "confianca": 0.9}
+
+
+def test_analise_de_imagem_nao_ecoa_a_pergunta(contexto):
+    contexto.adicionar_artefato("exercicio.jpg", gerar_imagem_pagina())
+    resposta = analisar_imagem_educacional("exercicio.jpg", PERGUNTA, contexto)
+    compacta = compactar_resposta(resposta)
+    assert compacta == {
+        "tipo_conteudo": resposta["tipo_conteudo"],
+        "elementos_detectados": resposta["elementos_detectados"],
+        "contexto_educacional": resposta["contexto_educacional"],
+        "qualidade_adequada": True,
+    }
+    # A resposta completa continua intacta para quem chama a ferramenta direto
+    assert resposta["contexto_pergunta"] == PERGUNTA
+
+
+def test_tts_fica_so_com_o_artefato(contexto):
+    resposta = gerar_audio_tts("Olá, Maria!", contexto)
+    assert compactar_resposta(resposta) == {"nome_artefato_gerado": resposta["nome_artefato_gerado"]}
+
+
+def test_objetos_aninhados_mantem_os_nomes_da_instrucao(contexto):
+    compacta = compactar_resposta({
+        "texto": "O que é isso?",
+        "necessidade_visual": {"necessita_imagem": False, "confianca": 0.1234, "justificativa": "..."},
+        "contexto_educacional": {"materia_provavel": "matematica", "materias_ranqueadas": []},
+    })
+    assert compacta == {
+        "texto": "O que é isso?",
+        "necessidade_visual": {"necessita_imagem": False, "confianca": 0.12},
+        "contexto_educacional": {"materia_provavel": "matematica"},
+    }
+    # Toda chave que a instrução cita continua existindo na resposta compacta
+    instrucao = professor_instruction_provider(contexto)
+    for chave in ("texto", "necessidade_visual", "necessita_imagem", "contexto_educacional"):
+        assert f"`{chave}`" in instrucao
+
+
+def test_erro_dispensa_sucesso(contexto):
+    resposta = transcrever_audio("sumiu.wav", contexto)
+    assert compactar_resposta(resposta) == {"erro": resposta["erro"]}
+    assert compactar_resposta({"sucesso": False}) == {"sucesso": False}
+
+
+@pytest.mark.parametrize("backend_stt", [{"texto": PERGUNTA}], indirect=True)
+def test_agente_compacto_no_runner(backend_stt):
+    async def conversar():
+        artefatos = ArtefatosPorSessao()
+        agente = criar_agente_professor(ModeloProfessorFalso(), artefatos=artefatos, respostas_compactas=True)
+        runner = InMemoryRunner(agent=agente, app_name=NOME_AGENTE)
+        sessao = await runner.session_service.create_session(app_name=NOME_AGENTE, user_id="aluno")
+        artefatos.da_sessao(sessao.id).create_artifact("pergunta.wav", gerar_wav(2.0))
+        turnos = []
+        for mensagem in ["transcreva o áudio 'pergunta.wav'", "gere o áudio da sua resposta"]:
+            eventos = []
+            async for evento in runner.run_async(
+                user_id="aluno", session_id=sessao.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=mensagem)])
+            ):
+                eventos.append(evento)
+            turnos.append(eventos)
+        return agente, turnos
+
+    agente, (audio, tts) = asyncio.run(conversar())
+    respostas = [p.function_response.response for e in audio + tts for p in e.content.parts if p.function_response]
+    assert respostas[0]["necessidade_visual"]["necessita_imagem"] is True
+    assert "justificativa" not in respostas[0]["necessidade_visual"]
+    assert audio[-1].content.parts[-1].text == PEDIDO_FOTO
+    assert tts[-1].content.parts[-1].text == f"Áudio da resposta: {respostas[1]['nome_artefato_gerado']}"
+    assert agente.instruction is professor_instruction_provider
+
+
+def test_relatorio_de_tokens_nas_trajetorias():
+    import bench_tokens_respostas
+
+    conversas = carregar_trajetorias(Path(__file__).parent)
+    resultados = asyncio.run(bench_tokens_respostas.comparar_modos(conversas))
+    assert len(resultados) == len(conversas)
+    for r in resultados:
+        assert r["completo"]["conforme"] and r["compacto"]["conforme"]
+        assert r["compacto"]["tokens_respostas"] < r["completo"]["tokens_respostas"]
+        # Sem nota na instrução, nenhuma conversa paga mais tokens no modo compacto
+        assert r["compacto"]["tokens_entrada"] < r["completo"]["tokens_entrada"]
@@ -0,0 +1,50 @@
+"""
+Testes da transcrição em streaming e do backend de STT plugável
+"""
+
+import pytest
+
+from corpus import gerar_mp3, gerar_wav
+from implementation import transcrever_audio, transcrever_audio_stream
+
+
+# Uma palavra nova a cada 1000 bytes consumidos
+stt_palavra_a_palavra = pytest.mark.parametrize(
+    "backend_stt", [{"texto": "olha esse exercício aqui professor", "bytes_por_palavra": 1000}], indirect=True
+)
+
+
+@stt_palavra_a_palavra
+def test_parciais_crescem_ate_a_transcricao_final(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.wav", gerar_wav(0.1))  # 3244 bytes
+    eventos = list(transcrever_audio_stream("pergunta.wav", contexto, tamanho_bloco=1000))
+
+    parciais = [e["texto"] for e in eventos if e["parcial"]]
+    assert parciais == [
+        "olha",
+        "olha esse",
+        "olha esse exercício",
+        "olha esse exercício aqui professor",
+    ]
+    final = eventos[-1]
+    assert final["parcial"] is False
+    assert final["texto"] == "olha esse exercício aqui professor"
+    assert final["tamanho_bytes"] == 3244
+    assert backend_stt.chamadas == 1
+
+
+@stt_palavra_a_palavra
+def test_final_igual_ao_modo_nao_streaming(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.mp3", gerar_mp3(4.0))
+    final = list(transcrever_audio_stream("pergunta.mp3", contexto))[-1]
+    completo = transcrever_audio("pergunta.mp3", contexto)
+    assert {k: v for k, v in final.items() if k != "parcial"} == completo
+
+
+@stt_palavra_a_palavra
+def test_erros_de_validacao_produzem_um_unico_evento(contexto, backend_stt):
+    contexto.adicionar_artefato("pergunta.ogg", b"\0" * 100)
+    assert list(transcrever_audio_stream("inexistente.wav", contexto))[0]["sucesso"] is False
+    eventos = list(transcrever_audio_stream("pergunta.ogg", contexto))
+    assert eventos == [{"erro": "Formato ogg não suportado", "sucesso": False}]
+    assert backend_stt.chamadas == 0
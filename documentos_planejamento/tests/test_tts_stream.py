@@ -0,0 +1,111 @@
+"""
+Testes da síntese de voz em streaming (frase a frase)
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from backends import BackendTTSFalso
+from ferramentas_async import gerar_audio_tts_stream
+from implementation import dividir_em_frases
+
+TEXTO = "Muito bem! Vamos somar as dezenas primeiro. Depois, somamos as unidades. Deu 47?"
+
+
+class BackendContaParalelas(BackendTTSFalso):
+    """Registra quantas sínteses ficaram em andamento ao mesmo tempo."""
+
+    def __init__(self):
+        super().__init__(atraso_por_caractere=0.002)
+        self.em_andamento = 0
+        self.maximo_simultaneo = 0
+
+    async def sintetizar_async(self, texto, voz, velocidade=1.0):
+        self.em_andamento += 1
+        self.maximo_simultaneo = max(self.maximo_simultaneo, self.em_andamento)
+        try:
+            return await super().sintetizar_async(texto, voz, velocidade)
+        finally:
+            self.em_andamento -= 1
+
+
+conta_paralelas = pytest.mark.parametrize("backend_tts", [BackendContaParalelas], indirect=True)
+
+
+def _coletar(texto, contexto, **kwargs):
+    async def coletar():
+        return [parte async for parte in gerar_audio_tts_stream(texto, contexto, **kwargs)]
+    return asyncio.run(coletar())
+
+
+def test_dividir_em_frases():
+    assert dividir_em_frases(TEXTO) == [
+        "Muito bem!", "Vamos somar as dezenas primeiro.", "Depois, somamos as unidades.", "Deu 47?"
+    ]
+    longa = "Primeiro, some as dezenas; depois, some as unidades, e no fim junte tudo."
+    assert dividir_em_frases(longa, max_caracteres=30) == [
+        "Primeiro, some as dezenas;", "depois, some as unidades,", "e no fim junte tudo."
+    ]
+
+
+@conta_paralelas
+def test_partes_em_ordem_com_manifesto(contexto, backend_tts):
+    resultados = _coletar(TEXTO, contexto, max_paralelo=2)
+    *parciais, final = resultados
+    assert [p["indice"] for p in parciais] == [0, 1, 2, 3]
+    assert all(p["parcial"] and p["total_partes"] == 4 for p in parciais)
+    assert final["parcial"] is False
+    assert final["partes"] == [p["nome_artefato_gerado"] for p in parciais]
+
+    manifesto = contexto.session.get_artifact(final["nome_manifesto"])
+    assert manifesto.mime_type == "application/json"
+    conteudo = json.loads(manifesto.content)
+    assert [p["nome_artefato"] for p in conteudo["partes"]] == final["partes"]
+    for parte, frase in zip(conteudo["partes"], dividir_em_frases(TEXTO)):
+        audio = contexto.session.get_artifact(parte["nome_artefato"]).content
+        assert audio == b"audio_data_simulado_tts_" + frase.encode("utf-8")
+
+
+@conta_paralelas
+def test_paralelismo_limitado(contexto, backend_tts):
+    _coletar(TEXTO, contexto, max_paralelo=2)
+    assert backend_tts.maximo_simultaneo == 2
+    assert backend_tts.chamadas == 4
+
+
+@conta_paralelas
+def test_frases_repetidas_nao_sao_sintetizadas_de_novo(contexto, backend_tts):
+    _coletar(TEXTO, contexto)
+    _coletar("Muito bem! Deu 47?", contexto)
+    assert backend_tts.chamadas == 4
+
+
+@conta_paralelas
+def test_frase_repetida_na_resposta_e_sintetizada_uma_vez(contexto, backend_tts):
+    resultados = _coletar("Muito bem! Deu 47? Muito bem!", contexto)
+    assert backend_tts.chamadas == 2
+    assert resultados[-1]["partes"][0] == resultados[-1]["partes"][2]
+
+
+@conta_paralelas
+def test_respostas_simultaneas_dividem_a_sintese(backend_tts):
+    from corpus import ContextoFerramentaFalso
+
+    contextos = [ContextoFerramentaFalso() for _ in range(3)]
+
+    async def tres_sessoes():
+        async def coletar(contexto):
+            return [parte async for parte in gerar_audio_tts_stream(TEXTO, contexto, max_paralelo=1)]
+        return await asyncio.gather(*(coletar(c) for c in contextos))
+
+    resultados = asyncio.run(tres_sessoes())
+    assert backend_tts.chamadas == 4
+    for contexto, (*_, final) in zip(contextos, resultados):
+        assert all(contexto.session.get_artifact(nome) is not None for nome in final["partes"])
+
+
+@conta_paralelas
+def test_texto_vazio(contexto, backend_tts):
+    assert _coletar("  ", contexto) == [{"erro": "Texto vazio fornecido", "sucesso": False}]